@@ -2,6 +2,8 @@ from . import preferences
 from . import icons
 from . import property
 from . import translation
+from .core.parallel import ProcessPool
+from .classes import topology_cache
 
 from .operators import unwrap
 from .operators import unwrap_project
@@ -40,8 +42,10 @@ from .operators import body_preset
 
 from .operators import view_padding
 from .operators import view_checker_map
+from .operators import view_stats
 from .operators import mesh_uvmesh
 from .operators import texel
+from .operators import profiler
 
 from .ui import ui_main
 
@@ -50,6 +54,7 @@ modules = [
     preferences,
     translation,
     icons,
+    topology_cache,
     unwrap,
     unwrap_project,
     unwrap_mirrored,
@@ -82,8 +87,10 @@ modules = [
     body_preset,
     view_padding,
     view_checker_map,
+    view_stats,
     mesh_uvmesh,
     texel,
+    profiler,
     ui_main,
     property,
 ]
@@ -97,3 +104,4 @@ def register():
 def unregister():
     for module in reversed(modules):
         module.unregister()
+    ProcessPool.shutdown()
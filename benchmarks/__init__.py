@@ -0,0 +1 @@
+# Blender なしで実行するベンチマーク（python -m benchmarks）
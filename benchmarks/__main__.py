@@ -0,0 +1,176 @@
+"""Blender なしで core の処理時間を計測するベンチマーク
+
+アドオンのフォルダで実行する:
+    python -m benchmarks
+    python -m benchmarks --sizes 1000,10000 --meshes grid,scatter --output report.json
+    python -m benchmarks --output report.csv --baseline previous.json
+
+--baseline を指定すると、前回のレポートより tolerance 倍以上遅くなった処理があれば終了コード 1 を返す
+"""
+
+import argparse
+import csv
+import json
+import platform
+import sys
+import time
+import numpy as np
+from .meshes import GENERATORS
+from .stages import STAGES
+
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+
+
+def measure(stage, mesh, repeat):
+    "repeat 回実行した時間のリスト（秒）"
+    arguments = stage.arguments(mesh)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stage.run(*arguments)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def scaling_exponent(faces, times):
+    "両対数の傾き（1.0 なら面数に比例）。2点未満なら None"
+    faces = np.asarray(faces, dtype=np.float64)
+    times = np.asarray(times, dtype=np.float64)
+    valid = (faces > 0) & (times > 0)
+    if np.count_nonzero(valid) < 2:
+        return None
+    slope, _ = np.polyfit(np.log(faces[valid]), np.log(times[valid]), 1)
+    return float(slope)
+
+
+def run(sizes, mesh_names, stage_names, repeat, log=print):
+    results = []
+    for mesh_name in mesh_names:
+        for size in sizes:
+            start = time.perf_counter()
+            mesh = GENERATORS[mesh_name](size)
+            log("{} {:>8} faces {:>8} loops (generated in {:.2f}s)".format(
+                mesh_name, mesh.face_count, mesh.loop_count, time.perf_counter() - start
+            ))
+            for stage_name in stage_names:
+                times = measure(STAGES[stage_name], mesh, repeat)
+                result = {
+                    "mesh": mesh_name,
+                    "size": size,
+                    "faces": mesh.face_count,
+                    "loops": mesh.loop_count,
+                    "stage": stage_name,
+                    "best": min(times),
+                    "median": float(np.median(times)),
+                    "repeat": repeat,
+                }
+                results.append(result)
+                log("    {:<14} {:>10.4f}s".format(stage_name, result["best"]))
+    return results
+
+
+def scaling_curves(results):
+    "メッシュと処理ごとの (面数, 時間) の並びと傾き"
+    curves = {}
+    for result in results:
+        curve = curves.setdefault(result["mesh"], {}).setdefault(result["stage"], {"faces": [], "best": []})
+        curve["faces"].append(result["faces"])
+        curve["best"].append(result["best"])
+    for stages in curves.values():
+        for curve in stages.values():
+            curve["exponent"] = scaling_exponent(curve["faces"], curve["best"])
+    return curves
+
+
+def build_report(results):
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "results": results,
+        "scaling": scaling_curves(results),
+    }
+
+
+def write_report(report, filepath):
+    if filepath.lower().endswith(".csv"):
+        fields = ("mesh", "size", "faces", "loops", "stage", "best", "median", "repeat")
+        with open(filepath, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields + ("exponent",))
+            writer.writeheader()
+            for result in report["results"]:
+                exponent = report["scaling"][result["mesh"]][result["stage"]]["exponent"]
+                writer.writerow({**{key: result[key] for key in fields}, "exponent": exponent})
+    else:
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+def compare_baseline(results, baseline_path, tolerance):
+    "前回のレポート（JSON）より遅くなった処理のリスト"
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {
+            (result["mesh"], result["size"], result["stage"]): result["best"] for result in json.load(f)["results"]
+        }
+    regressions = []
+    for result in results:
+        previous = baseline.get((result["mesh"], result["size"], result["stage"]))
+        if previous and result["best"] > previous * tolerance:
+            regressions.append((result, previous))
+    return regressions
+
+
+def parse_list(value, choices=None):
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    if choices is not None:
+        unknown = [item for item in items if item not in choices]
+        if unknown:
+            raise argparse.ArgumentTypeError("unknown: {} (choices: {})".format(", ".join(unknown), ", ".join(choices)))
+    return items
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the Mio3 UV core")
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(float(item)) for item in parse_list(value)],
+        default=list(DEFAULT_SIZES),
+        help="comma separated face counts",
+    )
+    parser.add_argument(
+        "--meshes", type=lambda value: parse_list(value, GENERATORS), default=list(GENERATORS), help="mesh generators"
+    )
+    parser.add_argument(
+        "--stages", type=lambda value: parse_list(value, STAGES), default=list(STAGES), help="stages to measure"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="report file (.json or .csv)")
+    parser.add_argument("--baseline", help="previous JSON report to compare with")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="allowed slowdown against the baseline")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.meshes, args.stages, max(args.repeat, 1))
+    report = build_report(results)
+
+    print("scaling (time ~ faces^k)")
+    for mesh_name, stages in report["scaling"].items():
+        for stage_name, curve in stages.items():
+            if curve["exponent"] is not None:
+                print("    {:<10} {:<14} k={:.2f}".format(mesh_name, stage_name, curve["exponent"]))
+
+    if args.output:
+        write_report(report, args.output)
+        print("report: {}".format(args.output))
+
+    if args.baseline:
+        regressions = compare_baseline(results, args.baseline, args.tolerance)
+        for result, previous in regressions:
+            print("REGRESSION {mesh} {size} {stage}: {best:.4f}s".format(**result), "(was {:.4f}s)".format(previous))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
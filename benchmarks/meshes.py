@@ -0,0 +1,219 @@
+import numpy as np
+from dataclasses import dataclass
+
+
+@dataclass
+class SyntheticMesh:
+    """ベンチマーク用のメッシュ（MeshArrays と同じ並びのフラット配列）
+
+    インデックスは BMesh の並び（面の順、面ごとのループの順）と同じ
+    """
+
+    name: str
+    vert_co: np.ndarray
+    face_start: np.ndarray
+    face_size: np.ndarray
+    loop_face: np.ndarray
+    loop_vert: np.ndarray
+    loop_edge: np.ndarray
+    loop_next: np.ndarray
+    loop_uv: np.ndarray
+    edge_seam: np.ndarray
+
+    @property
+    def face_count(self):
+        return len(self.face_size)
+
+    @property
+    def loop_count(self):
+        return len(self.loop_vert)
+
+    @classmethod
+    def from_polygons(cls, name, vert_co, loop_vert, face_size, loop_uv, seam_edges=None):
+        "頂点・ループの配列からエッジとループの接続を求める。seam_edges: (E, 2) の頂点ペア"
+        loop_vert = np.asarray(loop_vert, dtype=np.int64)
+        face_size = np.asarray(face_size, dtype=np.int64)
+        face_count = len(face_size)
+        loop_count = len(loop_vert)
+
+        face_start = np.zeros(face_count, dtype=np.int64)
+        np.cumsum(face_size[:-1], out=face_start[1:])
+        loop_face = np.repeat(np.arange(face_count, dtype=np.int64), face_size)
+        loop_next = np.arange(1, loop_count + 1, dtype=np.int64)
+        if face_count:
+            loop_next[face_start + face_size - 1] = face_start
+
+        vert_count = len(vert_co)
+        edge_keys = edge_key(loop_vert, loop_vert[loop_next], vert_count)
+        unique_keys, loop_edge = np.unique(edge_keys, return_inverse=True)
+        edge_seam = np.zeros(len(unique_keys), dtype=bool)
+        if seam_edges is not None and len(seam_edges):
+            seam_edges = np.asarray(seam_edges, dtype=np.int64)
+            seam_keys = edge_key(seam_edges[:, 0], seam_edges[:, 1], vert_count)
+            position = np.minimum(np.searchsorted(unique_keys, seam_keys), len(unique_keys) - 1)
+            found = unique_keys[position] == seam_keys
+            edge_seam[position[found]] = True
+
+        return cls(
+            name=name,
+            vert_co=np.asarray(vert_co, dtype=np.float64),
+            face_start=face_start,
+            face_size=face_size,
+            loop_face=loop_face,
+            loop_vert=loop_vert,
+            loop_edge=loop_edge.reshape(-1),
+            loop_next=loop_next,
+            loop_uv=np.asarray(loop_uv, dtype=np.float64),
+            edge_seam=edge_seam,
+        )
+
+
+def edge_key(vert_a, vert_b, vert_count):
+    return np.minimum(vert_a, vert_b) * vert_count + np.maximum(vert_a, vert_b)
+
+
+@dataclass
+class GridPart:
+    "cols×rows の四角形のパーツ。wrap=True なら筒状に閉じて先頭の列にシームを入れる"
+
+    cols: int
+    rows: int
+    wrap: bool
+    origin: tuple  # 3D空間の位置
+    size: tuple  # 3D空間の大きさ (幅または直径, 高さ)
+    uv_rect: tuple  # (u, v, 幅, 高さ)
+
+    @property
+    def vert_count(self):
+        return (self.cols if self.wrap else self.cols + 1) * (self.rows + 1)
+
+    def build(self):
+        "(頂点座標, ループの頂点, ループのUV, シームの頂点ペア) を返す"
+        cols, rows = self.cols, self.rows
+        ring = cols if self.wrap else cols + 1
+        column = np.arange(ring, dtype=np.float64)
+        row = np.arange(rows + 1, dtype=np.float64)
+        grid_x, grid_y = np.meshgrid(column, row)
+        width, height = self.size
+        if self.wrap:
+            angle = grid_x / cols * 2.0 * np.pi
+            co = np.stack((np.cos(angle) * width * 0.5, np.sin(angle) * width * 0.5, grid_y / rows * height), axis=-1)
+        else:
+            co = np.stack((grid_x / cols * width, np.zeros_like(grid_x), grid_y / rows * height), axis=-1)
+        co = co.reshape(-1, 3) + np.asarray(self.origin, dtype=np.float64)
+
+        # 四角形の角の (列, 行)、反時計回り
+        face_col, face_row = np.meshgrid(np.arange(cols), np.arange(rows))
+        face_col, face_row = face_col.reshape(-1), face_row.reshape(-1)
+        corner_col = np.stack((face_col, face_col + 1, face_col + 1, face_col), axis=1)
+        corner_row = np.stack((face_row, face_row, face_row + 1, face_row + 1), axis=1)
+
+        loop_vert = (corner_row * ring + corner_col % ring).reshape(-1)
+        u, v, uv_width, uv_height = self.uv_rect
+        loop_uv = np.stack(
+            (u + corner_col.reshape(-1) / cols * uv_width, v + corner_row.reshape(-1) / rows * uv_height), axis=1
+        )
+
+        seams = np.zeros((0, 2), dtype=np.int64)
+        if self.wrap:
+            seam_rows = np.arange(rows, dtype=np.int64)
+            seams = np.stack((seam_rows * ring, (seam_rows + 1) * ring), axis=1)
+        return co, loop_vert, loop_uv, seams
+
+
+def combine_parts(name, parts):
+    "パーツを1つのメッシュにまとめる（頂点は共有しない）"
+    coords, loop_verts, loop_uvs, seams = [], [], [], []
+    vert_offset = 0
+    for part in parts:
+        co, loop_vert, loop_uv, seam = part.build()
+        coords.append(co)
+        loop_verts.append(loop_vert + vert_offset)
+        loop_uvs.append(loop_uv)
+        seams.append(seam + vert_offset)
+        vert_offset += len(co)
+    loop_vert = np.concatenate(loop_verts)
+    return SyntheticMesh.from_polygons(
+        name,
+        np.concatenate(coords),
+        loop_vert,
+        np.full(len(loop_vert) // 4, 4, dtype=np.int64),
+        np.concatenate(loop_uvs),
+        np.concatenate(seams),
+    )
+
+
+def grid_shape(face_count, aspect=1.0):
+    "face_count 面程度になる (列, 行)"
+    cols = max(int(round(np.sqrt(face_count * aspect))), 1)
+    rows = max(int(round(face_count / cols)), 1)
+    return cols, rows
+
+
+def make_grid(face_count):
+    "1枚の平面（1アイランド）"
+    cols, rows = grid_shape(face_count)
+    return combine_parts("grid", [GridPart(cols, rows, False, (0.0, 0.0, 0.0), (2.0, 2.0), (0.0, 0.0, 1.0, 1.0))])
+
+
+def make_cylinder(face_count):
+    "シームで開いた円柱（1アイランド、境界が長い）"
+    cols, rows = grid_shape(face_count, aspect=2.0)
+    cols = max(cols, 3)
+    return combine_parts(
+        "cylinder", [GridPart(cols, rows, True, (0.0, 0.0, 0.0), (1.0, 2.0), (0.0, 0.0, 1.0, 1.0))]
+    )
+
+
+def make_scatter(face_count, island_size=4):
+    "小さいアイランドが大量にあるメッシュ（island_size×island_size 面のアイランド）"
+    island_faces = island_size * island_size
+    island_count = max(face_count // island_faces, 1)
+    side = int(np.ceil(np.sqrt(island_count)))
+    cell = 1.0 / side
+    parts = []
+    for index in range(island_count):
+        x, y = index % side, index // side
+        parts.append(
+            GridPart(
+                island_size,
+                island_size,
+                False,
+                (x * 1.5, y * 1.5, 0.0),
+                (1.0, 1.0),
+                (x * cell + cell * 0.1, y * cell + cell * 0.1, cell * 0.8, cell * 0.8),
+            )
+        )
+    return combine_parts("scatter", parts)
+
+
+# キャラクター風のパーツ構成: (名前, 面数の割合, 筒状か, 位置, 大きさ, UVの領域)
+CHARACTER_PARTS = (
+    ("body", 0.34, True, (0.0, 0.0, 1.0), (0.6, 0.8), (0.0, 0.5, 0.5, 0.5)),
+    ("head", 0.14, True, (0.0, 0.0, 1.9), (0.4, 0.4), (0.5, 0.5, 0.25, 0.25)),
+    ("face", 0.06, False, (-0.15, -0.21, 1.95), (0.3, 0.3), (0.75, 0.5, 0.25, 0.25)),
+    ("arm.L", 0.09, True, (0.45, 0.0, 1.1), (0.15, 0.7), (0.0, 0.0, 0.2, 0.5)),
+    ("arm.R", 0.09, True, (-0.45, 0.0, 1.1), (0.15, 0.7), (0.2, 0.0, 0.2, 0.5)),
+    ("leg.L", 0.12, True, (0.15, 0.0, 0.0), (0.2, 1.0), (0.4, 0.0, 0.2, 0.5)),
+    ("leg.R", 0.12, True, (-0.15, 0.0, 0.0), (0.2, 1.0), (0.6, 0.0, 0.2, 0.5)),
+    ("hand.L", 0.02, False, (0.45, 0.0, 0.9), (0.1, 0.15), (0.8, 0.0, 0.1, 0.25)),
+    ("hand.R", 0.02, False, (-0.55, 0.0, 0.9), (0.1, 0.15), (0.9, 0.0, 0.1, 0.25)),
+)
+
+
+def make_character(face_count):
+    "胴体・頭・手足の筒とパッチを左右対称に配置したメッシュ"
+    parts = []
+    for _name, ratio, wrap, origin, size, uv_rect in CHARACTER_PARTS:
+        aspect = size[0] * (np.pi if wrap else 1.0) / size[1]
+        cols, rows = grid_shape(max(face_count * ratio, 1), aspect)
+        parts.append(GridPart(max(cols, 3) if wrap else cols, rows, wrap, origin, size, uv_rect))
+    return combine_parts("character", parts)
+
+
+GENERATORS = {
+    "grid": make_grid,
+    "cylinder": make_cylinder,
+    "scatter": make_scatter,
+    "character": make_character,
+}
@@ -0,0 +1,219 @@
+import numpy as np
+from dataclasses import dataclass
+from core.coverage import calc_coverage, face_areas
+from core.islands import edge_loop_pairs, find_island_labels, group_by_label
+from core.packing import pack_rects
+from core.padding import (
+    boundary_segments,
+    chain_polylines,
+    nesting_signs,
+    offset_normals,
+    offset_segments,
+    orient_ccw,
+    uv_keys,
+)
+from core.rotation import rotation_auto, rotation_geometry
+from core.relax import CSRMatrix, LaplaceSystem, taubin_smooth
+from core.symmetry import face_centers, grid_nearest, match_faces, match_loops, mirror_coords
+from core.texel import face_world_areas, texel_densities, weighted_density
+from .meshes import SyntheticMesh
+
+RELAX_ITERATIONS = 10
+COVERAGE_RESOLUTION = 1024
+PADDING = 0.01
+MIRROR_THRESHOLD = 0.001
+PACK_PADDING = 16 / 2048
+TEXEL_PIXELS = 2048 * 2048
+
+
+def stage_islands(mesh: SyntheticMesh):
+    "UVIslandManager のアイランド検出（find_islands_array）"
+    face_count = mesh.face_count
+    labels = find_island_labels(
+        mesh.loop_face,
+        mesh.loop_vert,
+        mesh.loop_edge,
+        mesh.loop_next,
+        mesh.loop_uv,
+        mesh.edge_seam,
+        np.ones(face_count, dtype=bool),
+        np.zeros(face_count, dtype=bool),
+        np.ones(face_count, dtype=bool),
+    )
+    return len(group_by_label(labels))
+
+
+def island_bounds(mesh: SyntheticMesh):
+    "アイランドの範囲の幅と高さ（UVIsland の bounds）"
+    face_count = mesh.face_count
+    labels = find_island_labels(
+        mesh.loop_face,
+        mesh.loop_vert,
+        mesh.loop_edge,
+        mesh.loop_next,
+        mesh.loop_uv,
+        mesh.edge_seam,
+        np.ones(face_count, dtype=bool),
+        np.zeros(face_count, dtype=bool),
+        np.ones(face_count, dtype=bool),
+    )
+    # ラベルは連結成分の代表の面なので、0からの通し番号にする
+    roots, labels = np.unique(labels, return_inverse=True)
+    loop_label = labels[mesh.loop_face]
+    island_count = len(roots)
+    lower = np.full((island_count, 2), np.inf)
+    upper = np.full((island_count, 2), -np.inf)
+    np.minimum.at(lower, loop_label, mesh.loop_uv)
+    np.maximum.at(upper, loop_label, mesh.loop_uv)
+    size = upper - lower
+    return size[:, 0], size[:, 1]
+
+
+def stage_pack(widths, heights):
+    "Sort（Pack）のスカイライン法の詰め込み"
+    pack_rects(widths, heights, PACK_PADDING, True)
+
+
+def relax_graph(mesh: SyntheticMesh):
+    """UVNodeManager と同じ単位（頂点とUVの組）のノードと、リラックスの重み行列・可動フラグ
+
+    境界エッジ（面が2つではない・シーム）の頂点は固定する
+    """
+    loop_key, _ = uv_keys(mesh.loop_uv)
+    _, loop_node = np.unique(mesh.loop_vert * (int(loop_key.max(initial=0)) + 1) + loop_key, return_inverse=True)
+    loop_node = loop_node.reshape(-1)
+    node_count = int(loop_node.max(initial=-1)) + 1
+
+    node_a = loop_node
+    node_b = loop_node[mesh.loop_next]
+    _, first = np.unique(np.minimum(node_a, node_b) * node_count + np.maximum(node_a, node_b), return_index=True)
+    node_a, node_b = node_a[first], node_b[first]
+
+    node_vert = np.empty(node_count, dtype=np.int64)
+    node_vert[loop_node] = mesh.loop_vert
+    node_uv = np.empty((node_count, 2), dtype=np.float64)
+    node_uv[loop_node] = mesh.loop_uv
+    delta = mesh.vert_co[node_vert[node_a]] - mesh.vert_co[node_vert[node_b]]
+    weight = 1.0 / np.maximum(np.sqrt(np.einsum("ij,ij->i", delta, delta)), 0.000001)
+
+    weights = CSRMatrix.from_coo(
+        np.concatenate((node_a, node_b)),
+        np.concatenate((node_b, node_a)),
+        np.concatenate((weight, weight)),
+        node_count,
+    )
+
+    loop_a, _ = edge_loop_pairs(mesh.loop_edge, len(mesh.edge_seam))
+    is_boundary = np.ones(len(mesh.edge_seam), dtype=bool)
+    is_boundary[mesh.loop_edge[loop_a]] = False
+    is_boundary |= mesh.edge_seam
+    boundary_loops = np.flatnonzero(is_boundary[mesh.loop_edge])
+    fixed = np.zeros(node_count, dtype=bool)
+    fixed[loop_node[boundary_loops]] = True
+    fixed[loop_node[mesh.loop_next[boundary_loops]]] = True
+    fixed |= np.diff(weights.indptr) <= 1
+    return node_uv, weights, ~fixed
+
+
+def stage_relax_taubin(node_uv, weights, movable):
+    "Relax（DEFAULT）の Taubin スムージング"
+    taubin_smooth(node_uv, weights, movable, (True, True), 0.5, -0.53, RELAX_ITERATIONS, 0.00001)
+
+
+def stage_relax_global(node_uv, weights, movable):
+    "Relax（GLOBAL）の連立方程式の構築と求解"
+    LaplaceSystem.from_weights(weights, movable).solve(node_uv, RELAX_ITERATIONS * 0.5)
+
+
+def stage_coverage(mesh: SyntheticMesh):
+    "Texel の UV 占有率（ラスタライズ）"
+    return calc_coverage(mesh.loop_uv, mesh.face_size, COVERAGE_RESOLUTION)
+
+
+def stage_padding(mesh: SyntheticMesh):
+    "パディングガイドの構築（view_padding の build_object_cache とオフセット）"
+    loop_key, key_uv = uv_keys(mesh.loop_uv)
+    seg_a, seg_b, seg_island = boundary_segments(
+        mesh.loop_face, mesh.loop_edge, mesh.loop_next, loop_key, mesh.edge_seam, mesh.face_count
+    )
+    polylines = []
+    if len(seg_island):
+        order = np.argsort(seg_island, kind="stable")
+        splits = np.flatnonzero(np.diff(seg_island[order])) + 1
+        for indices in np.split(order, splits):
+            for keys, closed in chain_polylines(seg_a[indices], seg_b[indices]):
+                points = orient_ccw(key_uv[keys], closed)
+                polylines.append((points, offset_normals(points, closed), closed))
+
+    signs = np.ones(len(polylines), dtype=np.float64)
+    closed_index = [i for i, (_, _, closed) in enumerate(polylines) if closed]
+    signs[closed_index] = nesting_signs([polylines[i][0] for i in closed_index])
+    return offset_segments(polylines, signs, PADDING)
+
+
+def stage_texel(mesh: SyntheticMesh):
+    "Texel Density Get（面積をアイランドごとにまとめて密度を求める）"
+    face_count = mesh.face_count
+    labels = find_island_labels(
+        mesh.loop_face,
+        mesh.loop_vert,
+        mesh.loop_edge,
+        mesh.loop_next,
+        mesh.loop_uv,
+        mesh.edge_seam,
+        np.ones(face_count, dtype=bool),
+        np.zeros(face_count, dtype=bool),
+        np.ones(face_count, dtype=bool),
+    )
+    island_count = int(labels.max(initial=-1)) + 1
+    world = face_world_areas(mesh.vert_co, np.eye(4), mesh.loop_vert, mesh.face_start, mesh.face_size)
+    uv = face_areas(mesh.loop_uv, mesh.face_start, mesh.face_size)
+    world_area = np.bincount(labels, weights=world, minlength=island_count)
+    uv_area = np.bincount(labels, weights=uv, minlength=island_count)
+    density = texel_densities(world_area, uv_area, np.full(island_count, TEXEL_PIXELS))
+    return weighted_density(density, world_area)
+
+
+def stage_symmetry(mesh: SyntheticMesh):
+    "対称の対応表（MirrorMap.from_topology）"
+    coords = mesh.vert_co
+    vert_mirror = grid_nearest(coords, mirror_coords(coords, 0), MIRROR_THRESHOLD)
+    face_mirror = match_faces(mesh.loop_vert, mesh.face_start, mesh.face_size, vert_mirror)
+    centers = face_centers(coords, mesh.loop_vert, mesh.face_start, mesh.face_size)
+    grid_nearest(centers, mirror_coords(centers, 0), MIRROR_THRESHOLD)
+    match_loops(mesh.loop_face, mesh.loop_vert, face_mirror, vert_mirror)
+
+
+def stage_rotation(mesh: SyntheticMesh):
+    "Orient / Align Body Parts の回転角の推定（メッシュ全体を1つのアイランドとして）"
+    rotation_auto(mesh.loop_uv, mesh.face_start, mesh.face_size)
+    rotation_geometry(mesh.loop_uv, mesh.vert_co[mesh.loop_vert], mesh.face_start, mesh.face_size, "Z")
+
+
+@dataclass
+class Stage:
+    "計測する処理。prepare があれば計測の前に1回だけ実行し、その戻り値を run に渡す"
+
+    name: str
+    run: object
+    prepare: object = None
+
+    def arguments(self, mesh: SyntheticMesh):
+        return self.prepare(mesh) if self.prepare else (mesh,)
+
+
+STAGES = {
+    stage.name: stage
+    for stage in (
+        Stage("islands", stage_islands),
+        Stage("relax_graph", relax_graph),
+        Stage("relax_taubin", stage_relax_taubin, relax_graph),
+        Stage("relax_global", stage_relax_global, relax_graph),
+        Stage("coverage", stage_coverage),
+        Stage("padding", stage_padding),
+        Stage("symmetry", stage_symmetry),
+        Stage("rotation", stage_rotation),
+        Stage("pack", stage_pack, island_bounds),
+        Stage("texel", stage_texel),
+    )
+}
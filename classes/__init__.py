@@ -1,4 +1,8 @@
 
 from .uv_group import UVNodeManager, UVNodeGroup, UVNode, UVNodeObject
 from .uv_island import UVIslandManager, UVIsland
+from .uv_weld import UVWeldIndex
+from .island_signature import IslandSignatures
+from .island_stack import IslandStacker
+from .texel_density import TexelDensity, MeshTexelDensity
 from .operator import Mio3UVPanel, Mio3UVOperator, Mio3UVGlobalOperator
@@ -0,0 +1,84 @@
+import numpy as np
+from dataclasses import dataclass, field
+from ..core.coverage import face_areas
+from ..core.signature import first_appearance_labels, island_signatures, tolerance_labels
+
+
+@dataclass
+class IslandSignatures:
+    """アイランドごとの面数・ループ数・エッジ数・頂点数・境界エッジ数・面積・トポロジーのラベル
+
+    配列のインデックスはアイランドID。UVIslandManager のアイランドについて1回だけ計算する
+    """
+
+    faces: np.ndarray
+    loops: np.ndarray
+    edges: np.ndarray
+    verts: np.ndarray
+    boundary: np.ndarray
+    topology: np.ndarray
+    area: np.ndarray = field(default=None, repr=False)  # 3D（ローカル）の面積
+
+    @classmethod
+    def from_manager(cls, island_manager, area=False):
+        island_count = len(island_manager.island_table)
+        totals = {}
+        for info in island_manager.collections:
+            if info.face_island is None or not (info.face_island >= 0).any():
+                continue
+            topology = info.get_topology()
+            face_area = None
+            if area:
+                loop_co = topology.get_vert_co(info.bm)[topology.loop_vert]
+                face_area = face_areas(loop_co, topology.face_start, topology.face_size)
+            signatures = island_signatures(
+                info.face_island,
+                island_count,
+                topology.face_size,
+                topology.loop_face,
+                topology.loop_vert,
+                topology.loop_edge,
+                face_area,
+            )
+            # オブジェクトごとに自分のアイランドIDの位置だけに値が入るので足し合わせる
+            for name, values in signatures.items():
+                totals[name] = totals[name] + values if name in totals else values
+
+        if not totals:
+            zeros = np.zeros(island_count, dtype=np.int64)
+            totals = {name: zeros for name in ("faces", "loops", "edges", "verts", "boundary")}
+            totals["topology"] = np.zeros((island_count, 1), dtype=np.int64)
+            if area:
+                totals["area"] = np.zeros(island_count, dtype=np.float64)
+        totals["topology"] = first_appearance_labels(totals["topology"])
+        return cls(**totals)
+
+    def key(self, island, fields=("faces", "loops", "edges")):
+        return tuple(getattr(self, name)[island.island_id].item() for name in fields)
+
+    def group(self, islands, fields=("faces", "loops", "edges")):
+        "シグネチャが同じアイランドのグループ（最初に現れた順）"
+        groups = {}
+        for island in islands:
+            groups.setdefault(self.key(island, fields), []).append(island)
+        return list(groups.values())
+
+    def similar_mask(self, source, fields=("faces",), area_threshold=None):
+        "source とシグネチャが同じアイランドIDのマスク（area_threshold を渡すと面積の差も判定）"
+        index = source.island_id
+        mask = np.ones(len(self.faces), dtype=bool)
+        for name in fields:
+            values = getattr(self, name)
+            mask &= values == values[index]
+        if area_threshold is not None:
+            mask &= np.abs(self.area - self.area[index]) <= area_threshold
+        return mask
+
+    @staticmethod
+    def group_by_value(islands, values, threshold):
+        "値の相対差が threshold 以内のアイランドのグループ（グループ内はアイランドの順、グループは値の昇順）"
+        labels = tolerance_labels(values, threshold)
+        groups = [[] for _ in range(int(labels.max(initial=-1)) + 1)]
+        for island, label in zip(islands, labels.tolist()):
+            groups[label].append(island)
+        return groups
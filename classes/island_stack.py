@@ -0,0 +1,134 @@
+import numpy as np
+from dataclasses import dataclass, field
+from .mesh_arrays import MeshArrays
+from .uv_island import UVIslandManager
+from ..core.islands import group_by_label
+from ..core.stacking import (
+    LoopShape,
+    face_hashes,
+    island_fingerprints,
+    loop_correspondences,
+    procrustes,
+    apply_similarity,
+)
+
+
+@dataclass
+class StackObject:
+    "オブジェクトごとのループ配列（トポロジー順）とアイランドのループ"
+
+    arrays: MeshArrays
+    loop_twin: np.ndarray  # 同じアイランドでエッジを共有する反対側のループ（なければ -1）
+    loop_hash: np.ndarray
+    island_loops: dict  # アイランドID → ループのインデックス（面の順）
+
+
+@dataclass
+class IslandStacker:
+    """トポロジーが同じアイランドを対応するループで重ねる
+
+    transform:
+        "COPY": source のUVをそのまま写す
+        "SIMILARITY": 自分のUVの形のまま回転・拡大縮小・移動で重ねる
+        "RIGID": 自分のUVの形と大きさのまま回転・移動で重ねる
+    """
+
+    island_manager: UVIslandManager
+    transform: str = "COPY"
+    fingerprints: np.ndarray = field(default=None, repr=False)
+    _objects: dict = field(default_factory=dict, repr=False)  # id(UVObject) → StackObject
+    _shapes: dict = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        island_count = len(self.island_manager.island_table)
+        self.fingerprints = np.zeros(island_count, dtype=np.uint64)
+        for info in self.island_manager.collections:
+            if info.face_island is None or not (info.face_island >= 0).any():
+                continue
+            topology = info.get_topology()
+            face_island = info.face_island
+            face_hash = face_hashes(
+                face_island, topology.face_size, topology.loop_face, topology.edge_pair_a, topology.edge_pair_b
+            )
+            # オブジェクトごとに自分のアイランドIDの位置だけに値が入るので足し合わせる
+            with np.errstate(over="ignore"):
+                self.fingerprints += island_fingerprints(face_island, island_count, face_hash)
+
+            loop_island = face_island[topology.loop_face]
+            pair_a, pair_b = topology.edge_pair_a, topology.edge_pair_b
+            inner = (loop_island[pair_a] >= 0) & (loop_island[pair_a] == loop_island[pair_b])
+            loop_twin = np.full(len(loop_island), -1, dtype=np.int64)
+            loop_twin[pair_a[inner]] = pair_b[inner]
+            loop_twin[pair_b[inner]] = pair_a[inner]
+
+            island_loops = {}
+            for loops in group_by_label(loop_island):
+                island_loops[int(loop_island[loops[0]])] = loops
+            self._objects[id(info)] = StackObject(
+                MeshArrays.from_bmesh(info.bm, info.uv_layer, topology),
+                loop_twin,
+                face_hash[topology.loop_face],
+                island_loops,
+            )
+
+    def key(self, island):
+        "トポロジーのフィンガープリント（同じなら対応を探す）"
+        return int(self.fingerprints[island.island_id])
+
+    def shape(self, island):
+        shape = self._shapes.get(island.island_id)
+        if shape is None:
+            stack_obj = self._objects[id(island.obj_info)]
+            loops = stack_obj.island_loops[island.island_id]
+            # ループのインデックスをアイランドの中の位置にする
+            position = np.full(len(stack_obj.loop_twin), -1, dtype=np.int64)
+            position[loops] = np.arange(len(loops), dtype=np.int64)
+            twin = stack_obj.loop_twin[loops]
+            twin = np.where(twin >= 0, position[np.maximum(twin, 0)], -1)
+            arrays = stack_obj.arrays
+            shape = LoopShape.from_loops(
+                arrays.loop_face[loops], arrays.loop_vert[loops], twin, stack_obj.loop_hash[loops]
+            )
+            self._shapes[island.island_id] = shape
+        return shape
+
+    def island_uvs(self, island):
+        stack_obj = self._objects[id(island.obj_info)]
+        return stack_obj.arrays.loop_uv[stack_obj.island_loops[island.island_id]]
+
+    def stack(self, source, targets):
+        "targets を source に重ねて、重ねたアイランドを返す（対応が見つからないアイランドは除く）"
+        source_uvs = self.island_uvs(source)
+        source_shape = self.shape(source)
+        matched = []
+        for target in targets:
+            if self.key(target) != self.key(source):
+                continue
+            mappings = loop_correspondences(source_shape, self.shape(target))
+            if not mappings:
+                continue
+            target_uvs = self.island_uvs(target)
+            # 対称なアイランドは複数の対応があるので、いちばん重なる対応を選ぶ
+            candidates = np.stack([target_uvs[mapping] for mapping in mappings])
+            angle, factor, residual = procrustes(source_uvs, candidates, scale=self.transform != "RIGID")
+            best = int(np.argmin(residual))
+            if self.transform == "COPY":
+                uvs = np.empty_like(target_uvs)
+                uvs[mappings[best]] = source_uvs
+            else:
+                scale = factor[best] if self.transform == "SIMILARITY" else 1.0
+                uvs = apply_similarity(target_uvs, angle[best], scale, source_uvs.mean(axis=0))
+            self.write_uvs(target, uvs)
+            matched.append(target)
+        return matched
+
+    def write_uvs(self, island, uvs):
+        "アイランドのループにUVを書き込んで、アイランドのUVを読み直す"
+        stack_obj = self._objects[id(island.obj_info)]
+        indices = stack_obj.island_loops[island.island_id]
+        stack_obj.arrays.loop_uv[indices] = uvs
+        loops = stack_obj.arrays.loops
+        uv_layer = island.uv_layer
+        for index, uv in zip(indices.tolist(), uvs.tolist()):
+            loops[index][uv_layer].uv = uv
+        island.update_bounds()
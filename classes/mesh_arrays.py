@@ -0,0 +1,179 @@
+import numpy as np
+from dataclasses import dataclass
+from bpy.types import Mesh, MeshUVLoopLayer
+from bmesh.types import BMesh, BMFace, BMLoop, BMLayerItem
+
+LOOP_DTYPE = np.dtype([("u", np.float64), ("v", np.float64), ("select", bool)])
+FACE_DTYPE = np.dtype([("hide", bool), ("select", bool), ("uv_select", bool)])
+
+
+@dataclass
+class MeshArrays:
+    "BMeshを1回走査（またはメッシュから foreach_get）して得たループ・面・エッジのフラット配列"
+
+    faces: list[BMFace]
+    loops: list[BMLoop]
+
+    face_start: np.ndarray
+    face_size: np.ndarray
+    face_hide: np.ndarray
+    face_select: np.ndarray
+    face_uv_select: np.ndarray
+
+    loop_face: np.ndarray
+    loop_vert: np.ndarray
+    loop_edge: np.ndarray
+    loop_next: np.ndarray
+    loop_uv: np.ndarray
+    loop_uv_select_vert: np.ndarray
+
+    edge_seam: np.ndarray
+
+    vert_co: np.ndarray = None  # from_mesh のみ
+
+    @classmethod
+    def from_bmesh(cls, bm: BMesh, uv_layer: BMLayerItem, topology=None, faces=None):
+        """topology（MeshTopology）を渡すとトポロジーの配列はキャッシュを使う
+
+        faces を渡すとその面だけを読み込む（面とループは faces の並び、頂点とエッジは BMesh のインデックス）
+        """
+        subset = faces is not None
+        faces = list(faces) if subset else list(bm.faces)
+        loops = [loop for face in faces for loop in face.loops]
+        loop_count = len(loops)
+
+        if topology is not None and not subset:
+            face_start, face_size = topology.face_start, topology.face_size
+            loop_face, loop_next = topology.loop_face, topology.loop_next
+            loop_vert, loop_edge, edge_seam = topology.loop_vert, topology.loop_edge, topology.edge_seam
+        else:
+            bm.verts.index_update()
+            bm.edges.index_update()
+            face_size = np.fromiter((len(face.loops) for face in faces), dtype=np.int64, count=len(faces))
+            face_start = np.zeros(len(faces), dtype=np.int64)
+            np.cumsum(face_size[:-1], out=face_start[1:])
+
+            loop_face = np.repeat(np.arange(len(faces), dtype=np.int64), face_size)
+            # 面内で次のループ（最後のループは先頭へ戻る）
+            loop_next = np.arange(1, loop_count + 1, dtype=np.int64)
+            if len(faces):
+                loop_next[face_start + face_size - 1] = face_start
+            loop_vert = np.fromiter((loop.vert.index for loop in loops), dtype=np.int64, count=loop_count)
+            loop_edge = np.fromiter((loop.edge.index for loop in loops), dtype=np.int64, count=loop_count)
+            if subset:
+                edge_seam = np.zeros(len(bm.edges), dtype=bool)
+                loop_seam = np.fromiter((loop.edge.seam for loop in loops), dtype=bool, count=loop_count)
+                edge_seam[loop_edge[loop_seam]] = True
+            else:
+                edge_seam = np.fromiter((edge.seam for edge in bm.edges), dtype=bool, count=len(bm.edges))
+
+        # BMesh には一括で読む方法がないので、ループと面の値はそれぞれ1回の走査でまとめて読む
+        loop_data = np.fromiter(
+            ((*loop[uv_layer].uv, loop.uv_select_vert) for loop in loops), dtype=LOOP_DTYPE, count=loop_count
+        )
+        face_data = np.fromiter(
+            ((face.hide, face.select, face.uv_select) for face in faces), dtype=FACE_DTYPE, count=len(faces)
+        )
+        loop_uv = np.stack((loop_data["u"], loop_data["v"]), axis=1)
+
+        return cls(
+            faces=faces,
+            loops=loops,
+            face_start=face_start,
+            face_size=face_size,
+            face_hide=face_data["hide"].copy(),
+            face_select=face_data["select"].copy(),
+            face_uv_select=face_data["uv_select"].copy(),
+            loop_face=loop_face,
+            loop_vert=loop_vert,
+            loop_edge=loop_edge,
+            loop_next=loop_next,
+            loop_uv=loop_uv,
+            loop_uv_select_vert=loop_data["select"].copy(),
+            edge_seam=edge_seam,
+        )
+
+    @classmethod
+    def from_mesh(cls, mesh: Mesh, uv_layer: MeshUVLoopLayer):
+        "メッシュデータから読み込む（faces / loops は None、uv_layer が None ならUVは0）。編集モードでは先に update_from_editmode が必要"
+        face_count = len(mesh.polygons)
+        loop_count = len(mesh.loops)
+        edge_count = len(mesh.edges)
+
+        face_start = np.empty(face_count, dtype=np.int32)
+        face_size = np.empty(face_count, dtype=np.int32)
+        mesh.polygons.foreach_get("loop_start", face_start)
+        mesh.polygons.foreach_get("loop_total", face_size)
+        face_start = face_start.astype(np.int64)
+        face_size = face_size.astype(np.int64)
+
+        loop_face = np.repeat(np.arange(face_count, dtype=np.int64), face_size)
+        loop_next = np.arange(1, loop_count + 1, dtype=np.int64)
+        if face_count:
+            loop_next[face_start + face_size - 1] = face_start
+
+        loop_vert = np.empty(loop_count, dtype=np.int32)
+        loop_edge = np.empty(loop_count, dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", loop_vert)
+        mesh.loops.foreach_get("edge_index", loop_edge)
+
+        loop_uv = np.zeros(loop_count * 2, dtype=np.float32)
+        if uv_layer is not None:
+            uv_layer.uv.foreach_get("vector", loop_uv)
+
+        loop_uv_select_vert = np.zeros(loop_count, dtype=bool)
+        vertex_selection = getattr(uv_layer, "vertex_selection", None)
+        if vertex_selection is not None:
+            vertex_selection.foreach_get("value", loop_uv_select_vert)
+
+        face_hide = np.empty(face_count, dtype=bool)
+        face_select = np.empty(face_count, dtype=bool)
+        mesh.polygons.foreach_get("hide", face_hide)
+        mesh.polygons.foreach_get("select", face_select)
+        if face_count:
+            face_uv_select = np.logical_and.reduceat(loop_uv_select_vert, face_start)
+        else:
+            face_uv_select = np.zeros(0, dtype=bool)
+
+        edge_seam = np.empty(edge_count, dtype=bool)
+        mesh.edges.foreach_get("use_seam", edge_seam)
+
+        vert_co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", vert_co)
+
+        return cls(
+            faces=None,
+            loops=None,
+            face_start=face_start,
+            face_size=face_size,
+            face_hide=face_hide,
+            face_select=face_select,
+            face_uv_select=face_uv_select,
+            loop_face=loop_face,
+            loop_vert=loop_vert.astype(np.int64),
+            loop_edge=loop_edge.astype(np.int64),
+            loop_next=loop_next,
+            loop_uv=loop_uv.astype(np.float64).reshape(-1, 2),
+            loop_uv_select_vert=loop_uv_select_vert,
+            edge_seam=edge_seam,
+            vert_co=vert_co.astype(np.float64).reshape(-1, 3),
+        )
+
+    @staticmethod
+    def read_uvs(bm: BMesh, uv_layer: BMLayerItem, loop_count):
+        "BMesh のループUV（面の順、面ごとのループの順）(loop_count, 2)"
+        return np.fromiter(
+            (c for face in bm.faces for loop in face.loops for c in loop[uv_layer].uv),
+            dtype=np.float64,
+            count=loop_count * 2,
+        ).reshape(-1, 2)
+
+    def face_any(self, loop_values):
+        "面ごとにループの値のいずれかが True か"
+        if not len(self.face_size):
+            return np.zeros(0, dtype=bool)
+        return np.logical_or.reduceat(loop_values, self.face_start)
+
+    def face_uvs(self, face_mask):
+        "指定した面のループUVと面ごとのループ数"
+        return self.loop_uv[face_mask[self.loop_face]], self.face_size[face_mask]
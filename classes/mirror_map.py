@@ -0,0 +1,56 @@
+import numpy as np
+from dataclasses import dataclass
+from bpy.types import Object
+from bmesh.types import BMesh
+from .topology_cache import MeshTopology
+from ..core.symmetry import face_centers, grid_nearest, match_faces, match_loops, mirror_coords
+
+AXIS_INDEX = {"X": 0, "Y": 1, "Z": 2}
+
+
+@dataclass
+class MirrorMap:
+    """3D空間で対称な頂点・面・ループの対応表
+
+    インデックスは BMesh の並び（index_update 後の vert.index / face.index、面ごとのループの順）と同じ
+    """
+
+    vert_mirror: np.ndarray  # 頂点 → 対称の頂点（なければ -1）
+    face_mirror: np.ndarray  # 頂点の集合が対称な面
+    face_center_mirror: np.ndarray  # 中心が対称な面（簡易判定用）
+    loop_mirror: np.ndarray  # face_mirror の面で対称の頂点を持つループ
+    face_start: np.ndarray
+    face_size: np.ndarray
+    face_center: np.ndarray
+
+    @classmethod
+    def from_topology(cls, topology: MeshTopology, vert_co, axis_index, threshold):
+        vert_mirror = grid_nearest(vert_co, mirror_coords(vert_co, axis_index), threshold)
+        face_mirror = match_faces(topology.loop_vert, topology.face_start, topology.face_size, vert_mirror)
+        centers = face_centers(vert_co, topology.loop_vert, topology.face_start, topology.face_size)
+        return cls(
+            vert_mirror=vert_mirror,
+            face_mirror=face_mirror,
+            face_center_mirror=grid_nearest(centers, mirror_coords(centers, axis_index), threshold),
+            loop_mirror=match_loops(topology.loop_face, topology.loop_vert, face_mirror, vert_mirror),
+            face_start=topology.face_start,
+            face_size=topology.face_size,
+            face_center=centers,
+        )
+
+    @classmethod
+    def get(cls, obj: Object, bm: BMesh, axis="X", threshold=0.001):
+        "編集モードのオブジェクトの対応表（トポロジーのキャッシュと一緒にジオメトリが更新されるまで使い回す）"
+        topology = MeshTopology.get(obj, bm)
+        return topology.get_derived(
+            ("MIRROR", axis, threshold),
+            lambda: cls.from_topology(topology, topology.get_vert_co(bm), AXIS_INDEX[axis], threshold),
+        )
+
+    def face_loop_offsets(self, face_index, sym_face_index):
+        "面のループごとに、対称な面の中で対応するループの位置（face.loops のインデックス、なければ -1）"
+        start = self.face_start[face_index]
+        loops = self.loop_mirror[start : start + self.face_size[face_index]]
+        if sym_face_index != self.face_mirror[face_index]:
+            return [-1] * len(loops)
+        return np.where(loops >= 0, loops - self.face_start[sym_face_index], -1).tolist()
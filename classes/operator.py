@@ -1,8 +1,10 @@
 import bpy
 import bmesh
-import time
+import functools
 from bpy.types import Context, Object, Operator, Panel
 from bmesh.types import BMesh
+from . import profiler
+from ..globals import get_preferences
 
 DEBUG = "vscode_development" in __file__
 
@@ -13,18 +15,57 @@ class Mio3UVPanel(Panel):
         return context.area.spaces.active.mode == "UV" and context.active_object is not None
 
 
-class Mio3UVDebug:
-    _start_time = 0
+class Mio3UVProfiler:
+    "execute を計測する（フェーズの時間・カウンターは profiler.phase / profiler.count で記録する）"
 
-    def start_time(self):
-        self._start_time = time.time()
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        execute = cls.__dict__.get("execute")
+        if execute is not None and not getattr(execute, "profiled", False):
+            cls.execute = profiled(execute)
 
-    def end_time(self):
-        if DEBUG:
-            print("Time: {:.5f}".format(time.time() - self._start_time))
 
+def find_preferences():
+    "アドオンの設定（登録されていなければ None）"
+    try:
+        return get_preferences()
+    except KeyError:
+        return None
 
-class Mio3UVOperator(Operator, Mio3UVDebug):
+
+def get_profile_settings(prefs):
+    "(計測するか, cProfile を使うか)"
+    if prefs is None:
+        return DEBUG, False
+    return prefs.profile_enabled or DEBUG, prefs.profile_enabled and prefs.profile_cprofile
+
+
+def profiled(execute):
+    @functools.wraps(execute)
+    def wrapper(self, context):
+        prefs = find_preferences()
+        enabled, use_cprofile = get_profile_settings(prefs)
+        active = profiler.current()
+        # invoke から execute を呼ぶ場合などは外側の計測に含める
+        if not enabled or (active is not None and active.owner is self):
+            return execute(self, context)
+
+        profile = profiler.begin(self.bl_idname, use_cprofile, owner=self)
+        try:
+            return execute(self, context)
+        finally:
+            profiler.end(profile)
+            if DEBUG:
+                print("Time: {:.5f} {} {}".format(profile.total, profile.phases, profile.counters))
+            # 設定がない時（DEBUG で計測した場合など）は記録しない
+            if prefs is not None and prefs.profile_enabled:
+                profiler.store_record(context.window_manager.mio3uv.profile_records, profile, prefs.profile_buffer_size)
+
+    wrapper.profiled = True
+    return wrapper
+
+
+class Mio3UVOperator(Operator, Mio3UVProfiler):
     @classmethod
     def poll(cls, context):
         obj = context.active_object
@@ -74,7 +115,7 @@ class Mio3UVOperator(Operator, Mio3UVDebug):
         return False
 
 
-class Mio3UVGlobalOperator(Operator, Mio3UVDebug):
+class Mio3UVGlobalOperator(Operator, Mio3UVProfiler):
     @staticmethod
     def get_selected_objects(context):
         return [obj for obj in context.selected_objects if obj.type == "MESH"]
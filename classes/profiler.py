@@ -0,0 +1,109 @@
+import cProfile
+import io
+import json
+import pstats
+import time
+from contextlib import contextmanager
+
+PROFILE_STATS_LIMIT = 30
+
+
+class OperatorProfile:
+    "オペレーター1回分の計測（フェーズごとの時間・カウンター・cProfile）"
+
+    def __init__(self, name, use_cprofile=False, owner=None):
+        self.name = name
+        self.owner = owner
+        self.phases = {}
+        self.counters = {}
+        self.start = time.perf_counter()
+        self.total = 0.0
+        self.stats = ""
+        self._profiler = cProfile.Profile() if use_cprofile else None
+        if self._profiler:
+            self._profiler.enable()
+
+    def stop(self):
+        self.owner = None
+        self.total = time.perf_counter() - self.start
+        if self._profiler:
+            self._profiler.disable()
+            stream = io.StringIO()
+            pstats.Stats(self._profiler, stream=stream).sort_stats("cumulative").print_stats(PROFILE_STATS_LIMIT)
+            self.stats = stream.getvalue()
+            self._profiler = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self):
+        return {
+            "operator": self.name,
+            "time": time.time(),
+            "total": self.total,
+            "phases": self.phases,
+            "counters": self.counters,
+            "stats": self.stats,
+        }
+
+
+_active_profiles = []  # 実行中の計測（オペレーターの中で別のオペレーターを呼ぶ場合は入れ子になる）
+
+
+def begin(name, use_cprofile=False, owner=None):
+    profile = OperatorProfile(name, use_cprofile and not _active_profiles, owner)
+    _active_profiles.append(profile)
+    return profile
+
+
+def end(profile):
+    if profile in _active_profiles:
+        _active_profiles.remove(profile)
+    profile.stop()
+    return profile
+
+
+def current():
+    return _active_profiles[-1] if _active_profiles else None
+
+
+@contextmanager
+def phase(name):
+    "計測中ならフェーズの時間を加算する（計測していなければ何もしない）"
+    profile = current()
+    if profile is None:
+        yield
+        return
+    with profile.phase(name):
+        yield
+
+
+def count(name, value=1):
+    profile = current()
+    if profile is not None:
+        profile.count(name, value)
+
+
+def store_record(records, profile: OperatorProfile, buffer_size):
+    "リングバッファ（CollectionProperty）に記録を追加する"
+    record = records.add()
+    record.name = profile.name
+    record.total = profile.total
+    record.data = json.dumps(profile.to_dict())
+    while len(records) > buffer_size:
+        records.remove(0)
+
+
+def export_records(records, filepath):
+    data = [json.loads(record.data) for record in records]
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    return len(data)
@@ -0,0 +1,96 @@
+import numpy as np
+from dataclasses import dataclass
+from bmesh.types import BMesh
+
+
+def pack_flags(values, count):
+    "bool のイテラブルをビット列（np.packbits）にする"
+    return np.packbits(np.fromiter(values, dtype=bool, count=count))
+
+
+def unpack_flags(bits, count):
+    return np.unpackbits(bits, count=count).astype(bool).tolist()
+
+
+@dataclass
+class SelectionSnapshot:
+    """UV選択（ループの頂点・エッジ、面）とメッシュ選択（頂点・エッジ・面）のスナップショット
+
+    状態はビット列で持ち、復元は保存した要素だけをまとめて書き戻す
+    faces / loops を渡さなければメッシュ全体を対象にする
+    """
+
+    bm: BMesh
+    faces: list
+    loops: list
+    loop_uv_select_vert: np.ndarray
+    loop_uv_select_edge: np.ndarray
+    face_uv_select: np.ndarray = None
+    vert_select: np.ndarray = None
+    edge_select: np.ndarray = None
+    face_select: np.ndarray = None
+    vert_count: int = 0
+    edge_count: int = 0
+
+    @classmethod
+    def capture(cls, bm: BMesh, faces=None, loops=None, uv_faces=True, mesh_select=None):
+        """現在の選択を保存する
+
+        uv_faces: 面のUV選択も保存する
+        mesh_select: メッシュの選択も保存する（省略時はメッシュ全体を対象にした時だけ）
+        """
+        whole = faces is None and loops is None
+        if mesh_select is None:
+            mesh_select = whole
+        faces = list(bm.faces) if faces is None else list(faces)
+        if loops is None:
+            loops = [loop for face in faces for loop in face.loops]
+        loop_count = len(loops)
+        face_count = len(faces)
+
+        snapshot = cls(
+            bm,
+            faces if uv_faces or mesh_select else None,
+            loops,
+            pack_flags((loop.uv_select_vert for loop in loops), loop_count),
+            pack_flags((loop.uv_select_edge for loop in loops), loop_count),
+        )
+        if uv_faces:
+            snapshot.face_uv_select = pack_flags((face.uv_select for face in faces), face_count)
+        if mesh_select:
+            snapshot.vert_select = pack_flags((vert.select for vert in bm.verts), len(bm.verts))
+            snapshot.edge_select = pack_flags((edge.select for edge in bm.edges), len(bm.edges))
+            snapshot.face_select = pack_flags((face.select for face in faces), face_count)
+            snapshot.vert_count = len(bm.verts)
+            snapshot.edge_count = len(bm.edges)
+        return snapshot
+
+    def restore(self, flush=True):
+        "保存した選択を書き戻す（flush=False の場合は呼び出し側で flush する）"
+        bm = self.bm
+        loops = self.loops
+        loop_count = len(loops)
+        uv_select_vert = unpack_flags(self.loop_uv_select_vert, loop_count)
+        uv_select_edge = unpack_flags(self.loop_uv_select_edge, loop_count)
+        for loop, select_vert, select_edge in zip(loops, uv_select_vert, uv_select_edge):
+            loop.uv_select_vert = select_vert
+            loop.uv_select_edge = select_edge
+
+        if self.face_uv_select is not None:
+            for face, select in zip(self.faces, unpack_flags(self.face_uv_select, len(self.faces))):
+                face.uv_select = select
+
+        if self.vert_select is not None:
+            # 頂点・エッジ数が変わっていたらメッシュの頂点・エッジの選択は復元しない
+            if len(bm.verts) == self.vert_count and len(bm.edges) == self.edge_count:
+                for vert, select in zip(bm.verts, unpack_flags(self.vert_select, self.vert_count)):
+                    vert.select = select
+                for edge, select in zip(bm.edges, unpack_flags(self.edge_select, self.edge_count)):
+                    edge.select = select
+            for face, select in zip(self.faces, unpack_flags(self.face_select, len(self.faces))):
+                face.select = select
+            if flush:
+                bm.select_flush_mode()
+
+        if flush and bm.uv_select_sync_valid:
+            bm.uv_select_flush_mode()
@@ -0,0 +1,253 @@
+import numpy as np
+from dataclasses import dataclass
+from bpy.types import Object
+from . import profiler
+from .mesh_arrays import MeshArrays
+from .uv_island import UVIslandManager, UVObject
+from ..core.coverage import face_areas
+from ..core.islands import face_loop_indices, find_island_labels
+from ..core.parallel import map_kernel
+from ..core.texel import (
+    face_world_areas,
+    texel_densities,
+    weighted_density,
+    segment_centers,
+    scale_segments,
+    island_uv_bounds,
+)
+from ..globals import get_preferences
+
+
+@dataclass
+class TexelAreas:
+    "アイランドごとのワールド面積・UV面積・テクスチャのピクセル数（インデックスはアイランドID）"
+
+    world_area: np.ndarray
+    uv_area: np.ndarray
+    pixels: np.ndarray
+
+    def densities(self):
+        "アイランドごとのテクセル密度"
+        return texel_densities(self.world_area, self.uv_area, self.pixels)
+
+    def average(self):
+        "面積で重み付けした平均のテクセル密度"
+        return weighted_density(self.densities(), self.world_area)
+
+
+@dataclass
+class TexelDensity(TexelAreas):
+    """編集モードのアイランドのテクセル密度
+
+    オブジェクトごとに頂点を1回の行列積でワールド座標にして、面ごとの面積を np.bincount でアイランドにまとめる
+    """
+
+    island_manager: UVIslandManager = None
+
+    @classmethod
+    def from_manager(cls, island_manager: UVIslandManager, texture_size, face_mask=None):
+        """texture_size: オブジェクト → (幅, 高さ)
+        face_mask: UVObject → 面ごとの対象フラグ（省略時はアイランドのすべての面）
+        """
+        island_count = len(island_manager.island_table)
+        world_area = np.zeros(island_count, dtype=np.float64)
+        uv_area = np.zeros(island_count, dtype=np.float64)
+        pixels = np.zeros(island_count, dtype=np.float64)
+
+        islands_by_object = {}
+        for island in island_manager.islands:
+            islands_by_object.setdefault(id(island.obj_info), []).append(island)
+
+        for info in island_manager.collections:
+            islands = islands_by_object.get(id(info))
+            if not islands:
+                continue
+            topology = info.get_topology()
+            face_island = info.face_island
+            faces = np.flatnonzero(face_island >= 0)
+            if face_mask is not None:
+                faces = faces[face_mask(info)[faces]]
+            if not len(faces):
+                continue
+
+            # UVはアイランドが持っている配列をトポロジーの並びに集める
+            loop_uv = np.zeros((len(topology.loop_face), 2), dtype=np.float64)
+            for island in islands:
+                indices = face_loop_indices(topology.face_start, topology.face_size, island.get_face_indices())
+                loop_uv[indices] = island.uvs
+
+            face_size = topology.face_size[faces]
+            loops = face_loop_indices(topology.face_start, topology.face_size, faces)
+            sub_start = np.zeros(len(faces), dtype=np.int64)
+            np.cumsum(face_size[:-1], out=sub_start[1:])
+            face_world = face_world_areas(
+                topology.get_vert_co(info.bm), info.obj.matrix_world, topology.loop_vert[loops], sub_start, face_size
+            )
+            face_uv = face_areas(loop_uv[loops], sub_start, face_size)
+
+            labels = face_island[faces]
+            world_area += np.bincount(labels, weights=face_world, minlength=island_count)
+            uv_area += np.bincount(labels, weights=face_uv, minlength=island_count)
+            size_x, size_y = texture_size(info.obj)
+            pixels[np.unique(labels)] = size_x * size_y
+
+        return cls(world_area, uv_area, pixels, island_manager)
+
+    def center(self):
+        "すべてのアイランドの範囲の中心"
+        islands = self.island_manager.islands
+        min_x = min(island.min_uv.x for island in islands)
+        min_y = min(island.min_uv.y for island in islands)
+        max_x = max(island.max_uv.x for island in islands)
+        max_y = max(island.max_uv.y for island in islands)
+        return np.array(((min_x + max_x) / 2, (min_y + max_y) / 2))
+
+    def scale_islands(self, factors, pivot=None):
+        """アイランドごとのUVを pivot（省略時はアイランドの中心）を中心に factors 倍する
+
+        factors のインデックスはアイランドID。0以下のアイランドは変更しない
+        """
+        islands = [island for island in self.island_manager.islands if factors[island.island_id] > 0]
+        if not islands:
+            return
+        ids = np.array([island.island_id for island in islands], dtype=np.int64)
+        counts = np.array([len(island.uvs) for island in islands], dtype=np.int64)
+        offsets = np.zeros(len(islands), dtype=np.int64)
+        np.cumsum(counts[:-1], out=offsets[1:])
+        uvs = np.concatenate([island.uvs for island in islands])
+        if pivot is None:
+            pivots = segment_centers(uvs, offsets)
+        else:
+            pivots = np.tile(np.asarray(pivot, dtype=np.float64), (len(islands), 1))
+
+        scaled = scale_segments(uvs, counts, np.asarray(factors)[ids], pivots)
+        for island, island_uvs in zip(islands, np.split(scaled, offsets[1:])):
+            island.set_uvs(island_uvs)
+
+
+@dataclass
+class MeshTexelObject:
+    "オブジェクトモードで読み込んだメッシュの配列とループのアイランドID"
+
+    obj: Object
+    arrays: MeshArrays
+    loop_island: np.ndarray  # ループ → アイランドID（すべてのオブジェクトで通し番号）
+
+
+@dataclass
+class MeshTexelDensity(TexelAreas):
+    """オブジェクトモードのテクセル密度（編集モードに切り替えない）
+
+    メッシュ全体を foreach_get で読み込んでアイランドを検出し、スケールしたUVは foreach_set で書き戻す
+    """
+
+    objects: list[MeshTexelObject] = None
+
+    @classmethod
+    def from_objects(cls, objects: list[Object], texture_size):
+        """texture_size: オブジェクト → (幅, 高さ)
+
+        アイランドの検出はオブジェクトごとに独立しているので、設定で有効なら map_kernel で別プロセスに分けて実行する
+        """
+        meshes = []
+        for obj in objects:
+            mesh = obj.data
+            uv_layer = mesh.uv_layers.active
+            if uv_layer is None or not len(mesh.polygons):
+                continue
+            meshes.append((obj, MeshArrays.from_mesh(mesh, uv_layer)))
+
+        jobs = []
+        for _, arrays in meshes:
+            face_count = len(arrays.face_start)
+            all_faces = np.ones(face_count, dtype=bool)
+            jobs.append(
+                {
+                    "loop_face": arrays.loop_face,
+                    "loop_vert": arrays.loop_vert,
+                    "loop_edge": arrays.loop_edge,
+                    "loop_next": arrays.loop_next,
+                    "loop_uv": arrays.loop_uv,
+                    "edge_seam": arrays.edge_seam,
+                    "face_enabled": all_faces,
+                    "face_hide": np.zeros(face_count, dtype=bool),
+                    "seeds": all_faces,
+                }
+            )
+        prefs = get_preferences()
+        with profiler.phase("islands"):
+            results = map_kernel(find_island_labels, jobs, workers=prefs.parallel_workers, parallel=prefs.parallel_enabled)
+
+        texel_objects = []
+        world_parts = []
+        uv_parts = []
+        pixel_parts = []
+        island_count = 0
+        for (obj, arrays), labels in zip(meshes, results):
+            # ラベルは連結成分の代表の面なので、0からの通し番号にする
+            valid = labels >= 0
+            roots, labels[valid] = np.unique(labels[valid], return_inverse=True)
+            count = len(roots)
+            if not count:
+                continue
+
+            face_world = face_world_areas(
+                arrays.vert_co, obj.matrix_world, arrays.loop_vert, arrays.face_start, arrays.face_size
+            )
+            face_uv = face_areas(arrays.loop_uv, arrays.face_start, arrays.face_size)
+            world_parts.append(np.bincount(labels[valid], weights=face_world[valid], minlength=count))
+            uv_parts.append(np.bincount(labels[valid], weights=face_uv[valid], minlength=count))
+            size_x, size_y = texture_size(obj)
+            pixel_parts.append(np.full(count, float(size_x * size_y)))
+
+            loop_island = labels[arrays.loop_face]
+            loop_island[loop_island >= 0] += island_count
+            texel_objects.append(MeshTexelObject(obj, arrays, loop_island))
+            island_count += count
+
+        def join(parts):
+            return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float64)
+
+        return cls(join(world_parts), join(uv_parts), join(pixel_parts), texel_objects)
+
+    def bounds(self):
+        "アイランドごとのUVの範囲 (min, max)"
+        island_count = len(self.world_area)
+        lower = np.full((island_count, 2), np.inf)
+        upper = np.full((island_count, 2), -np.inf)
+        for texel_obj in self.objects:
+            obj_lower, obj_upper = island_uv_bounds(texel_obj.arrays.loop_uv, texel_obj.loop_island, island_count)
+            np.minimum(lower, obj_lower, out=lower)
+            np.maximum(upper, obj_upper, out=upper)
+        return lower, upper
+
+    def center(self):
+        "すべてのアイランドの範囲の中心"
+        lower, upper = self.bounds()
+        return (lower.min(axis=0) + upper.max(axis=0)) * 0.5
+
+    def scale_islands(self, factors, pivot=None):
+        """アイランドごとのUVを pivot（省略時はアイランドの中心）を中心に factors 倍して、メッシュに書き戻す
+
+        factors のインデックスはアイランドID。0以下のアイランドは変更しない
+        """
+        factors = np.asarray(factors, dtype=np.float64)
+        if pivot is None:
+            lower, upper = self.bounds()
+            pivots = (lower + upper) * 0.5
+        else:
+            pivots = np.tile(np.asarray(pivot, dtype=np.float64), (len(factors), 1))
+
+        for texel_obj in self.objects:
+            loop_island = texel_obj.loop_island
+            loops = np.flatnonzero(loop_island >= 0)
+            loops = loops[factors[loop_island[loops]] > 0]
+            if not len(loops):
+                continue
+            islands = loop_island[loops]
+            loop_uv = texel_obj.arrays.loop_uv
+            loop_uv[loops] = pivots[islands] + (loop_uv[loops] - pivots[islands]) * factors[islands][:, None]
+
+            mesh = texel_obj.obj.data
+            mesh.uv_layers.active.uv.foreach_set("vector", loop_uv.astype(np.float32).ravel())
+            mesh.update()
@@ -0,0 +1,170 @@
+import bpy
+import numpy as np
+from dataclasses import dataclass, field
+from bpy.types import Mesh, Object
+from bmesh.types import BMesh
+from ..core.islands import edge_loop_pairs
+
+
+@dataclass
+class MeshTopology:
+    """メッシュごとのトポロジーのキャッシュ（UVや選択に依存しない配列）
+
+    ジオメトリが更新されるまで（depsgraph_handler で破棄）複数のオペレーターで使い回す
+    取得するたびに BMesh の要素数だけを確認する。インデックスは BMesh の並び（面の順、面ごとのループの順）と同じ
+    """
+
+    signature: tuple  # BMesh の (頂点数, エッジ数, 面数)
+    face_start: np.ndarray
+    face_size: np.ndarray
+    loop_face: np.ndarray
+    loop_vert: np.ndarray
+    loop_edge: np.ndarray
+    loop_next: np.ndarray
+    edge_seam: np.ndarray
+    vert_count: int
+
+    # エッジ → ループ（ちょうど2つのループを持つエッジ）
+    edge_pair_a: np.ndarray = field(init=False, repr=False)
+    edge_pair_b: np.ndarray = field(init=False, repr=False)
+    # UVと条件のハッシュ → 面ごとのアイランドラベル
+    island_labels: dict = field(default_factory=dict, repr=False)
+    # 頂点の位置とそれから求めたものは、ジオメトリの更新でキャッシュごと破棄されるので一緒に持つ
+    vert_co: np.ndarray = field(default=None, repr=False)  # 頂点のローカル座標 (頂点数, 3)
+    # (種類, 条件...) → トポロジーと頂点の位置から求めた値（MirrorMap・UVノードのグラフ・Relax の重みなど）
+    derived: dict = field(default_factory=dict, repr=False)
+
+    _cache = {}  # メッシュの session_uid → MeshTopology（古いものから破棄する）
+    _uv_updates = set()  # UVと選択だけを更新したメッシュ（次のジオメトリの更新ではキャッシュを残す）
+    CACHE_SIZE = 8
+    LABEL_CACHE_SIZE = 4
+    DERIVED_CACHE_SIZE = 8
+
+    def __post_init__(self):
+        self.edge_pair_a, self.edge_pair_b = edge_loop_pairs(self.loop_edge, len(self.edge_seam))
+
+    @staticmethod
+    def bmesh_signature(bm: BMesh):
+        return (len(bm.verts), len(bm.edges), len(bm.faces))
+
+    @classmethod
+    def get(cls, obj: Object, bm: BMesh):
+        "編集モードのオブジェクトのトポロジー（キャッシュがあれば返す）"
+        key = obj.data.session_uid
+        signature = cls.bmesh_signature(bm)
+        cached = cls._cache.pop(key, None)
+        if cached is None or cached.signature != signature:
+            cached = cls.from_bmesh(bm, signature)
+        cls._cache[key] = cached
+        while len(cls._cache) > cls.CACHE_SIZE:
+            del cls._cache[next(iter(cls._cache))]
+        return cached
+
+    @classmethod
+    def from_bmesh(cls, bm: BMesh, signature=None):
+        bm.verts.index_update()
+        bm.edges.index_update()
+        faces = bm.faces
+        face_count = len(faces)
+        face_size = np.fromiter((len(face.loops) for face in faces), dtype=np.int64, count=face_count)
+        face_start = np.zeros(face_count, dtype=np.int64)
+        np.cumsum(face_size[:-1], out=face_start[1:])
+        loop_count = int(face_size.sum())
+
+        # 頂点とエッジのインデックスはループを1回だけ走査して読む
+        loop_indices = np.fromiter(
+            (i for face in faces for loop in face.loops for i in (loop.vert.index, loop.edge.index)),
+            dtype=np.int64,
+            count=loop_count * 2,
+        ).reshape(-1, 2)
+        loop_next = np.arange(1, loop_count + 1, dtype=np.int64)
+        if face_count:
+            loop_next[face_start + face_size - 1] = face_start
+
+        return cls(
+            signature=signature or cls.bmesh_signature(bm),
+            face_start=face_start,
+            face_size=face_size,
+            loop_face=np.repeat(np.arange(face_count, dtype=np.int64), face_size),
+            loop_vert=np.ascontiguousarray(loop_indices[:, 0]),
+            loop_edge=np.ascontiguousarray(loop_indices[:, 1]),
+            loop_next=loop_next,
+            edge_seam=np.fromiter((edge.seam for edge in bm.edges), dtype=bool, count=len(bm.edges)),
+            vert_count=len(bm.verts),
+        )
+
+    @classmethod
+    def mark_uv_update(cls, mesh: Mesh):
+        "UV・選択・属性だけを変更して update_edit_mesh するメッシュ（トポロジーと頂点の位置のキャッシュを残す）"
+        cls._uv_updates.add(mesh.session_uid)
+
+    @classmethod
+    def invalidate(cls, mesh: Mesh):
+        key = mesh.session_uid
+        if key not in cls._uv_updates:
+            cls._cache.pop(key, None)
+
+    @classmethod
+    def clear_cache(cls):
+        cls._cache.clear()
+        cls._uv_updates.clear()
+
+    def get_vert_co(self, bm: BMesh):
+        if self.vert_co is None:
+            self.vert_co = np.fromiter(
+                (c for vert in bm.verts for c in vert.co), dtype=np.float64, count=len(bm.verts) * 3
+            ).reshape(-1, 3)
+        return self.vert_co
+
+    def get_island_labels(self, key, compute):
+        "同じUVと条件のアイランドラベルがあれば再利用する"
+        return self.get_cached(self.island_labels, key, compute, self.LABEL_CACHE_SIZE)
+
+    def get_derived(self, key, compute):
+        "key の値がなければ compute() で求めて保持する（古いものから破棄する）"
+        return self.get_cached(self.derived, key, compute, self.DERIVED_CACHE_SIZE)
+
+    @staticmethod
+    def get_cached(cache, key, compute, size):
+        value = cache.pop(key, None)
+        if value is None:
+            value = compute()
+        cache[key] = value
+        while len(cache) > size:
+            del cache[next(iter(cache))]
+        return value
+
+
+def updated_meshes(depsgraph):
+    "ジオメトリが更新されたメッシュ（オリジナルのデータ）"
+    for update in depsgraph.updates:
+        if not update.is_updated_geometry:
+            continue
+        id_data = update.id.original
+        if isinstance(id_data, Object):
+            id_data = id_data.data
+        if isinstance(id_data, Mesh):
+            yield id_data
+
+
+@bpy.app.handlers.persistent
+def depsgraph_handler(scene, depsgraph):
+    for mesh in updated_meshes(depsgraph):
+        MeshTopology.invalidate(mesh)
+    MeshTopology._uv_updates.clear()
+
+
+@bpy.app.handlers.persistent
+def load_handler(dummy):
+    MeshTopology.clear_cache()
+
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(depsgraph_handler)
+    bpy.app.handlers.load_post.append(load_handler)
+
+
+def unregister():
+    bpy.app.handlers.load_post.remove(load_handler)
+    bpy.app.handlers.depsgraph_update_post.remove(depsgraph_handler)
+    MeshTopology.clear_cache()
@@ -1,8 +1,15 @@
 import bmesh
+import numpy as np
 from mathutils import Vector
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from bpy.types import Object
 from bmesh.types import BMVert, BMLoop, BMLayerItem, BMesh, BMFace, BMEdge
+from .mesh_arrays import MeshArrays
+from .selection import SelectionSnapshot
+from .uv_weld import UVWeldIndex
+from .topology_cache import MeshTopology
+from . import profiler
+from ..core.uv_graph import UVNodeGraph, build_uv_graph
 
 
 @dataclass
@@ -11,6 +18,15 @@ class UVNodeObject:
     bm: BMesh = None
     uv_layer: BMLayerItem = None
     original_uv_select_sync_valid: bool = False
+    topology: MeshTopology = None  # アイランドから作成した場合は共有する
+    arrays: MeshArrays = field(default=None, repr=False)  # グラフを作成した時の配列（arrays.loops はループインデックス → BMLoop）
+    graph_key: tuple = field(default=None, repr=False)  # グラフのキャッシュのキー（トポロジーのキャッシュから作成した時）
+    dirty: bool = field(default=False, compare=False)  # UVか選択を変更した（update_uvmeshes で更新する）
+
+    def get_topology(self):
+        if self.topology is None:
+            self.topology = MeshTopology.get(self.obj, self.bm)
+        return self.topology
 
 
 @dataclass
@@ -49,20 +65,108 @@ class UVNode:
 
 @dataclass
 class UVNodeGroup:
-    nodes: list["UVNode"] = field(default_factory=list)
+    """接続されたUVノードのグループ
+
+    graph から作成した場合は node_ids（グラフのノード）だけを持ち、UVNode は nodes を参照した時に作成する。
+    作成した後は UVNode が正になる
+    """
+
+    _nodes: set["UVNode"] = field(default=None, repr=False)
     obj_info: UVNodeObject = None
+    graph: UVNodeGraph = field(default=None, repr=False)
+    node_ids: np.ndarray = field(default=None, repr=False)
 
     min_uv: Vector = field(default_factory=lambda: Vector((float("inf"), float("inf"))))
     max_uv: Vector = field(default_factory=lambda: Vector((float("-inf"), float("-inf"))))
     center: Vector = field(default_factory=lambda: Vector((0, 0)))
     median_center: Vector = field(default_factory=lambda: Vector((0, 0)))
 
-    selection_states: dict[int, bool] = field(default_factory=dict)
+    selection: SelectionSnapshot = field(default=None, repr=False)
 
     def __post_init__(self):
-        if self.nodes:
+        if self.node_count:
             self.update_bounds()
 
+    @property
+    def nodes(self):
+        if self._nodes is None:
+            self._nodes = self.build_nodes()
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, nodes):
+        self._nodes = nodes
+
+    @property
+    def is_graph(self):
+        "UVNode を作成せずにグラフの配列で扱えるか"
+        return self._nodes is None and self.graph is not None
+
+    @property
+    def node_count(self):
+        if self._nodes is not None:
+            return len(self._nodes)
+        return len(self.node_ids) if self.node_ids is not None else 0
+
+    def build_nodes(self):
+        "グラフのノードから UVNode を作成する"
+        graph = self.graph
+        if graph is None:
+            return set()
+        bm_loops = self.obj_info.arrays.loops
+        nodes = {}
+        for node_id in self.node_ids.tolist():
+            loop_indices = graph.loops(node_id).tolist()
+            nodes[node_id] = UVNode(
+                uv=Vector(graph.node_uv[node_id].tolist()),
+                vert=bm_loops[loop_indices[0]].vert,
+                loops={bm_loops[index] for index in loop_indices},
+                select=True,
+            )
+        for node_id, node in nodes.items():
+            node.neighbors = {nodes[n] for n in graph.neighbors(node_id).tolist() if n in nodes}
+        return set(nodes.values())
+
+    @property
+    def uvs(self):
+        "ノードのUV (N, 2)。並びは node_ids（UVNode を作成した後は nodes）の順"
+        if self.is_graph:
+            return self.graph.node_uv[self.node_ids]
+        return np.array([node.uv for node in self.nodes], dtype=np.float64).reshape(-1, 2)
+
+    def set_uvs(self, uvs):
+        "ノードのUVを置き換える（bmeshへの書き戻しは update_uvs）"
+        if self.is_graph:
+            self.graph.node_uv[self.node_ids] = uvs
+        else:
+            for node, uv in zip(self.nodes, np.asarray(uvs).tolist()):
+                node.uv = Vector(uv)
+
+    @property
+    def loops(self):
+        "グループのすべてのループ"
+        if self.is_graph:
+            bm_loops = self.obj_info.arrays.loops
+            return [bm_loops[index] for index in self.graph.loops_of(self.node_ids)[0].tolist()]
+        return [loop for node in self.nodes for loop in node.loops]
+
+    def ordered_node_ids(self):
+        "get_ordered_nodes と同じ順序のノードID"
+        return self.graph.ordered_nodes(self.node_ids)
+
+    def first_loops(self):
+        "ノードごとの代表のループ（面とループのインデックスが最小のもの）。並びは uvs と同じ"
+        if self.is_graph:
+            bm_loops = self.obj_info.arrays.loops
+            return [bm_loops[index] for index in self.graph.first_loops()[self.node_ids].tolist()]
+        return [min(node.loops, key=lambda loop: (loop.face.index, loop.index)) for node in self.nodes]
+
+    def node_vert_cos(self, node_ids=None):
+        "ノードの頂点座標 (N, 3)。node_ids を省略するとグループのノード"
+        bm_loops = self.obj_info.arrays.loops
+        first = self.graph.first_loops()[self.node_ids if node_ids is None else node_ids]
+        return np.array([bm_loops[index].vert.co for index in first.tolist()], dtype=np.float64).reshape(-1, 3)
+
     @property
     def obj(self):
         return self.obj_info.obj
@@ -90,49 +194,52 @@ class UVNodeGroup:
             return NotImplemented
         return self.uv == other.uv and self.vert == other.vert
 
-    def update_uvs(self):
-        "UVノードのUVを更新"
-        for node in self.nodes:
-            node.update_uv(self.obj_info.uv_layer)
+    def update_uvs(self, node_mask=None):
+        "UVノードのUVを更新（node_mask: 更新するノード、並びは uvs と同じ）"
+        uv_layer = self.obj_info.uv_layer
+        self.obj_info.dirty = True
+        if self.is_graph:
+            bm_loops = self.obj_info.arrays.loops
+            node_ids = self.node_ids if node_mask is None else self.node_ids[node_mask]
+            loop_indices, owner = self.graph.loops_of(node_ids)
+            for index, uv in zip(loop_indices.tolist(), self.graph.node_uv[node_ids][owner].tolist()):
+                bm_loops[index][uv_layer].uv = uv
+            return
+        if node_mask is None:
+            for node in self.nodes:
+                node.update_uv(uv_layer)
+        else:
+            for node, update in zip(self.nodes, node_mask):
+                if update:
+                    node.update_uv(uv_layer)
 
     def uv_select_set_all(self, select):
         "グループ内のすべてのUVを選択/非選択にする"
-        for node in self.nodes:
-            for loop in node.loops:
-                loop.uv_select_vert = select
-                loop.uv_select_edge = select
+        self.obj_info.dirty = True
+        for loop in self.loops:
+            loop.uv_select_vert = select
+            loop.uv_select_edge = select
 
         if self.obj_info.bm.uv_select_sync_valid:
             self.obj_info.bm.uv_select_flush_mode()
 
     def store_selection(self):
         "現在のUV選択状態を保存"
-        self.selection_states.clear()
-        for node in self.nodes:
-            for loop in node.loops:
-                self.selection_states[loop.index] = (loop.uv_select_vert, loop.uv_select_edge)
+        self.selection = SelectionSnapshot.capture(self.obj_info.bm, loops=self.loops, uv_faces=False)
 
-    def restore_selection(self):
+    def restore_selection(self, flush=True):
         "保存したUV選択状態を復元"
-        for node in self.nodes:
-            for loop in node.loops:
-                if loop.index in self.selection_states:
-                    uv_select_vert, uv_select_edge = self.selection_states[loop.index]
-                    loop.uv_select_vert = uv_select_vert
-                    loop.uv_select_edge = uv_select_edge
-
-        if self.obj_info.bm.uv_select_sync_valid:
-            self.obj_info.bm.uv_select_flush_mode()
+        if self.selection is not None:
+            self.selection.restore(flush)
+            self.obj_info.dirty = True
 
     def update_bounds(self):
         "バウンディングボックス・中心・min/maxを計算"
-        uv_points = [node.uv for node in self.nodes]
-        x_coords = [uv.x for uv in uv_points]
-        y_coords = [uv.y for uv in uv_points]
-        self.min_uv = Vector((min(x_coords), min(y_coords)))
-        self.max_uv = Vector((max(x_coords), max(y_coords)))
+        uvs = self.uvs
+        self.min_uv = Vector(uvs.min(axis=0).tolist())
+        self.max_uv = Vector(uvs.max(axis=0).tolist())
         self.center = Vector(((self.min_uv.x + self.max_uv.x) / 2, (self.min_uv.y + self.max_uv.y) / 2))
-        self.median_center = Vector((sum(x_coords) / len(uv_points), sum(y_coords) / len(uv_points)))
+        self.median_center = Vector(uvs.mean(axis=0).tolist())
 
     def get_ordered_nodes(self):
         "順序付けしたノードリストを取得"
@@ -162,15 +269,16 @@ class UVNodeGroup:
 
     def set_pin(self, state):
         uv_layer = self.obj_info.uv_layer
-        for node in self.nodes:
-            for loop in node.loops:
-                loop[uv_layer].pin_uv = state
+        self.obj_info.dirty = True
+        for loop in self.loops:
+            loop[uv_layer].pin_uv = state
+
 
 @dataclass
 class UVNodeManager:
     objects: list[Object]
     sync: bool = False
-    node_key_mode: str = "UV"  # "UV" or "VERT_AND_UV"
+    node_key_mode: str = "UV"  # "UV", "VERT_AND_UV" or "UV_VERTEX"（UVWeldIndex のモード）
     obj: Object = None
     bm: BMesh = None
     uv_layer: BMLayerItem = None
@@ -178,7 +286,16 @@ class UVNodeManager:
     collections: list[UVNodeObject] = field(default_factory=list)
     groups: list[UVNodeGroup] = field(default_factory=list)
 
+    _engine = "ARRAY"  # "ARRAY" or "PYTHON"
+
     def __post_init__(self):
+        with profiler.phase("node_build"):
+            self.find_all_nodes()
+        if profiler.current():
+            profiler.count("node_groups", len(self.groups))
+            profiler.count("nodes", sum(group.node_count for group in self.groups))
+
+    def find_all_nodes(self):
         for obj in self.objects:
             bm = bmesh.from_edit_mesh(obj.data)
             uv_layer = bm.loops.layers.uv.verify()
@@ -189,19 +306,79 @@ class UVNodeManager:
 
             obj_info = UVNodeObject(obj, bm, uv_layer, uv_sync_valid)
             self.collections.append(obj_info)
+            self.groups.extend(self.find_node_groups(obj_info))
+
+    def find_node_groups(self, obj_info: UVNodeObject, sub_faces=None):
+        if self._engine == "ARRAY":
+            graph = self.find_uv_graph(obj_info, sub_faces)
+            return [UVNodeGroup(None, obj_info, graph, node_ids) for node_ids in graph.components()]
+        uv_groups = self.find_uv_nodes(obj_info.bm, obj_info.uv_layer, sub_faces=sub_faces)
+        return [UVNodeGroup(group, obj_info) for group in uv_groups]
+
+    def find_uv_graph(self, obj_info: UVNodeObject, sub_faces=None):
+        "find_uv_nodes と同じ条件でUVノードのグラフを作る"
+        bm = obj_info.bm
+        if sub_faces:
+            # sub_faces とエッジで隣接する面だけを読み込む（接続の判定にエッジの他の面のループも使うため）
+            faces = list(sub_faces)
+            face_set = set(faces)
+            for face in list(faces):
+                for edge in face.edges:
+                    for link_face in edge.link_faces:
+                        if link_face not in face_set:
+                            face_set.add(link_face)
+                            faces.append(link_face)
+            arrays = MeshArrays.from_bmesh(bm, obj_info.uv_layer, faces=faces)
+        else:
+            arrays = MeshArrays.from_bmesh(bm, obj_info.uv_layer, obj_info.get_topology())
+        loops = arrays.loops
+        obj_info.arrays = arrays
 
-            uv_groups = self.find_uv_nodes(bm, uv_layer)
-            for group in uv_groups:
-                self.groups.append(UVNodeGroup(group, obj_info))
+        if self.sync:
+            vert_select = np.fromiter((vert.select for vert in bm.verts), dtype=bool, count=len(bm.verts))
+            candidate = vert_select[arrays.loop_vert] & arrays.loop_uv_select_vert
+        else:
+            candidate = arrays.face_select[arrays.loop_face] & arrays.loop_uv_select_vert
+        if sub_faces:
+            candidate &= arrays.loop_face < len(sub_faces)
+
+        loop_uv_select_edge = np.fromiter((loop.uv_select_edge for loop in loops), dtype=bool, count=len(loops))
+
+        def build():
+            return build_uv_graph(
+                arrays.loop_uv,
+                arrays.loop_vert,
+                arrays.loop_edge,
+                arrays.loop_next,
+                candidate,
+                loop_uv_select_edge,
+                UVWeldIndex(arrays).labels(self.node_key_mode),
+            )
+
+        if sub_faces:
+            return build()
+        # UVと選択が同じならトポロジーのキャッシュのグラフを使う（node_uv はグループが書き換えるので複製する）
+        obj_info.graph_key = (
+            "UV_GRAPH",
+            self.node_key_mode,
+            hash((arrays.loop_uv.tobytes(), candidate.tobytes(), loop_uv_select_edge.tobytes())),
+        )
+        graph = obj_info.get_topology().get_derived(obj_info.graph_key, build)
+        return replace(graph, node_uv=graph.node_uv.copy())
 
     def find_uv_nodes(self, bm, uv_layer, sub_faces=None):
         uv_nodes = {}
+        weld = UVWeldIndex.from_bmesh(bm, uv_layer)
+        labels = weld.labels(self.node_key_mode).tolist()
+        label_uvs = weld.label_uvs(self.node_key_mode)
+
+        def get_loop_key(loop):
+            return labels[weld.position(loop)]
 
         def add_uv_node(loop):
-            key = self.get_loop_key(loop, uv_layer)
-            uv_key = self.get_uv_key(loop[uv_layer].uv)
+            key = get_loop_key(loop)
             if key not in uv_nodes:
-                uv_nodes[key] = UVNode(uv=Vector(uv_key), vert=loop.vert, select=loop.uv_select_vert)
+                uv_nodes[key] = UVNode(uv=Vector(label_uvs[key]), vert=loop.vert, select=loop.uv_select_vert)
             else:
                 if loop.uv_select_vert and not uv_nodes[key].select:
                     uv_nodes[key].select = True
@@ -210,8 +387,8 @@ class UVNodeManager:
         # faces = 面の頂点のループを含めて対象にする
         # sub_faces = 面のループのみを対象にする
 
-        # 選択されているループを座標をキーにしたノードグループにする（!!sync_uv_from_meshしていること）
-        # ToDo: 座標をキーにすると閉じたループの場合一緒に始点と終点のノードができない
+        # 選択されているループをUV頂点をキーにしたノードグループにする（!!sync_uv_from_meshしていること）
+        # ToDo: 座標をキーにすると閉じたループの場合一緒に始点と終点のノードができない（UV_VERTEX なら別のノードになる）
 
         if self.sync:
             # !!共有頂点の除外に影響が出るのでfaces検索は消さないこと
@@ -248,8 +425,8 @@ class UVNodeManager:
                 if not any(loop.uv_select_edge for loop in edge.link_loops):
                     continue
                 for loop in edge.link_loops:
-                    prev_key = self.get_loop_key(loop, uv_layer)
-                    next_key = self.get_loop_key(loop.link_loop_next, uv_layer)
+                    prev_key = get_loop_key(loop)
+                    next_key = get_loop_key(loop.link_loop_next)
                     if prev_key in uv_nodes and next_key in uv_nodes:
                         uv_nodes[prev_key].neighbors.add(uv_nodes[next_key])
                         uv_nodes[next_key].neighbors.add(uv_nodes[prev_key])
@@ -275,24 +452,14 @@ class UVNodeManager:
                 islands.append(island)
         return islands
 
-    @staticmethod
-    def get_uv_key(uv):
-        return (round(uv.x, 6), round(uv.y, 6))
-
-    def get_loop_key(self, loop, uv_layer):
-        uv_key = self.get_uv_key(loop[uv_layer].uv)
-        if self.node_key_mode == "VERT_AND_UV":
-            return (loop.vert, uv_key)
-        return uv_key
-
     def get_median_center(self):
         if not (groups := self.groups):
             return Vector((0, 0))
-        total_count = sum(len(group.nodes) for group in groups)
+        total_count = sum(group.node_count for group in groups)
         if total_count == 0:
             return Vector((0, 0))
-        sum_x = sum(group.median_center.x * len(group.nodes) for group in groups)
-        sum_y = sum(group.median_center.y * len(group.nodes) for group in groups)
+        sum_x = sum(group.median_center.x * group.node_count for group in groups)
+        sum_y = sum(group.median_center.y * group.node_count for group in groups)
         return Vector((sum_x / total_count, sum_y / total_count))
 
     def get_bbox_center(self):
@@ -306,6 +473,7 @@ class UVNodeManager:
 
     def uv_select_set_all(self, select):
         for obj_info in self.collections:
+            obj_info.dirty = True
             bm = obj_info.bm
             for face in bm.faces:
                 face.uv_select = select
@@ -319,18 +487,36 @@ class UVNodeManager:
                 self.groups.remove(group)
                 break
 
+    def mark_dirty(self, obj_info: UVNodeObject = None):
+        "bmeshを直接編集した時に呼ぶ（obj_info を省略するとすべてのオブジェクト）"
+        for info in self.collections if obj_info is None else (obj_info,):
+            info.dirty = True
+
     def update_uvmeshes(self, mesh_sync=False):
-        for info in self.collections:
-            if self.sync and mesh_sync and info.bm.uv_select_sync_valid:
-                info.bm.uv_select_sync_to_mesh()
-            bmesh.update_edit_mesh(info.obj.data)
+        "変更したオブジェクトのメッシュだけを1回ずつ更新する"
+        with profiler.phase("update_edit_mesh"):
+            for info in self.collections:
+                if not info.dirty:
+                    continue
+                if self.sync and mesh_sync and info.bm.uv_select_sync_valid:
+                    info.bm.uv_select_sync_to_mesh()
+                MeshTopology.mark_uv_update(info.obj.data)
+                bmesh.update_edit_mesh(info.obj.data)
+                info.dirty = False
+                profiler.count("mesh_updates")
 
     @classmethod
     def from_island(cls, island, sync=False, sub_faces=None):
         manager = cls(objects=[], sync=sync)
-        uv_groups = manager.find_uv_nodes(island.bm, island.uv_layer, sub_faces=sub_faces)
-        info = UVNodeObject(island.obj, island.bm, island.uv_layer, island.obj_info.original_uv_select_sync_valid)
+        info = UVNodeObject(
+            island.obj,
+            island.bm,
+            island.uv_layer,
+            island.obj_info.original_uv_select_sync_valid,
+            island.obj_info.get_topology(),
+        )
         manager.collections.append(info)
-        for group in uv_groups:
-            manager.groups.append(UVNodeGroup(group, info))
+        manager.groups.extend(manager.find_node_groups(info, sub_faces=sub_faces))
+        # ノードを編集するので、アイランドのオブジェクトも更新の対象にする
+        island.mark_dirty()
         return manager
@@ -1,10 +1,16 @@
 import bpy
 import bmesh
+import numpy as np
 from mathutils import Vector
 from dataclasses import dataclass, field
 from bpy.types import Object
 from bmesh.types import BMVert, BMLoop, BMLayerItem, BMesh, BMFace, BMEdge
 from functools import cached_property
+from .mesh_arrays import MeshArrays
+from .selection import SelectionSnapshot
+from .topology_cache import MeshTopology
+from . import profiler
+from ..core.islands import find_island_labels, group_by_label
 
 VER_5_0_1 = bpy.app.version >= (5, 0, 1)
 
@@ -15,6 +21,14 @@ class UVObject:
     bm: BMesh = None
     uv_layer: BMLayerItem = None
     original_uv_select_sync_valid: bool = False
+    topology: MeshTopology = None
+    face_island: np.ndarray = field(default=None, repr=False, compare=False)  # face.index → アイランドID（アイランドでない面は -1）
+    dirty: bool = field(default=False, compare=False)  # UVか選択を変更した（update_uvmeshes で更新する）
+
+    def get_topology(self):
+        if self.topology is None:
+            self.topology = MeshTopology.get(self.obj, self.bm)
+        return self.topology
 
 
 @dataclass
@@ -24,21 +38,23 @@ class UVIsland:
     sync: bool = False
     extend: bool = True
 
+    # アイランドのループと対応するUV（float64）。bmeshへの書き戻しは update_uvs でまとめて行う
+    loops: list[BMLoop] = field(default=None, repr=False)
+    uvs: np.ndarray = field(default=None, repr=False)
+    face_indices: np.ndarray = field(default=None, repr=False)  # loops の面の face.index（loops と同じ順）
+    uv_dirty: bool = field(default=False, init=False, repr=False)
+
     orientation_mode: str = "WORLD"
 
     original_center: Vector = field(init=False)
     original_width: float = field(init=False)
     original_height: float = field(init=False)
 
-    min_uv: Vector = field(default_factory=lambda: Vector((float("inf"), float("inf"))))
-    max_uv: Vector = field(default_factory=lambda: Vector((float("-inf"), float("-inf"))))
-    width: float = field(init=False)
-    height: float = field(init=False)
-    center: Vector = field(init=False, default_factory=lambda: Vector((0, 0)))
-    median_center: Vector = field(init=False, default_factory=lambda: Vector((0, 0)))
+    _bounds: tuple = field(default=None, init=False, repr=False)
 
-    selection_loops: dict[int, bool] = field(default_factory=dict)
-    selection_uv_faces: dict[int, bool] = field(default_factory=dict)
+    selection: SelectionSnapshot = field(default=None, repr=False)
+
+    island_id: int = field(default=-1, repr=False)  # UVIslandManager が割り当てる（マネージャー内で一意）
 
     @property
     def obj(self):
@@ -62,94 +78,142 @@ class UVIsland:
 
     @cached_property
     def center_3d_local(self):
-        verts = [v.co for face in self.faces for v in face.verts]
-        return sum(verts, Vector()) / len(verts)
+        return Vector(self.vert_cos.mean(axis=0))
+
+    @cached_property
+    def vert_cos(self):
+        "ループごとの頂点座標（ローカル）"
+        loops = self.loops
+        return np.fromiter((c for loop in loops for c in loop.vert.co), dtype=np.float64, count=len(loops) * 3).reshape(
+            -1, 3
+        )
 
     def __post_init__(self):
-        self.update_bounds()
+        if self.loops is None:
+            self.loops = [loop for face in self.faces for loop in face.loops]
+        if self.uvs is None:
+            self.read_uvs()
         self.original_center = self.center.copy()
         self.original_width = self.width
         self.original_height = self.height
 
     def __hash__(self):
-        return hash((frozenset(self.faces), self.obj_info.obj))
+        return self.island_id if self.island_id >= 0 else id(self)
 
     def __eq__(self, other):
         if not isinstance(other, UVIsland):
             return NotImplemented
-        return self.faces == other.faces and self.obj_info.obj == other.obj_info.obj
+        return self is other
 
-    def update_bounds(self):
-        min_x = float("inf")
-        min_y = float("inf")
-        max_x = float("-inf")
-        max_y = float("-inf")
-        sum_x = 0.0
-        sum_y = 0.0
-        count = 0
+    @property
+    def bounds(self):
+        "(min_uv, max_uv, median_center) を必要になった時に計算する"
+        if self._bounds is None:
+            uvs = self.uvs
+            if len(uvs):
+                self._bounds = (Vector(uvs.min(axis=0)), Vector(uvs.max(axis=0)), Vector(uvs.mean(axis=0)))
+            else:
+                self._bounds = (
+                    Vector((float("inf"), float("inf"))),
+                    Vector((float("-inf"), float("-inf"))),
+                    Vector((0, 0)),
+                )
+        return self._bounds
+
+    @property
+    def min_uv(self):
+        return self.bounds[0]
+
+    @property
+    def max_uv(self):
+        return self.bounds[1]
+
+    @property
+    def median_center(self):
+        return self.bounds[2]
+
+    @property
+    def center(self):
+        if not len(self.uvs):
+            return Vector((0, 0))
+        min_uv, max_uv, _ = self.bounds
+        return (min_uv + max_uv) / 2
+
+    @property
+    def width(self):
+        return self.max_uv.x - self.min_uv.x if len(self.uvs) else 0
+
+    @property
+    def height(self):
+        return self.max_uv.y - self.min_uv.y if len(self.uvs) else 0
+
+    def get_face_indices(self):
+        "loops の面の face.index（loops は面ごとに連続して並ぶ）"
+        if self.face_indices is None:
+            # loops は faces の順に作るので同じ順になる
+            self.face_indices = np.fromiter(
+                (face.index for face in self.faces), dtype=np.int64, count=len(self.faces)
+            )
+        return self.face_indices
+
+    def read_uvs(self):
+        "bmeshからUVを読み込む"
         uv_layer = self.uv_layer
-        for face in self.faces:
-            for loop in face.loops:
-                uv = loop[uv_layer].uv
-                x = uv.x
-                y = uv.y
-                if x < min_x:
-                    min_x = x
-                if x > max_x:
-                    max_x = x
-                if y < min_y:
-                    min_y = y
-                if y > max_y:
-                    max_y = y
-                sum_x += x
-                sum_y += y
-                count += 1
-        if count:
-            self.min_uv = Vector((min_x, min_y))
-            self.max_uv = Vector((max_x, max_y))
-            self.center = Vector(((min_x + max_x) / 2, (min_y + max_y) / 2))
-            self.median_center = Vector((sum_x / count, sum_y / count))
-            self.width = max_x - min_x
-            self.height = max_y - min_y
-        else:
-            self.min_uv = Vector((float("inf"), float("inf")))
-            self.max_uv = Vector((float("-inf"), float("-inf")))
-            self.center = Vector((0, 0))
-            self.median_center = Vector((0, 0))
-            self.width = self.height = 0
+        loops = self.loops
+        self.uvs = np.fromiter(
+            (c for loop in loops for c in loop[uv_layer].uv), dtype=np.float64, count=len(loops) * 2
+        ).reshape(-1, 2)
+        self.uv_dirty = False
+        self._bounds = None
+
+    def update_uvs(self):
+        "保留中のUVをbmeshに書き戻す"
+        if not self.uv_dirty:
+            return
+        uv_layer = self.uv_layer
+        for loop, uv in zip(self.loops, self.uvs.tolist()):
+            loop[uv_layer].uv = uv
+        self.uv_dirty = False
+        self.mark_dirty()
+
+    def set_uvs(self, uvs):
+        "UVを置き換える（bmeshへの書き戻しは update_uvs）"
+        self.uvs = uvs
+        self.uv_dirty = True
+        self._bounds = None
+
+    def mark_dirty(self):
+        "bmeshを直接編集した時に呼ぶ（update_uvmeshes でメッシュを更新する）"
+        self.obj_info.dirty = True
+
+    def update_bounds(self):
+        # bmeshを直接編集した後に呼ばれるので、保留中の書き込みがなければ読み直す
+        if not self.uv_dirty:
+            self.read_uvs()
+            self.mark_dirty()
+        self._bounds = None
 
     def move(self, offset, calc=False):
-        uv_layer = self.uv_layer
-        for face in self.faces:
-            for loop in face.loops:
-                loop[uv_layer].uv += offset
-        if calc:
-            self.update_bounds()
+        offset = (offset[0], offset[1])
+        self.uvs += offset
+        self.uv_dirty = True
+        if calc or self._bounds is None:
+            self._bounds = None
+        else:
+            min_uv, max_uv, median_center = self._bounds
+            offset = Vector(offset)
+            self._bounds = (min_uv + offset, max_uv + offset, median_center + offset)
 
     def store_selection(self):
-        self.selection_loops = {}
-        self.selection_uv_faces = {}
-        for face in self.faces:
-            self.selection_uv_faces[face.index] = face.uv_select
-            for loop in face.loops:
-                is_selected = loop.uv_select_vert
-                is_edge_selected = loop.uv_select_edge
-                self.selection_loops[loop.index] = (is_selected, is_edge_selected)
+        self.selection = SelectionSnapshot.capture(self.bm, self.faces, self.loops)
 
-    def restore_selection(self):
-        for face in self.faces:
-            if face.index in self.selection_uv_faces:
-                face.uv_select = self.selection_uv_faces[face.index]
-            for loop in face.loops:
-                if loop.index in self.selection_loops:
-                    uv_select_vert, uv_select_edge = self.selection_loops[loop.index]
-                    loop.uv_select_vert = uv_select_vert
-                    loop.uv_select_edge = uv_select_edge
-
-        if self.bm.uv_select_sync_valid:
-            self.bm.uv_select_flush_mode()
+    def restore_selection(self, flush=True):
+        if self.selection is not None:
+            self.selection.restore(flush)
+            self.mark_dirty()
 
     def uv_select_set_all(self, select):
+        self.mark_dirty()
         for face in self.faces:
             face.uv_select = select
             for loop in face.loops:
@@ -173,14 +237,21 @@ class UVIslandManager:
     find_all: bool = False  # すべてのアイランドを対象にする
     mesh_all: bool = False  # メッシュ全体を対象にする
     uv_split: bool = True # UVアイランドで分ける（Falseの場合はシームのみ）
+    engine: str = "ARRAY"  # "ARRAY" or "BMESH"
 
     orientation_mode = "WORLD"  # "WORLD" or "LOCAL"
 
     collections: list[UVObject] = field(default_factory=list)
     islands: list[UVIsland] = field(default_factory=list)
+    island_table: list[UVIsland] = field(default_factory=list)  # アイランドID → アイランド（islands を並べ替えても変わらない）
 
     def __post_init__(self):
-        self.find_all_islands()
+        with profiler.phase("island_build"):
+            self.find_all_islands()
+        if profiler.current():
+            profiler.count("islands", len(self.islands))
+            profiler.count("faces", sum(len(island.faces) for island in self.islands))
+            profiler.count("loops", sum(len(island.loops) for island in self.islands))
 
     def find_all_islands(self):
         for obj in self.objects:
@@ -193,12 +264,91 @@ class UVIslandManager:
             if self.sync and not bm.uv_select_sync_valid:
                 bm.uv_select_sync_from_mesh()
 
+            bm.faces.index_update()
             obj_info = UVObject(obj, bm, uv_layer, uv_sync_valid)
+            obj_info.face_island = np.full(len(bm.faces), -1, dtype=np.int64)
             self.collections.append(obj_info)
 
             self.find_islands(obj_info)
 
     def find_islands(self, obj_info: UVObject):
+        if self.engine == "ARRAY":
+            self.find_islands_array(obj_info)
+        else:
+            self.find_islands_bmesh(obj_info)
+
+    def find_islands_array(self, obj_info: UVObject):
+        "配列に展開して連結成分でアイランドを検出する"
+        topology = obj_info.get_topology()
+        arrays = MeshArrays.from_bmesh(obj_info.bm, obj_info.uv_layer, topology)
+        if not arrays.faces:
+            return
+
+        sync, extend = self.sync, self.extend
+        face_hide = arrays.face_hide
+        visible = ~face_hide
+        if self.mesh_all:
+            seeds = np.ones(len(arrays.faces), dtype=bool)
+        elif self.find_all:
+            seeds = visible if sync else visible & arrays.face_select
+        elif extend:
+            seeds = visible & arrays.face_any(arrays.loop_uv_select_vert)
+            if not sync:
+                seeds &= arrays.face_select
+        else:
+            seeds = visible & arrays.face_uv_select
+            if not sync:
+                seeds &= arrays.face_select
+
+        face_enabled = np.ones_like(seeds) if sync else arrays.face_select
+        can_extend = self.find_all or extend
+        key = hash(
+            (
+                arrays.loop_uv.tobytes(),
+                face_enabled.tobytes(),
+                face_hide.tobytes(),
+                seeds.tobytes(),
+                can_extend,
+                self.uv_split,
+            )
+        )
+        labels = topology.get_island_labels(
+            key,
+            lambda: find_island_labels(
+                arrays.loop_face,
+                arrays.loop_vert,
+                arrays.loop_edge,
+                arrays.loop_next,
+                arrays.loop_uv,
+                arrays.edge_seam,
+                face_enabled,
+                face_hide,
+                seeds,
+                can_extend=can_extend,
+                uv_split=self.uv_split,
+                edge_pairs=(topology.edge_pair_a, topology.edge_pair_b),
+            ),
+        )
+
+        faces, loops, loop_uv = arrays.faces, arrays.loops, arrays.loop_uv
+        loop_groups = group_by_label(labels[arrays.loop_face])
+        for face_indices, loop_indices in zip(group_by_label(labels), loop_groups):
+            island = {faces[i] for i in face_indices.tolist()}
+            island_loops = [loops[i] for i in loop_indices.tolist()]
+            self.add_island(
+                UVIsland(
+                    island,
+                    obj_info,
+                    self.sync,
+                    self.extend,
+                    island_loops,
+                    loop_uv[loop_indices],
+                    face_indices=face_indices,
+                ),
+                face_indices,
+            )
+
+    def find_islands_bmesh(self, obj_info: UVObject):
         all, extend, sync = self.find_all, self.extend, self.sync
         bm, uv_layer = obj_info.bm, obj_info.uv_layer
         eps_eq = 1e-12
@@ -317,7 +467,26 @@ class UVIslandManager:
 
             if island:
                 new_island = UVIsland(island, obj_info, self.sync, self.extend)
-                self.islands.append(new_island)
+                self.add_island(new_island)
+
+    def add_island(self, island: UVIsland, face_indices=None):
+        "アイランドIDを割り当てて追加する（face_indices は face.index の配列）"
+        island.island_id = len(self.island_table)
+        self.island_table.append(island)
+        self.islands.append(island)
+        face_island = island.obj_info.face_island
+        if face_island is not None:
+            if face_indices is None:
+                face_indices = np.fromiter((face.index for face in island.faces), dtype=np.int64, count=len(island.faces))
+            face_island[face_indices] = island.island_id
+
+    def get_island(self, island_id):
+        return self.island_table[island_id] if island_id >= 0 else None
+
+    def face_island_ids(self, obj_info: UVObject, faces):
+        "面ごとのアイランドID（アイランドでない面は -1）"
+        indices = np.fromiter((face.index for face in faces), dtype=np.int64)
+        return obj_info.face_island[indices]
 
     def get_median_center(self):
         if not self.islands:
@@ -327,7 +496,7 @@ class UVIslandManager:
         sum_y = 0.0
 
         for island in self.islands:
-            uv_count = sum(len(face.loops) for face in island.faces)
+            uv_count = len(island.loops)
             if uv_count == 0:
                 continue
             center = island.median_center
@@ -365,6 +534,7 @@ class UVIslandManager:
 
     def uv_select_set_all(self, select):
         for info in self.collections:
+            info.dirty = True
             bm = info.bm
             if bm.uv_select_sync_valid:
                 bm.uv_select_foreach_set(select, faces=bm.faces)
@@ -373,6 +543,19 @@ class UVIslandManager:
                 for island in [island for island in self.islands if island.obj_info == info]:
                     island.uv_select_set_all(select)
 
+    def store_selection(self):
+        for island in self.islands:
+            island.store_selection()
+
+    def restore_selection(self, islands=None):
+        "アイランドの選択を復元して、オブジェクトごとに1回だけ flush する"
+        islands = self.islands if islands is None else islands
+        for island in islands:
+            island.restore_selection(flush=False)
+        for info in self.collections:
+            if info.bm.uv_select_sync_valid:
+                info.bm.uv_select_flush_mode()
+
     def sort_all_islands(self, key, reverse=False):
         self.islands.sort(key=key, reverse=reverse)
 
@@ -382,8 +565,23 @@ class UVIslandManager:
             for island in self.islands:
                 island.orientation_mode = mode
 
+    def mark_dirty(self, obj_info: UVObject = None):
+        "bmeshを直接編集した時に呼ぶ（obj_info を省略するとすべてのオブジェクト）"
+        for info in self.collections if obj_info is None else (obj_info,):
+            info.dirty = True
+
     def update_uvmeshes(self, mesh_sync=False):
-        for info in self.collections:
-            if self.sync and mesh_sync and info.bm.uv_select_sync_valid:
-                info.bm.uv_select_sync_to_mesh()
-            bmesh.update_edit_mesh(info.obj.data)
+        "保留中のUVを書き戻して、変更したオブジェクトのメッシュだけを1回ずつ更新する"
+        with profiler.phase("write_back"):
+            for island in self.islands:
+                island.update_uvs()
+        with profiler.phase("update_edit_mesh"):
+            for info in self.collections:
+                if not info.dirty:
+                    continue
+                if self.sync and mesh_sync and info.bm.uv_select_sync_valid:
+                    info.bm.uv_select_sync_to_mesh()
+                MeshTopology.mark_uv_update(info.obj.data)
+                bmesh.update_edit_mesh(info.obj.data)
+                info.dirty = False
+                profiler.count("mesh_updates")
@@ -0,0 +1,79 @@
+import numpy as np
+from dataclasses import dataclass, field
+from bmesh.types import BMesh, BMLoop, BMLayerItem
+from .mesh_arrays import MeshArrays
+from ..core.uv_weld import UV_KEY_DECIMALS, quantize_uvs, uv_labels, vert_uv_labels, weld_labels, label_values
+
+
+@dataclass
+class UVWeldIndex:
+    """ループ → UV頂点のラベル（量子化したUVのキーをまとめて計算する）
+
+    mode:
+        "UV": UV座標が同じループ
+        "VERT_AND_UV": 頂点とUV座標が同じループ
+        "UV_VERTEX": 頂点とUV座標が同じで、UVがつながっているエッジで隣り合うループ
+    """
+
+    arrays: MeshArrays
+    _labels: dict = field(default_factory=dict, repr=False)
+    _position: dict = field(default=None, repr=False)
+    _groups: dict = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_bmesh(cls, bm: BMesh, uv_layer: BMLayerItem, faces=None, topology=None):
+        "faces を渡すとその面のループだけを対象にする"
+        return cls(MeshArrays.from_bmesh(bm, uv_layer, topology, faces=faces))
+
+    @property
+    def loops(self) -> list[BMLoop]:
+        return self.arrays.loops
+
+    def labels(self, mode="UV"):
+        "ループごとのラベル（0からの連番）"
+        labels = self._labels.get(mode)
+        if labels is None:
+            arrays = self.arrays
+            if mode == "UV":
+                labels = uv_labels(arrays.loop_uv)
+            elif mode == "VERT_AND_UV":
+                labels = vert_uv_labels(arrays.loop_uv, arrays.loop_vert)
+            elif mode == "UV_VERTEX":
+                labels = weld_labels(
+                    arrays.loop_uv, arrays.loop_vert, arrays.loop_edge, arrays.loop_next, arrays.edge_seam
+                )
+            else:
+                raise ValueError("Unsupported weld mode: {}".format(mode))
+            self._labels[mode] = labels
+        return labels
+
+    def rounded_uvs(self):
+        "ループごとの丸めたUV"
+        return quantize_uvs(self.arrays.loop_uv) / 10**UV_KEY_DECIMALS
+
+    def label_uvs(self, mode="UV"):
+        "ラベルごとの丸めたUV"
+        return label_values(self.labels(mode), self.rounded_uvs())
+
+    def position(self, loop: BMLoop):
+        "loops の中のインデックス"
+        if self._position is None:
+            self._position = {loop: index for index, loop in enumerate(self.arrays.loops)}
+        return self._position[loop]
+
+    def label(self, loop: BMLoop, mode="UV"):
+        return int(self.labels(mode)[self.position(loop)])
+
+    def groups(self, mode="UV", mask=None):
+        "ラベル → ループのリスト（mask を渡すと mask のループだけ、渡さなければキャッシュする）"
+        if mask is None and mode in self._groups:
+            return self._groups[mode]
+        labels = self.labels(mode)
+        loops = self.arrays.loops
+        indices = np.flatnonzero(mask) if mask is not None else np.arange(len(loops))
+        groups = {}
+        for index, label in zip(indices.tolist(), labels[indices].tolist()):
+            groups.setdefault(label, []).append(loops[index])
+        if mask is None:
+            self._groups[mode] = groups
+        return groups
@@ -0,0 +1 @@
+# bpy / bmesh / mathutils に依存しない NumPy ベースの処理
@@ -0,0 +1,160 @@
+import numpy as np
+
+RASTER_TILE_SIZES = (2, 4, 8)
+RASTER_CHUNK_SAMPLES = 1 << 21
+
+
+def polygon_offsets(face_size):
+    "面ごとの先頭ループのインデックス"
+    face_start = np.zeros(len(face_size), dtype=np.int64)
+    np.cumsum(face_size[:-1], out=face_start[1:])
+    return face_start
+
+
+def fan_corners(face_start, face_size):
+    "多角形を扇形に三角形分割する。(T, 3) の角のループインデックスと三角形ごとの面インデックスを返す"
+    fan_count = np.maximum(face_size - 2, 0)
+    tri_face = np.repeat(np.arange(len(face_size), dtype=np.int64), fan_count)
+    tri_start = np.repeat(face_start, fan_count)
+    first_tri = np.zeros(len(face_size), dtype=np.int64)
+    np.cumsum(fan_count[:-1], out=first_tri[1:])
+    fan_index = np.arange(len(tri_face), dtype=np.int64) - np.repeat(first_tri, fan_count) + 1
+    return np.stack((tri_start, tri_start + fan_index, tri_start + fan_index + 1), axis=1), tri_face
+
+
+def triangulate_fan(loop_uv, face_start, face_size):
+    "多角形を扇形に三角形分割する。(T, 3, 2) の三角形と三角形ごとの面インデックスを返す"
+    corners, tri_face = fan_corners(face_start, face_size)
+    return loop_uv[corners], tri_face
+
+
+def face_areas(loop_co, face_start, face_size):
+    "面積（扇形の三角形の合計）。loop_co は (L, 2) のUVか (L, 3) の座標"
+    corners, tri_face = fan_corners(face_start, face_size)
+    loop_co = np.asarray(loop_co, dtype=np.float64)
+    delta_a = loop_co[corners[:, 1]] - loop_co[corners[:, 0]]
+    delta_b = loop_co[corners[:, 2]] - loop_co[corners[:, 0]]
+    if loop_co.shape[1] == 2:
+        tri_area = np.abs(delta_a[:, 0] * delta_b[:, 1] - delta_a[:, 1] * delta_b[:, 0]) * 0.5
+    else:
+        tri_area = np.linalg.norm(np.cross(delta_a, delta_b), axis=1) * 0.5
+    return np.bincount(tri_face, weights=tri_area, minlength=len(face_size))
+
+
+def face_tiles(loop_uv, face_start, face_size):
+    "面の平均UVが属するUVタイル (u, v)"
+    sums = np.add.reduceat(loop_uv, face_start, axis=0) if len(face_start) else np.zeros((0, 2))
+    return np.floor(sums / face_size[:, None]).astype(np.int64)
+
+
+def fill_tiles(mask, tile, edge_a, edge_b, edge_c, min_xy, max_xy):
+    "バウンディングボックスを tile×tile のタイルに分け、タイル内のピクセル中心で辺関数を評価する"
+    tile_counts = (max_xy - min_xy) // tile + 1
+    items_per_tri = tile_counts[:, 0] * tile_counts[:, 1]
+    item_tri = np.repeat(np.arange(len(min_xy), dtype=np.int64), items_per_tri)
+    first_item = np.zeros(len(min_xy), dtype=np.int64)
+    np.cumsum(items_per_tri[:-1], out=first_item[1:])
+    local = np.arange(len(item_tri), dtype=np.int64) - first_item[item_tri]
+    item_x = min_xy[item_tri, 0] + (local % tile_counts[item_tri, 0]) * tile
+    item_y = min_xy[item_tri, 1] + (local // tile_counts[item_tri, 0]) * tile
+
+    steps = np.arange(tile, dtype=np.int64)
+    chunk_size = RASTER_CHUNK_SAMPLES // (tile * tile)
+    for chunk in range(0, len(item_tri), chunk_size):
+        tri = item_tri[chunk : chunk + chunk_size]
+        px = item_x[chunk : chunk + chunk_size, None] + steps[None, :]
+        py = item_y[chunk : chunk + chunk_size, None] + steps[None, :]
+        sx = (px + 0.5)[:, None, None, :]
+        sy = (py + 0.5)[:, None, :, None]
+
+        inside = np.all(
+            edge_a[tri][:, :, None, None] * sx + edge_b[tri][:, :, None, None] * sy + edge_c[tri][:, :, None, None]
+            >= 0,
+            axis=1,
+        )
+        inside &= (px <= max_xy[tri, 0, None])[:, None, :]
+        inside &= (py <= max_xy[tri, 1, None])[:, :, None]
+
+        item_index, row, column = np.nonzero(inside)
+        mask[py[item_index, row], px[item_index, column]] = True
+
+
+def rasterize_triangles(triangles, resolution, mask=None):
+    """三角形をピクセル中心でサンプリングしてマスクを塗る（0-1の範囲外は切り捨て）
+
+    triangles: (T, 3, 2) のUV座標
+    """
+    if mask is None:
+        mask = np.zeros((resolution, resolution), dtype=bool)
+    if not len(triangles):
+        return mask
+
+    points = np.asarray(triangles, dtype=np.float64) * resolution
+    a, b, c = points[:, 0], points[:, 1], points[:, 2]
+    area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (c[:, 0] - a[:, 0]) * (b[:, 1] - a[:, 1])
+
+    min_xy = np.maximum(np.ceil(points.min(axis=1) - 0.5), 0).astype(np.int64)
+    max_xy = np.minimum(np.floor(points.max(axis=1) - 0.5), resolution - 1).astype(np.int64)
+    valid = (area != 0) & np.all(min_xy <= max_xy, axis=1)
+    if not valid.any():
+        return mask
+
+    points, area, min_xy, max_xy = points[valid], area[valid], min_xy[valid], max_xy[valid]
+
+    # 辺関数 A*x + B*y + C >= 0 が3辺とも成り立てば内側（向きは面積の符号で揃える）
+    start = points
+    end = np.roll(points, -1, axis=1)
+    sign = np.sign(area)[:, None]
+    edge_a = (start[:, :, 1] - end[:, :, 1]) * sign
+    edge_b = (end[:, :, 0] - start[:, :, 0]) * sign
+    edge_c = (start[:, :, 0] * end[:, :, 1] - start[:, :, 1] * end[:, :, 0]) * sign
+
+    # 小さい三角形は小さいタイルで、大きい三角形はバウンディングボックスを複数のタイルに分けて処理する
+    extent = (max_xy - min_xy).max(axis=1) + 1
+    lower = 0
+    for tile in RASTER_TILE_SIZES:
+        group = extent > lower
+        if tile != RASTER_TILE_SIZES[-1]:
+            group &= extent <= tile
+        lower = tile
+        if group.any():
+            fill_tiles(mask, tile, edge_a[group], edge_b[group], edge_c[group], min_xy[group], max_xy[group])
+
+    return mask
+
+
+def calc_coverage(loop_uv, face_size, resolution, use_udim=False):
+    """UVタイルごとの占有率 {(tile_u, tile_v): 0-1} を返す
+
+    use_udim が False の場合は 0-1 の範囲だけを (0, 0) として計算する
+    """
+    loop_uv = np.asarray(loop_uv, dtype=np.float64).reshape(-1, 2)
+    face_size = np.asarray(face_size, dtype=np.int64)
+    keep = face_size >= 3
+    if not keep.all():
+        loop_uv = loop_uv[np.repeat(keep, face_size)]
+        face_size = face_size[keep]
+    if not len(face_size):
+        return {}
+
+    face_start = polygon_offsets(face_size)
+    triangles, tri_face = triangulate_fan(loop_uv, face_start, face_size)
+
+    if not use_udim:
+        mask = rasterize_triangles(triangles, resolution)
+        return {(0, 0): float(np.count_nonzero(mask) / mask.size)}
+
+    tiles = face_tiles(loop_uv, face_start, face_size)[tri_face]
+    triangles = triangles - tiles[:, None, :]
+    tile_keys, tile_index = np.unique(tiles, axis=0, return_inverse=True)
+    tile_index = tile_index.reshape(-1)
+
+    result = {}
+    for index, (tile_u, tile_v) in enumerate(tile_keys.tolist()):
+        mask = rasterize_triangles(triangles[tile_index == index], resolution)
+        result[(tile_u, tile_v)] = float(np.count_nonzero(mask) / mask.size)
+    return result
+
+
+def udim_number(tile_u, tile_v):
+    return 1001 + tile_u + tile_v * 10
@@ -0,0 +1,129 @@
+import numpy as np
+
+UV_EPS_EQ = 1e-12
+
+
+def connected_components(count, src, dst):
+    "無向グラフの連結成分ラベル（各成分の最小インデックスがラベルになる）"
+    labels = np.arange(count, dtype=np.int64)
+    if not len(src):
+        return labels
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    while True:
+        a = labels[src]
+        b = labels[dst]
+        lo = np.minimum(a, b)
+        hi = np.maximum(a, b)
+        mask = lo != hi
+        if not mask.any():
+            break
+        # 大きい根を小さい根へ付け替えてからポインタジャンプで平坦化
+        np.minimum.at(labels, hi[mask], lo[mask])
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+    return labels
+
+
+def edge_loop_pairs(loop_edge, edge_count):
+    "ちょうど2つのループを持つエッジについてループのペアを返す"
+    loop_edge = np.asarray(loop_edge, dtype=np.int64)
+    if not len(loop_edge):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    counts = np.bincount(loop_edge, minlength=edge_count)
+    order = np.argsort(loop_edge, kind="stable")
+    sorted_edges = loop_edge[order]
+    first = np.flatnonzero(np.r_[True, sorted_edges[1:] != sorted_edges[:-1]])
+    first = first[counts[sorted_edges[first]] == 2]
+    return order[first], order[first + 1]
+
+
+def face_components(loop_face, loop_edge, face_count):
+    "エッジでつながった面の連結成分ラベル（UVやシームは無関係）"
+    loop_edge = np.asarray(loop_edge, dtype=np.int64)
+    order = np.argsort(loop_edge, kind="stable")
+    sorted_edges = loop_edge[order]
+    same = sorted_edges[1:] == sorted_edges[:-1]
+    loop_face = np.asarray(loop_face, dtype=np.int64)
+    return connected_components(face_count, loop_face[order[:-1][same]], loop_face[order[1:][same]])
+
+
+def uv_continuous(loop_a, loop_b, loop_vert, loop_next, loop_uv, eps_eq=UV_EPS_EQ):
+    "ループペアの UV がエッジ両端で一致しているか"
+    next_a = loop_next[loop_a]
+    next_b = loop_next[loop_b]
+    same_dir = loop_vert[loop_a] == loop_vert[loop_b]
+    # 同じ向きなら a-c, b-d、逆向きなら a-d, b-c を比較
+    pair_a = np.where(same_dir, loop_b, next_b)
+    pair_b = np.where(same_dir, next_b, loop_b)
+    d0 = loop_uv[loop_a] - loop_uv[pair_a]
+    d1 = loop_uv[next_a] - loop_uv[pair_b]
+    return (np.einsum("ij,ij->i", d0, d0) <= eps_eq) & (np.einsum("ij,ij->i", d1, d1) <= eps_eq)
+
+
+def find_island_labels(
+    loop_face,
+    loop_vert,
+    loop_edge,
+    loop_next,
+    loop_uv,
+    edge_seam,
+    face_enabled,
+    face_hide,
+    seeds,
+    can_extend=True,
+    uv_split=True,
+    edge_pairs=None,
+):
+    """面ごとのアイランドラベルを返す（アイランドに含まれない面は -1）
+
+    face_enabled: アイランドに含めることができる面
+    seeds: 探索の起点になる面
+    edge_pairs: edge_loop_pairs の結果（キャッシュがあれば渡す）
+    """
+    face_count = len(face_enabled)
+    seeds = seeds & face_enabled
+
+    loop_a, loop_b = edge_pairs if edge_pairs is not None else edge_loop_pairs(loop_edge, len(edge_seam))
+    face_a = loop_face[loop_a]
+    face_b = loop_face[loop_b]
+
+    walkable = face_enabled & ~face_hide
+    if not can_extend:
+        walkable = walkable & seeds
+
+    mask = ~edge_seam[loop_edge[loop_a]] & walkable[face_a] & walkable[face_b] & (face_a != face_b)
+    loop_a, loop_b = loop_a[mask], loop_b[mask]
+    if uv_split and len(loop_a):
+        mask = uv_continuous(loop_a, loop_b, loop_vert, loop_next, loop_uv)
+        loop_a, loop_b = loop_a[mask], loop_b[mask]
+
+    labels = connected_components(face_count, loop_face[loop_a], loop_face[loop_b])
+
+    has_seed = np.zeros(face_count, dtype=bool)
+    has_seed[labels[seeds]] = True
+    return np.where(has_seed[labels], labels, -1)
+
+
+def face_loop_indices(face_start, face_size, faces):
+    "faces の面のループのインデックス（面の順に連続して並ぶ）"
+    faces = np.asarray(faces, dtype=np.int64)
+    sizes = face_size[faces]
+    first = np.zeros(len(faces), dtype=np.int64)
+    np.cumsum(sizes[:-1], out=first[1:])
+    return np.arange(int(sizes.sum()), dtype=np.int64) + np.repeat(face_start[faces] - first, sizes)
+
+
+def group_by_label(labels):
+    "ラベルごとのインデックス配列のリスト（ラベル昇順、-1 は除外）"
+    indices = np.flatnonzero(labels >= 0)
+    if not len(indices):
+        return []
+    order = np.argsort(labels[indices], kind="stable")
+    indices = indices[order]
+    sorted_labels = labels[indices]
+    splits = np.flatnonzero(sorted_labels[1:] != sorted_labels[:-1]) + 1
+    return np.split(indices, splits)
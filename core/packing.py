@@ -0,0 +1,225 @@
+import numpy as np
+from bisect import bisect_left, insort
+
+PACK_EPS = 1e-9
+PACK_UDIM_COLUMNS = 10  # UDIM の1行のタイル数
+PACK_FIT_STEPS = 8  # 拡大率を二分探索する回数
+PACK_OPEN_TILES = 3  # 詰める先として試すタイルの数（新しい順）
+
+
+class Skyline:
+    """1つのタイル (0〜1) のスカイライン
+
+    区間は左端の x をキーにした連結リスト（高さ・幅・左右の区間）で、挿入してもキーがずれない
+    区間を低い順にたどれるように (高さ, x) の整列済みリストも持つ（挿入・削除は bisect）
+    """
+
+    def __init__(self):
+        self.ys = {0.0: 0.0}
+        self.ws = {0.0: 1.0}
+        self.prev = {0.0: None}
+        self.next = {0.0: None}
+        self.heights = [(0.0, 0.0)]  # (高さ, x) の昇順
+        self.free = 1.0  # スカイラインより上の面積（これ以上は置けない）
+
+    @property
+    def floor(self):
+        "最も低い区間の高さ"
+        return self.heights[0][0]
+
+    def add_segment(self, x, y, w, prev, following):
+        self.ys[x] = y
+        self.ws[x] = w
+        self.prev[x] = prev
+        self.next[x] = following
+        if prev is not None:
+            self.next[prev] = x
+        if following is not None:
+            self.prev[following] = x
+        insort(self.heights, (y, x))
+
+    def remove_segment(self, x):
+        "区間を削除して右の区間を返す（左右のリンクはつなぎ直さない）"
+        del self.heights[bisect_left(self.heights, (self.ys.pop(x), x))]
+        del self.ws[x], self.prev[x]
+        return self.next.pop(x)
+
+    def find(self, width, height):
+        """矩形を置ける最も低い位置 (上端, 区間の x)。置けなければ None
+
+        低い区間から順に試して、それ以上低く置けなくなったら打ち切る（同じ高さなら左を優先）
+        """
+        limit = 1.0 + PACK_EPS
+        # 矩形の下端の上限（見つかった位置より高くなる区間は途中でやめる）
+        bound = limit - height
+        if self.floor > bound:
+            return None
+        ys, ws, nexts = self.ys, self.ws, self.next
+        best = None
+        for y, x in self.heights:
+            if y > bound:
+                break
+            if x + width > limit:
+                continue
+            remaining = width - ws[x]
+            j = x
+            while remaining > PACK_EPS:
+                j = nexts[j]
+                if ys[j] > y:
+                    y = ys[j]
+                    if y > bound:
+                        break
+                remaining -= ws[j]
+            else:
+                top = y + height
+                if best is None or top < best[0] - PACK_EPS or x < best[1]:
+                    best = (top, x)
+                    bound = min(limit, top + PACK_EPS) - height
+        return best
+
+    def insert(self, x, width, top):
+        "x の区間の左端に幅 width・上端 top の矩形を置く"
+        if width <= PACK_EPS:
+            # 幅のない矩形はスカイラインを変えない
+            return
+        ys, ws = self.ys, self.ws
+        end = x + width
+        prev = self.prev[x]
+        # 覆われた区間を削って、残りを右にずらす
+        filled = 0.0
+        j = x
+        while j is not None and j + ws[j] <= end + PACK_EPS:
+            filled += ws[j] * (top - ys[j])
+            j = self.remove_segment(j)
+        if j is not None and j < end:
+            filled += (end - j) * (top - ys[j])
+            y, w = ys[j], ws[j] - (end - j)
+            following = self.remove_segment(j)
+            self.add_segment(end, y, w, None, following)
+            j = end
+        self.add_segment(x, top, width, prev, j)
+        self.free = max(self.free - filled, 0.0)
+        # 同じ高さの隣の区間をまとめる
+        if j is not None and abs(ys[j] - top) <= PACK_EPS:
+            ws[x] += ws[j]
+            following = self.remove_segment(j)
+            self.next[x] = following
+            if following is not None:
+                self.prev[following] = x
+        if prev is not None and abs(ys[prev] - top) <= PACK_EPS:
+            ws[prev] += ws[x]
+            following = self.remove_segment(x)
+            self.next[prev] = following
+            if following is not None:
+                self.prev[following] = prev
+
+
+def pack_rects(widths, heights, padding=0.0, rotate=True, max_tiles=0):
+    """矩形をタイル (0〜1) にスカイライン法で詰める（高い順に最も低い位置へ、rotate なら90°回転も試す）
+
+    矩形の周囲に padding の余白を取る（矩形どうしの間隔は padding の2倍）
+    タイルに入らなくなったら次のタイルに詰める。1つのタイルにも入らない矩形は単独のタイルに置く
+    max_tiles: 0 以外なら、それより多くのタイルが必要になった時点で打ち切って None を返す
+      （残りの矩形の面積が、詰める先のタイルの空きと残りのタイルの合計を超えた時点でも打ち切る）
+    返り値: 矩形の左下の位置 (n, 2)（タイル内）、90°回転したか (n,)、タイル番号 (n,)
+    """
+    widths = np.asarray(widths, dtype=np.float64)
+    heights = np.asarray(heights, dtype=np.float64)
+    count = len(widths)
+    position = np.zeros((count, 2), dtype=np.float64)
+    rotated = np.zeros(count, dtype=bool)
+    tile = np.zeros(count, dtype=np.int64)
+    if not count:
+        return position, rotated, tile
+
+    margin = 2.0 * padding
+    outer_w = widths + margin
+    outer_h = heights + margin
+    # 高い順（同じ高さなら幅の広い順）
+    order = np.lexsort((-outer_w, -outer_h))
+
+    skylines = []
+    first_open = 0
+    smallest = float(min(outer_w.min(), outer_h.min()))
+    # 残りの矩形が少なくとも使う面積（タイルより大きい矩形は1枚分）
+    outer_area = np.minimum(outer_w * outer_h, 1.0)
+    remaining = float(outer_area.sum())
+    for index, w, h in zip(order.tolist(), outer_w[order].tolist(), outer_h[order].tolist()):
+        placed = None
+        for tile_index in range(first_open, len(skylines)):
+            skyline = skylines[tile_index]
+            best = skyline.find(w, h)
+            # 回転すると上端は floor + w より低くならないので、回転しない位置がそれより高い時だけ試す
+            turned = None
+            if rotate and w != h and (best is None or best[0] > skyline.floor + w + PACK_EPS):
+                turned = skyline.find(h, w)
+            if turned is not None and (best is None or turned[0] < best[0] - PACK_EPS):
+                skyline.insert(turned[1], h, turned[0])
+                placed = (tile_index, turned[1], turned[0] - w, True)
+            elif best is not None:
+                skyline.insert(best[1], w, best[0])
+                placed = (tile_index, best[1], best[0] - h, False)
+            if placed:
+                break
+        if placed is None:
+            if max_tiles and len(skylines) >= max_tiles:
+                return None
+            skyline = Skyline()
+            skylines.append(skyline)
+            if w <= 1.0 + PACK_EPS and h <= 1.0 + PACK_EPS:
+                skyline.insert(0.0, w, h)
+            else:
+                # タイルより大きい矩形はそのタイルを使い切る
+                skyline.insert(0.0, 1.0, float("inf"))
+            placed = (len(skylines) - 1, 0.0, 0.0, False)
+
+        tile_index, x, y, turned = placed
+        # 古いタイルと、最も小さい矩形も置けなくなったタイルは以降たどらない
+        first_open = max(first_open, len(skylines) - PACK_OPEN_TILES)
+        while first_open < tile_index and skylines[first_open].find(smallest, smallest) is None:
+            first_open += 1
+        tile[index] = tile_index
+        position[index] = (x + padding, y + padding)
+        rotated[index] = turned
+
+        if max_tiles:
+            remaining -= outer_area[index]
+            capacity = max_tiles - len(skylines) + sum(skylines[i].free for i in range(first_open, len(skylines)))
+            if remaining > capacity + PACK_EPS:
+                return None
+    return position, rotated, tile
+
+
+def tile_offsets(tile, columns=PACK_UDIM_COLUMNS):
+    "タイル番号 → タイルの左下（UDIM の並び、1行 columns 枚）"
+    tile = np.asarray(tile, dtype=np.int64)
+    return np.column_stack((tile % columns, tile // columns)).astype(np.float64)
+
+
+def fit_scale(widths, heights, padding=0.0, rotate=True, tiles=1, steps=PACK_FIT_STEPS):
+    "tiles 枚のタイルに収まる最大の拡大率（二分探索）"
+    widths = np.asarray(widths, dtype=np.float64)
+    heights = np.asarray(heights, dtype=np.float64)
+    area = float((widths * heights).sum())
+    if not len(widths) or area <= 0:
+        return 1.0
+
+    def fits(scale):
+        return pack_rects(widths * scale, heights * scale, padding, rotate, tiles) is not None
+
+    # 面積から上限を見積もって、収まる拡大率まで下げる
+    high = (tiles / area) ** 0.5
+    low = high
+    while low > 0 and not fits(low):
+        low *= 0.5
+        if low < 1e-6:
+            return low
+    if low == high:
+        return high
+    for _ in range(steps):
+        middle = (low + high) * 0.5
+        if fits(middle):
+            low = middle
+        else:
+            high = middle
+    return low
@@ -0,0 +1,190 @@
+import numpy as np
+from .islands import connected_components, edge_loop_pairs
+
+UV_KEY_DECIMALS = 5
+
+
+def uv_keys(loop_uv, decimals=UV_KEY_DECIMALS):
+    "丸めたUVが同じループに同じキーを割り当てる。ループごとのキーとキーごとの代表UVを返す"
+    if not len(loop_uv):
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 2), dtype=np.float64)
+    # 丸めた座標を int64 に詰めて1次元で unique する（axis=0 の unique より速い）
+    quantized = np.rint(np.asarray(loop_uv) * 10**decimals).astype(np.int64)
+    packed = (quantized[:, 0] << 32) | (quantized[:, 1] & 0xFFFFFFFF)
+    _, first, keys = np.unique(packed, return_index=True, return_inverse=True)
+    return keys.reshape(-1), loop_uv[first]
+
+
+def boundary_segments(loop_face, loop_edge, loop_next, loop_key, edge_seam, face_count):
+    """UV境界のセグメントを求める
+
+    境界: 面が2つではないエッジ、シーム、両側でUVが繋がっていないエッジ
+    戻り値: (セグメントの始点キー, 終点キー, 所属アイランドのラベル)
+    重なったセグメントは最初のループのものだけを残す
+    """
+    edge_count = len(edge_seam)
+    key_a = loop_key
+    key_b = loop_key[loop_next]
+
+    loop_a, loop_b = edge_loop_pairs(loop_edge, edge_count)
+    same_keys = (np.minimum(key_a[loop_a], key_b[loop_a]) == np.minimum(key_a[loop_b], key_b[loop_b])) & (
+        np.maximum(key_a[loop_a], key_b[loop_a]) == np.maximum(key_a[loop_b], key_b[loop_b])
+    )
+    connected = same_keys & ~edge_seam[loop_edge[loop_a]]
+
+    labels = connected_components(face_count, loop_face[loop_a[connected]], loop_face[loop_b[connected]])
+
+    is_boundary = np.ones(edge_count, dtype=bool)
+    is_boundary[loop_edge[loop_a[connected]]] = False
+    candidates = np.flatnonzero(is_boundary[loop_edge] & (key_a != key_b))
+
+    seg_lo = np.minimum(key_a[candidates], key_b[candidates])
+    seg_hi = np.maximum(key_a[candidates], key_b[candidates])
+    _, first = np.unique(seg_lo * (int(loop_key.max(initial=0)) + 1) + seg_hi, return_index=True)
+    first = np.sort(first)
+    loops = candidates[first]
+    return key_a[loops], key_b[loops], labels[loop_face[loops]]
+
+
+def chain_polylines(seg_a, seg_b):
+    "セグメントを繋いでポリラインにする。[(キーのリスト, 閉じているか), ...] を返す"
+    neighbors = {}
+    unused = set()
+    for k1, k2 in zip(seg_a.tolist(), seg_b.tolist()):
+        neighbors.setdefault(k1, []).append(k2)
+        neighbors.setdefault(k2, []).append(k1)
+        unused.add((k1, k2) if k1 < k2 else (k2, k1))
+    boundary_edges = frozenset(unused)
+
+    def edge_key(a, b):
+        return (a, b) if a < b else (b, a)
+
+    def pop_next(curr, prev=None):
+        for nxt in neighbors[curr]:
+            if nxt != prev and edge_key(curr, nxt) in unused:
+                return nxt
+        for nxt in neighbors[curr]:
+            if edge_key(curr, nxt) in unused:
+                return nxt
+        return None
+
+    polylines = []
+    # 端点から開いたポリラインを作る
+    for start in [k for k, ns in neighbors.items() if len(ns) == 1]:
+        if not any(edge_key(start, n) in unused for n in neighbors[start]):
+            continue
+        chain, prev, curr = [start], None, start
+        while True:
+            nxt = pop_next(curr, prev)
+            if nxt is None:
+                break
+            unused.discard(edge_key(curr, nxt))
+            chain.append(nxt)
+            prev, curr = curr, nxt
+        if len(chain) >= 2:
+            polylines.append((chain, False))
+
+    # 残りは閉ループ
+    while unused:
+        a, b = unused.pop()
+        chain, prev, curr = [a, b], a, b
+        while True:
+            nxt = pop_next(curr, prev)
+            if nxt is None or edge_key(curr, nxt) not in unused:
+                break
+            unused.discard(edge_key(curr, nxt))
+            if nxt == chain[0]:
+                break
+            chain.append(nxt)
+            prev, curr = curr, nxt
+        closed = len(chain) >= 3 and edge_key(chain[-1], chain[0]) in boundary_edges
+        polylines.append((chain, closed))
+
+    return polylines
+
+
+def orient_ccw(points, closed):
+    "閉ループを反時計回りに揃える"
+    if closed and len(points) >= 3:
+        x, y = points[:, 0], points[:, 1]
+        if np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y) < 0:
+            return points[::-1].copy()
+    return points
+
+
+def offset_normals(points, closed):
+    "各点の外向き（進行方向の右側）オフセット方向（長さ1、求まらない点は0）"
+    count = len(points)
+    ends = np.roll(points, -1, axis=0) if closed else points[1:]
+    starts = points if closed else points[:-1]
+    delta = ends - starts
+    length = np.hypot(delta[:, 0], delta[:, 1])[:, None]
+    direction = np.divide(delta, length, out=np.zeros_like(delta), where=length > 0)
+    seg_right = np.stack((direction[:, 1], -direction[:, 0]), axis=1)
+
+    normals = np.zeros((count, 2), dtype=np.float64)
+    if closed:
+        normals += seg_right + np.roll(seg_right, 1, axis=0)
+    else:
+        normals[:-1] += seg_right
+        normals[1:] += seg_right
+    length = np.hypot(normals[:, 0], normals[:, 1])[:, None]
+    return np.divide(normals, length, out=np.zeros_like(normals), where=length > 0)
+
+
+def points_in_polygon(points, polygon):
+    "偶奇規則による内外判定。points: (P, 2), polygon: (N, 2)"
+    px = points[:, 0, None]
+    py = points[:, 1, None]
+    ix, iy = polygon[:, 0][None, :], polygon[:, 1][None, :]
+    jx, jy = np.roll(polygon[:, 0], 1)[None, :], np.roll(polygon[:, 1], 1)[None, :]
+    straddle = (iy > py) != (jy > py)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cross_x = (jx - ix) * (py - iy) / (jy - iy) + ix
+    crossings = np.count_nonzero(straddle & (px < cross_x), axis=1)
+    return crossings % 2 == 1
+
+
+def nesting_signs(loops):
+    """閉ループの入れ子の深さから、オフセットの向き（外側 1.0 / 穴 -1.0）を返す
+
+    各ループの先頭の点が他のループに含まれるかを調べる。
+    x でソートした点をバウンディングボックスで絞り込んでから内外判定する
+    """
+    count = len(loops)
+    if not count:
+        return np.zeros(0, dtype=np.float64)
+
+    lower = np.array([loop.min(axis=0) for loop in loops])
+    upper = np.array([loop.max(axis=0) for loop in loops])
+    first_points = np.array([loop[0] for loop in loops])
+
+    order = np.argsort(first_points[:, 0], kind="stable")
+    sorted_x = first_points[order, 0]
+    depth = np.zeros(count, dtype=np.int64)
+
+    for index, polygon in enumerate(loops):
+        start = np.searchsorted(sorted_x, lower[index, 0], side="left")
+        end = np.searchsorted(sorted_x, upper[index, 0], side="right")
+        candidates = order[start:end]
+        candidates = candidates[candidates != index]
+        y = first_points[candidates, 1]
+        candidates = candidates[(y >= lower[index, 1]) & (y <= upper[index, 1])]
+        if len(candidates):
+            depth[candidates[points_in_polygon(first_points[candidates], polygon)]] += 1
+
+    return np.where(depth % 2 == 1, -1.0, 1.0)
+
+
+def offset_segments(polylines, signs, padding):
+    "オフセットしたポリラインを LINES 用の (K, 2) 頂点配列にする"
+    segments = []
+    for (points, normals, closed), sign in zip(polylines, signs):
+        offset = points + normals * (padding * sign)
+        if closed and len(offset) >= 3:
+            segments.append(np.stack((offset, np.roll(offset, -1, axis=0)), axis=1))
+        else:
+            segments.append(np.stack((offset[:-1], offset[1:]), axis=1))
+    if not segments:
+        return np.zeros((0, 2), dtype=np.float32)
+    return np.concatenate(segments).reshape(-1, 2).astype(np.float32)
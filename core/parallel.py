@@ -0,0 +1,133 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context, shared_memory
+
+PARALLEL_MIN_JOBS = 2  # これより少ないジョブは直列で実行する
+PARALLEL_MIN_SIZE = 20000  # ジョブの配列の合計の要素数がこれより少なければ直列（プロセス間の受け渡しの方が遅い）
+
+
+def export_arrays(arrays):
+    """配列を1つの共有メモリにまとめて書き込む
+
+    返り値: (SharedMemory, レイアウト [(名前, dtype, shape, オフセット), ...])
+    """
+    layout = []
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        layout.append((name, array.dtype.str, array.shape, offset))
+        # 各配列の先頭を8バイトにそろえる
+        offset += (array.nbytes + 7) // 8 * 8
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (name, dtype, shape, start), array in zip(layout, arrays.values()):
+        view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)
+        view[...] = array
+    return shm, layout
+
+
+def import_arrays(shm, layout):
+    "export_arrays の共有メモリの配列のビュー（shm を閉じる前にコピーすること）"
+    return {name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start) for name, dtype, shape, start in layout}
+
+
+def run_job(kernel, shm_name, layout, options):
+    "ワーカーで共有メモリの配列に kernel を実行する"
+    shm = shared_memory.SharedMemory(name=shm_name)
+    arrays = None
+    try:
+        arrays = import_arrays(shm, layout)
+        result = kernel(**arrays, **options)
+        # 共有メモリのビューを返さないようにコピーしてから閉じる
+        return np.array(result) if isinstance(result, np.ndarray) else result
+    finally:
+        del arrays
+        shm.close()
+
+
+# ワーカーで core パッケージだけを読み込めるようにする
+# アドオンの親パッケージ（bpy を読み込む __init__）は実行せず、パスだけを持つ空のモジュールにする
+# 初期化はアドオンのモジュールを import する前に実行されるので、組み込みの exec にコードを渡す
+WORKER_INIT = """
+import os, sys, types
+names = package.split(".")
+for depth in range(1, len(names)):
+    name = ".".join(names[:depth])
+    if name in sys.modules:
+        continue
+    module = types.ModuleType(name)
+    path = package_dir
+    for _ in range(len(names) - depth):
+        path = os.path.dirname(path)
+    module.__path__ = [path]
+    sys.modules[name] = module
+"""
+
+
+class ProcessPool:
+    "ProcessPoolExecutor を使い回す（起動に時間がかかるので最初に使う時に作る）"
+
+    _executor = None
+    _workers = 0
+
+    @classmethod
+    def get(cls, workers=0):
+        "workers: 0 なら使えるコア数"
+        workers = workers or os.cpu_count() or 1
+        if cls._executor is not None and cls._workers != workers:
+            cls.shutdown()
+        if cls._executor is None:
+            # fork は Blender の中では安全ではないので spawn
+            cls._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=get_context("spawn"),
+                initializer=exec,
+                initargs=(WORKER_INIT, {"package": __package__, "package_dir": os.path.dirname(__file__)}),
+            )
+            cls._workers = workers
+        return cls._executor
+
+    @classmethod
+    def shutdown(cls):
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+            cls._workers = 0
+
+
+def job_size(arrays):
+    return sum(np.size(array) for array in arrays.values())
+
+
+def map_kernel(kernel, jobs, options=None, workers=0, parallel=True):
+    """jobs（配列の辞書のリスト）ごとに kernel(**配列, **options) を実行して結果のリストを返す
+
+    配列は共有メモリでワーカーに渡し、結果はメインスレッドに返す。workers: 0 なら使えるコア数
+    kernel は core のモジュールの関数（ワーカーで import できるもの）
+    ジョブが少ない・小さい時や、プロセスを使えない時は直列で実行する
+    """
+    options = options or {}
+    workers = workers or os.cpu_count() or 1
+    if (
+        not parallel
+        or workers == 1
+        or len(jobs) < PARALLEL_MIN_JOBS
+        or sum(job_size(arrays) for arrays in jobs) < PARALLEL_MIN_SIZE
+    ):
+        return [kernel(**arrays, **options) for arrays in jobs]
+
+    exported = []
+    try:
+        for arrays in jobs:
+            exported.append(export_arrays(arrays))
+        executor = ProcessPool.get(workers)
+        futures = [executor.submit(run_job, kernel, shm.name, layout, options) for shm, layout in exported]
+        return [future.result() for future in futures]
+    except (BrokenProcessPool, OSError):
+        ProcessPool.shutdown()
+        return [kernel(**arrays, **options) for arrays in jobs]
+    finally:
+        for shm, _ in exported:
+            shm.close()
+            shm.unlink()
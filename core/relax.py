@@ -0,0 +1,179 @@
+import numpy as np
+from dataclasses import dataclass
+from functools import cached_property
+
+
+@dataclass
+class CSRMatrix:
+    "正方の疎行列（CSR形式）"
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    size: int
+
+    @classmethod
+    def from_rows(cls, rows):
+        "rows[i] = [(列インデックス, 値), ...] から作成"
+        counts = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        total = int(indptr[-1])
+        indices = np.fromiter((j for row in rows for j, _ in row), dtype=np.int64, count=total)
+        data = np.fromiter((w for row in rows for _, w in row), dtype=np.float64, count=total)
+        return cls(indptr, indices, data, len(rows))
+
+    @classmethod
+    def from_coo(cls, rows, cols, values, size):
+        "座標形式から作成（rows は 0..size-1）"
+        order = np.lexsort((cols, rows))
+        indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=size), out=indptr[1:])
+        return cls(indptr, cols[order].astype(np.int64), values[order].astype(np.float64), size)
+
+    @cached_property
+    def row_indices(self):
+        return np.repeat(np.arange(self.size, dtype=np.int64), np.diff(self.indptr))
+
+    def row_sums(self):
+        return np.bincount(self.row_indices, weights=self.data, minlength=self.size)
+
+    def dot(self, x):
+        "行列ベクトル積。x は (N,) または (N, k)"
+        columns = int(np.prod(x.shape[1:]))
+        products = self.data[:, None] * x[self.indices].reshape(len(self.indices), columns)
+        result = np.empty((self.size, products.shape[1]), dtype=np.float64)
+        for column in range(products.shape[1]):
+            result[:, column] = np.bincount(self.row_indices, weights=products[:, column], minlength=self.size)
+        return result.reshape((self.size,) + x.shape[1:])
+
+    def row_normalized(self):
+        "各行の和が1になるように正規化した行列（和が0の行はそのまま）"
+        sums = self.row_sums()
+        scale = np.divide(1.0, sums, out=np.zeros_like(sums), where=sums != 0)
+        return CSRMatrix(self.indptr, self.indices, self.data * scale[self.row_indices], self.size)
+
+
+def taubin_smooth(positions, weights: CSRMatrix, movable, axis_mask, lambda_factor, mu_factor, iterations, eps):
+    """Taubin (λ/μ) スムージング
+
+    positions: (N, 2) の初期位置
+    weights: 隣接ノードの重み行列
+    movable: 移動できるノード（固定ノードと隣接のないノードは False）
+    axis_mask: (2,) の軸ごとの有効フラグ
+    """
+    positions = np.array(positions, dtype=np.float64)
+    movable = movable & (weights.row_sums() > 0)
+    matrix = weights.row_normalized()
+    step_mask = movable[:, None] * np.asarray(axis_mask, dtype=np.float64)[None, :]
+
+    for _ in range(iterations):
+        lambda_positions = positions + (matrix.dot(positions) - positions) * (lambda_factor * step_mask)
+        next_positions = lambda_positions + (matrix.dot(lambda_positions) - lambda_positions) * (mu_factor * step_mask)
+
+        delta = next_positions[movable] - positions[movable]
+        max_move = np.sqrt(np.einsum("ij,ij->i", delta, delta).max()) if len(delta) else 0.0
+        positions = next_positions
+
+        if max_move < eps:
+            break
+
+    return positions
+
+
+def taubin_arrays(positions, indptr, indices, data, movable, **options):
+    "taubin_smooth を配列だけで呼ぶ（map_kernel で別プロセスで実行する用）"
+    return taubin_smooth(positions, CSRMatrix(indptr, indices, data, len(indptr) - 1), movable, **options)
+
+
+def conjugate_gradient(apply, rhs, start, inverse_diagonal, tol=1e-6, max_iterations=1000):
+    "前処理付き共役勾配法。rhs は (N, k) で列ごとに解く"
+    x = start.copy()
+    r = rhs - apply(x)
+    z = r * inverse_diagonal[:, None]
+    p = z.copy()
+    rz = np.einsum("ij,ij->j", r, z)
+    limit = tol * np.maximum(np.linalg.norm(rhs, axis=0), 1e-12)
+
+    for _ in range(max_iterations):
+        if np.all(np.linalg.norm(r, axis=0) <= limit):
+            break
+        ap = apply(p)
+        pap = np.einsum("ij,ij->j", p, ap)
+        alpha = np.divide(rz, pap, out=np.zeros_like(rz), where=pap != 0)
+        x += p * alpha
+        r -= ap * alpha
+        z = r * inverse_diagonal[:, None]
+        rz_next = np.einsum("ij,ij->j", r, z)
+        beta = np.divide(rz_next, rz, out=np.zeros_like(rz), where=rz != 0)
+        p = z + p * beta
+        rz = rz_next
+
+    return x
+
+
+@dataclass
+class LaplaceSystem:
+    """固定ノードを境界条件とする重み付きラプラシアン
+
+    (D + t L) x = D x0 + t W_b x_b を解く（t が大きいほど調和写像に近づく）
+    トポロジーが同じなら使い回せるように前回の解も保持する
+    """
+
+    laplacian: CSRMatrix  # 可動ノード間の D - W
+    boundary: CSRMatrix  # 可動ノードから固定ノードへの重み
+    degree: np.ndarray
+    free: np.ndarray
+    solution: np.ndarray = None
+
+    @classmethod
+    def from_weights(cls, weights: CSRMatrix, movable):
+        movable = movable & (weights.row_sums() > 0)
+        free = np.flatnonzero(movable)
+        local = np.full(weights.size, -1, dtype=np.int64)
+        local[free] = np.arange(len(free))
+
+        rows, cols, values = weights.row_indices, weights.indices, weights.data
+        keep = movable[rows]
+        rows, cols, values = local[rows[keep]], cols[keep], values[keep]
+        to_free = movable[cols]
+
+        degree = np.bincount(rows, weights=values, minlength=len(free))
+        diagonal = np.arange(len(free), dtype=np.int64)
+        laplacian = CSRMatrix.from_coo(
+            np.concatenate((rows[to_free], diagonal)),
+            np.concatenate((local[cols[to_free]], diagonal)),
+            np.concatenate((-values[to_free], degree)),
+            len(free),
+        )
+        boundary = CSRMatrix.from_coo(rows[~to_free], cols[~to_free], values[~to_free], len(free))
+        return cls(laplacian, boundary, degree, free)
+
+    def solve(self, positions, time, tol=1e-6, max_iterations=1000):
+        positions = np.array(positions, dtype=np.float64)
+        if not len(self.free):
+            return positions
+
+        degree = self.degree[:, None]
+        x0 = positions[self.free]
+        rhs = degree * x0 + time * self.boundary.dot(positions)
+        start = self.solution if self.solution is not None and self.solution.shape == x0.shape else x0
+
+        def apply(x):
+            return degree * x + time * self.laplacian.dot(x)
+
+        self.solution = conjugate_gradient(apply, rhs, start, 1.0 / (self.degree * (1.0 + time)), tol, max_iterations)
+        positions[self.free] = self.solution
+        return positions
+
+
+@dataclass
+class RelaxWeights:
+    "グループの重み行列と可動フラグ（リドゥで再利用する。GLOBAL の LaplaceSystem は初めて使う時に作る）"
+
+    weights: CSRMatrix
+    movable: np.ndarray
+
+    @cached_property
+    def system(self):
+        return LaplaceSystem.from_weights(self.weights, self.movable)
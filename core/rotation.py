@@ -0,0 +1,104 @@
+import numpy as np
+from .coverage import fan_corners
+
+AXIS_INDEX_MAP = {
+    "X": 0,
+    "Y": 1,
+    "Z": 2,
+}
+
+SECONDARY_AXIS_MAP = {
+    "X": "Z",
+    "Y": "Z",
+    "Z": "Y",
+}
+
+INVERT_EPS = 1.1920929e-07  # FLT_EPSILON（Matrix.invert_safe と同じ）
+
+
+def loop_prev(face_start, face_size):
+    "面内で前のループ（先頭のループは最後のループ）"
+    prev = np.arange(-1, int(face_size.sum()) - 1, dtype=np.int64)
+    if len(face_start):
+        prev[face_start] = face_start + face_size - 1
+    return prev
+
+
+def rotation_auto(loop_uv, face_start, face_size):
+    "UVのエッジの向きが軸に揃う回転角（エッジ角度の4倍の平均）"
+    if not len(loop_uv):
+        return 0.0
+    delta = loop_uv - loop_uv[loop_prev(face_start, face_size)]
+    edge_angle = np.arctan2(delta[:, 1], delta[:, 0]) * 4.0
+    return -float(np.arctan2(np.sin(edge_angle).sum(), np.cos(edge_angle).sum())) / 4.0
+
+
+def invert_2x2_safe(m00, m01, m10, m11):
+    "2×2行列の逆行列。特異なら対角に小さい値を足し、それでも特異なら単位行列"
+    det = m00 * m11 - m01 * m10
+    singular = det == 0
+    if singular.any():
+        m00 = np.where(singular, m00 + INVERT_EPS, m00)
+        m11 = np.where(singular, m11 + INVERT_EPS, m11)
+        det = m00 * m11 - m01 * m10
+    identity = det == 0
+    scale = np.divide(1.0, det, out=np.zeros_like(det), where=~identity)
+    return (
+        np.where(identity, 1.0, m11 * scale),
+        np.where(identity, 0.0, -m01 * scale),
+        np.where(identity, 0.0, -m10 * scale),
+        np.where(identity, 1.0, m00 * scale),
+    )
+
+
+def uv_tangents(loop_uv, loop_co, face_start, face_size):
+    "U方向・V方向の3D空間での向き（三角形の面積で重み付けした合計）"
+    corners, _ = fan_corners(face_start, face_size)
+    if not len(corners):
+        return np.zeros(3), np.zeros(3)
+    uv0, uv1, uv2 = loop_uv[corners[:, 0]], loop_uv[corners[:, 1]], loop_uv[corners[:, 2]]
+    delta_uv0 = uv1 - uv0
+    delta_uv1 = uv2 - uv0
+    inv00, inv01, inv10, inv11 = invert_2x2_safe(delta_uv0[:, 0], delta_uv0[:, 1], delta_uv1[:, 0], delta_uv1[:, 1])
+
+    base_co = loop_co[corners[:, 0]]
+    delta_co0 = loop_co[corners[:, 1]] - base_co
+    delta_co1 = loop_co[corners[:, 2]] - base_co
+    weight = np.linalg.norm(np.cross(delta_co0, delta_co1), axis=1)
+    sum_u_co = ((delta_co0 * inv00[:, None] + delta_co1 * inv01[:, None]) * weight[:, None]).sum(axis=0)
+    sum_v_co = ((delta_co0 * inv10[:, None] + delta_co1 * inv11[:, None]) * weight[:, None]).sum(axis=0)
+    return sum_u_co, sum_v_co
+
+
+def rotation_geometry(loop_uv, loop_co, face_start, face_size, axis):
+    "3D空間の軸の向きがUVのV方向に揃う回転角"
+    if axis not in AXIS_INDEX_MAP:
+        raise ValueError("Unsupported geometry axis: {}".format(axis))
+
+    sum_u_co, sum_v_co = uv_tangents(loop_uv, loop_co, face_start, face_size)
+    axis_index = AXIS_INDEX_MAP[axis]
+    primary_u = float(sum_u_co[axis_index])
+    primary_v = float(sum_v_co[axis_index])
+
+    if abs(primary_u) <= 1e-8 and abs(primary_v) <= 1e-8:
+        secondary_axis = SECONDARY_AXIS_MAP.get(axis)
+        if secondary_axis is not None:
+            secondary_index = AXIS_INDEX_MAP[secondary_axis]
+            return float(np.arctan2(sum_u_co[secondary_index], sum_v_co[secondary_index]))
+
+    return float(np.arctan2(primary_u, primary_v))
+
+
+def rotate_uvs(uvs, angle, center):
+    "center を中心に回転したUV"
+    cos_angle = np.cos(angle)
+    sin_angle = np.sin(angle)
+    matrix = np.array(((cos_angle, sin_angle), (-sin_angle, cos_angle)))
+    center = np.asarray(center, dtype=np.float64)
+    return (uvs - center) @ matrix + center
+
+
+def transform_points(co, matrix):
+    "4×4行列で座標を変換する"
+    matrix = np.asarray(matrix, dtype=np.float64)
+    return co @ matrix[:3, :3].T + matrix[:3, 3]
@@ -0,0 +1,84 @@
+import numpy as np
+
+SIGNATURE_FIELDS = ("faces", "loops", "edges", "verts", "boundary", "topology")
+
+
+def distinct_counts(owner, values, owner_count):
+    "owner ごとの異なる values の数と、owner の中で1回だけ現れる values の数（owner が -1 の要素は除外）"
+    owner = np.asarray(owner, dtype=np.int64)
+    values = np.asarray(values, dtype=np.int64)
+    valid = owner >= 0
+    if not valid.any():
+        zeros = np.zeros(owner_count, dtype=np.int64)
+        return zeros, zeros.copy()
+    stride = int(values.max()) + 1
+    keys, counts = np.unique(owner[valid] * stride + values[valid], return_counts=True)
+    key_owner = keys // stride
+    distinct = np.bincount(key_owner, minlength=owner_count)
+    single = np.bincount(key_owner[counts == 1], minlength=owner_count)
+    return distinct, single
+
+
+def first_appearance_labels(rows):
+    "同じ行に同じラベル（0からの連番、最初に現れた順）"
+    rows = np.asarray(rows)
+    if not len(rows):
+        return np.zeros(0, dtype=np.int64)
+    _, first, inverse = np.unique(rows, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind="stable")
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[order] = np.arange(len(first), dtype=np.int64)
+    return rank[inverse.reshape(-1)]
+
+
+def island_signatures(face_island, island_count, face_size, loop_face, loop_vert, loop_edge, face_area=None):
+    """アイランドごとのシグネチャ（配列の辞書、インデックスはアイランドID）
+
+    face_island: 面 → アイランドID（-1 はアイランドでない面）
+    topology: 面数・ループ数・エッジ数・頂点数・境界エッジ数・三角形と四角形の数が同じアイランドに同じラベル
+    """
+    face_island = np.asarray(face_island, dtype=np.int64)
+    face_size = np.asarray(face_size, dtype=np.int64)
+    in_island = face_island >= 0
+    owner = face_island[in_island]
+    size = face_size[in_island]
+
+    loop_island = face_island[loop_face]
+    edges, boundary = distinct_counts(loop_island, loop_edge, island_count)
+    verts, _ = distinct_counts(loop_island, loop_vert, island_count)
+    signatures = {
+        "faces": np.bincount(owner, minlength=island_count),
+        "loops": np.bincount(owner, weights=size, minlength=island_count).astype(np.int64),
+        "edges": edges,
+        "verts": verts,
+        "boundary": boundary,
+    }
+    tris = np.bincount(owner[size == 3], minlength=island_count)
+    quads = np.bincount(owner[size == 4], minlength=island_count)
+    signatures["topology"] = np.column_stack(
+        [signatures[name] for name in ("faces", "loops", "edges", "verts", "boundary")] + [tris, quads]
+    )
+    if face_area is not None:
+        signatures["area"] = np.bincount(owner, weights=np.asarray(face_area)[in_island], minlength=island_count)
+    return signatures
+
+
+def tolerance_labels(values, threshold):
+    """値の相対差が threshold 以内のものを同じラベルにする（昇順に走査して、グループの最小値との差で区切る）
+
+    ラベルは値の昇順
+    """
+    values = np.asarray(values, dtype=np.float64)
+    labels = np.zeros(len(values), dtype=np.int64)
+    if not len(values):
+        return labels
+    order = np.argsort(values, kind="stable")
+    label = 0
+    anchor = values[order[0]]
+    for index in order.tolist():
+        value = values[index]
+        if value > 0 and (value - anchor) / value > threshold:
+            label += 1
+            anchor = value
+        labels[index] = label
+    return labels
@@ -0,0 +1,183 @@
+import numpy as np
+from typing import NamedTuple
+
+STACK_HASH_ROUNDS = 3  # 隣接面のハッシュを重ねる回数
+STACK_MAX_STARTS = 64  # 対応を探す時に試す開始ループの上限
+
+_MIX_A = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_B = np.uint64(0x94D049BB133111EB)
+_MIX_SEED = np.uint64(0x6D696F33)
+
+
+def mix_hash(values):
+    "uint64 のハッシュ（splitmix64 の最終段）"
+    x = np.asarray(values).astype(np.uint64)
+    with np.errstate(over="ignore"):
+        x = x ^ (x >> np.uint64(30))
+        x = x * _MIX_A
+        x = x ^ (x >> np.uint64(27))
+        x = x * _MIX_B
+        x = x ^ (x >> np.uint64(31))
+    return x
+
+
+def face_hashes(face_island, face_size, loop_face, edge_pair_a, edge_pair_b, rounds=STACK_HASH_ROUNDS):
+    """面ごとのトポロジーのハッシュ（WL 風に同じアイランドの隣接面のハッシュを重ねる）
+
+    面の頂点数から始めて、エッジでつながった同じアイランドの面のハッシュの和を混ぜる
+    """
+    face_island = np.asarray(face_island, dtype=np.int64)
+    face_a = np.asarray(loop_face, dtype=np.int64)[edge_pair_a]
+    face_b = np.asarray(loop_face, dtype=np.int64)[edge_pair_b]
+    inner = (face_island[face_a] >= 0) & (face_island[face_a] == face_island[face_b])
+    face_a, face_b = face_a[inner], face_b[inner]
+
+    hashes = mix_hash(np.asarray(face_size, dtype=np.int64) + _MIX_SEED)
+    for _ in range(rounds):
+        neighbors = np.zeros(len(hashes), dtype=np.uint64)
+        np.add.at(neighbors, face_a, mix_hash(hashes[face_b]))
+        np.add.at(neighbors, face_b, mix_hash(hashes[face_a]))
+        with np.errstate(over="ignore"):
+            hashes = mix_hash(hashes * _MIX_A + neighbors)
+    return hashes
+
+
+def island_fingerprints(face_island, island_count, face_hash):
+    "アイランドごとのフィンガープリント（面のハッシュの多重集合のハッシュ）"
+    face_island = np.asarray(face_island, dtype=np.int64)
+    in_island = face_island >= 0
+    fingerprints = np.zeros(island_count, dtype=np.uint64)
+    np.add.at(fingerprints, face_island[in_island], mix_hash(face_hash[in_island]))
+    return fingerprints
+
+
+class LoopShape(NamedTuple):
+    """1つのアイランドのループ配列（面ごとに連続して並んだループ）
+
+    loop_start / loop_size: ループが属する面の先頭ループと頂点数
+    loop_vert: 頂点インデックス（アイランドの外と共有していてもよい）
+    loop_twin: 同じアイランドでエッジを共有する反対側のループ（なければ -1）
+    loop_hash: ループが属する面のハッシュ
+    """
+
+    loop_start: np.ndarray
+    loop_size: np.ndarray
+    loop_vert: np.ndarray
+    loop_twin: np.ndarray
+    loop_hash: np.ndarray
+
+    @classmethod
+    def from_loops(cls, loop_face, loop_vert, loop_twin, loop_hash):
+        loop_face = np.asarray(loop_face, dtype=np.int64)
+        count = len(loop_face)
+        starts = np.flatnonzero(np.r_[True, loop_face[1:] != loop_face[:-1]]) if count else np.zeros(0, np.int64)
+        sizes = np.diff(np.r_[starts, count])
+        return cls(np.repeat(starts, sizes), np.repeat(sizes, sizes), loop_vert, loop_twin, loop_hash)
+
+
+def traverse_loops(shape: LoopShape, start):
+    """start のループから面を幅優先でたどった順のループ（たどれないループがあれば None）
+
+    隣の面はエッジを共有するループから回り始めるので、開始ループが決まれば順番も決まる
+    """
+    loop_start, loop_size, loop_twin = shape.loop_start.tolist(), shape.loop_size.tolist(), shape.loop_twin.tolist()
+    count = len(loop_start)
+    visited = [False] * count
+    order = []
+    queue = [start]
+    visited[loop_start[start]] = True
+    head = 0
+    while head < len(queue):
+        first = queue[head]
+        head += 1
+        face_start, size = loop_start[first], loop_size[first]
+        offset = first - face_start
+        for k in range(size):
+            loop = face_start + (offset + k) % size
+            order.append(loop)
+            twin = loop_twin[loop]
+            if twin >= 0 and not visited[loop_start[twin]]:
+                visited[loop_start[twin]] = True
+                queue.append(twin)
+    if len(order) != count:
+        return None
+    return np.array(order, dtype=np.int64)
+
+
+def loop_code(shape: LoopShape, order):
+    "order の順に並べたループの構造（頂点の初出順ラベル・面の頂点数・反対側のループの位置）"
+    position = np.empty(len(order), dtype=np.int64)
+    position[order] = np.arange(len(order), dtype=np.int64)
+    _, first, inverse = np.unique(shape.loop_vert[order], return_index=True, return_inverse=True)
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[np.argsort(first, kind="stable")] = np.arange(len(first), dtype=np.int64)
+    twin = shape.loop_twin[order]
+    twin = np.where(twin >= 0, position[np.maximum(twin, 0)], -1)
+    return np.stack([rank[inverse.reshape(-1)], shape.loop_size[order], twin])
+
+
+def loop_correspondences(source: LoopShape, target: LoopShape, max_starts=STACK_MAX_STARTS):
+    """source のループごとに対応する target のループ（候補のリスト、見つからなければ空）
+
+    並びがそのまま対応していればそれだけを返す
+    そうでなければ、ハッシュが最も少ない面から source と target をたどって構造が一致する開始ループを探す
+    """
+    count = len(source.loop_start)
+    if count != len(target.loop_start) or not count:
+        return []
+    identity = np.arange(count, dtype=np.int64)
+    if np.array_equal(loop_code(source, identity), loop_code(target, identity)):
+        return [identity]
+
+    hashes, counts = np.unique(source.loop_hash, return_counts=True)
+    rare = hashes[np.argmin(counts)]
+    source_order = traverse_loops(source, int(np.flatnonzero(source.loop_hash == rare)[0]))
+    if source_order is None:
+        return []
+    source_code = loop_code(source, source_order)
+
+    result = []
+    for start in np.flatnonzero(target.loop_hash == rare)[:max_starts].tolist():
+        target_order = traverse_loops(target, start)
+        if target_order is None or not np.array_equal(loop_code(target, target_order), source_code):
+            continue
+        mapping = np.empty(count, dtype=np.int64)
+        mapping[source_order] = target_order
+        result.append(mapping)
+    return result
+
+
+def procrustes(source, targets, scale=True):
+    """targets (k, n, 2) をそれぞれ source (n, 2) に重ねる回転・拡大縮小・移動（反転なし）
+
+    返り値: 回転角 (k,)、拡大率 (k,)、残差の二乗和 (k,)
+    変換後の点は factor * R(angle) @ (p - target の重心) + source の重心
+    """
+    source = np.asarray(source, dtype=np.float64)
+    targets = np.asarray(targets, dtype=np.float64).reshape(-1, len(source), 2)
+    source_center = source.mean(axis=0)
+    target_center = targets.mean(axis=1)
+    a = source - source_center
+    b = targets - target_center[:, None, :]
+
+    dot = np.einsum("knj,nj->k", b, a)
+    cross = np.einsum("kn,n->k", b[:, :, 0], a[:, 1]) - np.einsum("kn,n->k", b[:, :, 1], a[:, 0])
+    angle = np.arctan2(cross, dot)
+    norm = np.hypot(dot, cross)
+    source_sq = np.einsum("nj,nj->", a, a)
+    target_sq = np.einsum("knj,knj->k", b, b)
+    if scale:
+        factor = np.divide(norm, target_sq, out=np.ones_like(norm), where=target_sq > 0)
+    else:
+        factor = np.ones_like(norm)
+    residual = np.maximum(source_sq - 2 * factor * norm + factor * factor * target_sq, 0)
+    return angle, factor, residual
+
+
+def apply_similarity(uvs, angle, factor, center):
+    "procrustes の変換を1つのアイランドの UV (n, 2) に適用する（center は source の重心）"
+    uvs = np.asarray(uvs, dtype=np.float64)
+    cos, sin = np.cos(angle), np.sin(angle)
+    centered = uvs - uvs.mean(axis=0)
+    rotated = np.column_stack((centered[:, 0] * cos - centered[:, 1] * sin, centered[:, 0] * sin + centered[:, 1] * cos))
+    return rotated * factor + center
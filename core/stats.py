@@ -0,0 +1,93 @@
+import numpy as np
+from dataclasses import dataclass, field
+from .coverage import calc_coverage, face_areas
+from .islands import find_island_labels
+from .texel import face_world_areas, texel_densities, weighted_density
+
+
+@dataclass
+class StatsSnapshot:
+    "統計の計算に使うオブジェクトごとの配列（メインスレッドでコピーしておく）"
+
+    face_start: np.ndarray
+    face_size: np.ndarray
+    loop_face: np.ndarray
+    loop_vert: np.ndarray
+    loop_edge: np.ndarray
+    loop_next: np.ndarray
+    loop_uv: np.ndarray
+    edge_seam: np.ndarray
+    vert_co: np.ndarray
+    matrix: np.ndarray  # ワールド行列 (4, 4)
+    face_visible: np.ndarray  # アイランドと密度の対象の面
+    face_coverage: np.ndarray  # カバレッジの対象の面
+    pixels: float  # テクスチャのピクセル数
+
+
+@dataclass
+class UVStatistics:
+    island_count: int = 0
+    face_count: int = 0
+    texel_density: float = 0.0
+    coverage: dict = field(default_factory=dict)  # {(tile_u, tile_v): 0-1}
+
+
+def uv_statistics(snapshots: list[StatsSnapshot], resolution, use_udim=False, cancelled=None):
+    """アイランド数・テクセル密度（面積で重み付けした平均）・カバレッジ
+
+    cancelled: 処理の区切りごとに呼び、True なら計算をやめて None を返す
+    """
+    stats = UVStatistics()
+    world_parts = []
+    uv_parts = []
+    pixel_parts = []
+    coverage_uvs = []
+    coverage_sizes = []
+
+    for snapshot in snapshots:
+        if cancelled is not None and cancelled():
+            return None
+        face_count = len(snapshot.face_start)
+        if not face_count:
+            continue
+        visible = snapshot.face_visible
+        labels = find_island_labels(
+            snapshot.loop_face,
+            snapshot.loop_vert,
+            snapshot.loop_edge,
+            snapshot.loop_next,
+            snapshot.loop_uv,
+            snapshot.edge_seam,
+            visible,
+            ~visible,
+            visible,
+        )
+        valid = labels >= 0
+        roots, islands = np.unique(labels[valid], return_inverse=True)
+        stats.island_count += len(roots)
+        stats.face_count += int(np.count_nonzero(valid))
+
+        face_world = face_world_areas(
+            snapshot.vert_co, snapshot.matrix, snapshot.loop_vert, snapshot.face_start, snapshot.face_size
+        )
+        face_uv = face_areas(snapshot.loop_uv, snapshot.face_start, snapshot.face_size)
+        world_parts.append(np.bincount(islands, weights=face_world[valid], minlength=len(roots)))
+        uv_parts.append(np.bincount(islands, weights=face_uv[valid], minlength=len(roots)))
+        pixel_parts.append(np.full(len(roots), float(snapshot.pixels)))
+
+        mask = snapshot.face_coverage
+        coverage_uvs.append(snapshot.loop_uv[mask[snapshot.loop_face]])
+        coverage_sizes.append(snapshot.face_size[mask])
+
+    if world_parts:
+        world_area = np.concatenate(world_parts)
+        density = texel_densities(world_area, np.concatenate(uv_parts), np.concatenate(pixel_parts))
+        stats.texel_density = weighted_density(density, world_area)
+
+    if cancelled is not None and cancelled():
+        return None
+    if coverage_uvs:
+        stats.coverage = calc_coverage(
+            np.concatenate(coverage_uvs), np.concatenate(coverage_sizes), resolution, use_udim
+        )
+    return stats
@@ -0,0 +1,157 @@
+import numpy as np
+
+GRID_MAX_CELLS = 1 << 20  # 1軸あたりのセル数の上限（キーを int64 に収めるため）
+ROW_HASH_SEED = 0x6D696F33
+
+
+def mirror_coords(coords, axis_index):
+    "対称軸で反転した座標"
+    mirrored = np.array(coords, dtype=np.float64)
+    mirrored[:, axis_index] *= -1
+    return mirrored
+
+
+def grid_nearest(points, queries, threshold):
+    """クエリごとに threshold 未満で最も近い点のインデックスを返す（なければ -1）
+
+    座標を threshold の大きさのグリッドに量子化し、周囲27セルの点だけを比較する
+    """
+    points = np.asarray(points, dtype=np.float64)
+    queries = np.asarray(queries, dtype=np.float64)
+    result = np.full(len(queries), -1, dtype=np.int64)
+    if not len(points) or not len(queries):
+        return result
+    points = points.reshape(len(points), -1)
+    queries = queries.reshape(len(queries), -1)
+
+    lower = np.minimum(points.min(axis=0), queries.min(axis=0))
+    upper = np.maximum(points.max(axis=0), queries.max(axis=0))
+    cell_size = max(threshold, float((upper - lower).max()) / (GRID_MAX_CELLS - 3))
+    dims = np.floor((upper - lower) / cell_size).astype(np.int64) + 3
+
+    def cell_keys(cells):
+        return np.ravel_multi_index(cells.T, dims, mode="clip")
+
+    point_cells = np.floor((points - lower) / cell_size).astype(np.int64) + 1
+    query_cells = np.floor((queries - lower) / cell_size).astype(np.int64) + 1
+    order = np.argsort(cell_keys(point_cells), kind="stable")
+    sorted_keys = cell_keys(point_cells)[order]
+
+    best_dist = np.full(len(queries), threshold * threshold)
+    for offset in grid_offsets(points.shape[1]):
+        keys = cell_keys(query_cells + offset)
+        start = np.searchsorted(sorted_keys, keys, side="left")
+        end = np.searchsorted(sorted_keys, keys, side="right")
+        # セル内の点を1つずつ比較する（通常は1点程度）
+        active = np.flatnonzero(start < end)
+        step = 0
+        while len(active):
+            candidate = order[start[active] + step]
+            delta = points[candidate] - queries[active]
+            dist = np.einsum("ij,ij->i", delta, delta)
+            closer = dist < best_dist[active]
+            best_dist[active[closer]] = dist[closer]
+            result[active[closer]] = candidate[closer]
+            step += 1
+            active = active[start[active] + step < end[active]]
+
+    return result
+
+
+def grid_offsets(dimension):
+    "周囲のセルへのオフセット"
+    grids = np.meshgrid(*([np.array((-1, 0, 1))] * dimension), indexing="ij")
+    return np.stack([grid.reshape(-1) for grid in grids], axis=1).astype(np.int64)
+
+
+def face_vertex_rows(loop_vert, face_start, face_size, faces):
+    "同じ頂点数の面について、ソートした頂点インデックスの (F, k) 配列"
+    size = int(face_size[faces[0]])
+    rows = loop_vert[face_start[faces][:, None] + np.arange(size)]
+    return np.sort(rows, axis=1)
+
+
+def row_hashes(rows):
+    "行ごとのハッシュ（オーバーフローは折り返す）"
+    rng = np.random.default_rng(ROW_HASH_SEED)
+    multipliers = rng.integers(1, np.iinfo(np.int64).max, size=rows.shape[1], dtype=np.int64) | 1
+    with np.errstate(over="ignore"):
+        return (rows.astype(np.int64) * multipliers).sum(axis=1)
+
+
+def match_faces(loop_vert, face_start, face_size, vert_map):
+    """頂点を vert_map で写した頂点の集合が一致する面を返す（なければ -1）"""
+    face_count = len(face_size)
+    result = np.full(face_count, -1, dtype=np.int64)
+
+    for size in np.unique(face_size).tolist():
+        faces = np.flatnonzero(face_size == size)
+        rows = face_vertex_rows(loop_vert, face_start, face_size, faces)
+        mapped = vert_map[loop_vert[face_start[faces][:, None] + np.arange(size)]]
+        valid = np.all(mapped >= 0, axis=1)
+        mapped = np.sort(mapped, axis=1)
+
+        hashes = row_hashes(rows)
+        mapped_hashes = row_hashes(mapped)
+        order = np.argsort(hashes, kind="stable")
+        sorted_hashes = hashes[order]
+        position = np.minimum(np.searchsorted(sorted_hashes, mapped_hashes), len(faces) - 1)
+        candidate = order[position]
+        found = valid & (sorted_hashes[position] == mapped_hashes) & np.all(rows[candidate] == mapped, axis=1)
+        result[faces[found]] = faces[candidate[found]]
+
+    return result
+
+
+def match_loops(loop_face, loop_vert, face_map, vert_map, target_loop_face=None, target_loop_vert=None):
+    """対応する面の中で、写した頂点を持つループを返す（なければ -1）
+
+    target_loop_face / target_loop_vert を省略すると同じメッシュの中で探す
+    """
+    if target_loop_face is None:
+        target_loop_face, target_loop_vert = loop_face, loop_vert
+    result = np.full(len(loop_face), -1, dtype=np.int64)
+    target_face = face_map[loop_face]
+    target_vert = vert_map[loop_vert]
+    valid = np.flatnonzero((target_face >= 0) & (target_vert >= 0))
+    if not len(valid) or not len(target_loop_face):
+        return result
+
+    vert_count = int(max(target_loop_vert.max(), target_vert.max())) + 1
+    keys = target_loop_face * vert_count + target_loop_vert
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    query = target_face[valid] * vert_count + target_vert[valid]
+    position = np.minimum(np.searchsorted(sorted_keys, query), len(keys) - 1)
+    found = sorted_keys[position] == query
+    result[valid[found]] = order[position[found]]
+    return result
+
+
+def nearest_face_loops(loop_co, loop_face, face_map, target_face_start, target_face_size, target_loop_co):
+    """対応する面（face_map）のループのうち、位置が最も近いループを返す（対応する面がなければ -1）
+
+    しきい値はなく、頂点が少しずれていても面の中で一番近いループを使う
+    """
+    result = np.full(len(loop_face), -1, dtype=np.int64)
+    target_face = face_map[loop_face]
+    valid = np.flatnonzero(target_face >= 0)
+    if not len(valid):
+        return result
+
+    starts = target_face_start[target_face[valid]]
+    sizes = target_face_size[target_face[valid]]
+    # 面の大きさの違いは最後のループを繰り返して埋める
+    offsets = np.minimum(np.arange(int(sizes.max())), sizes[:, None] - 1)
+    candidates = starts[:, None] + offsets
+    dist = ((target_loop_co[candidates] - loop_co[valid][:, None]) ** 2).sum(axis=2)
+    result[valid] = candidates[np.arange(len(valid)), dist.argmin(axis=1)]
+    return result
+
+
+def face_centers(coords, loop_vert, face_start, face_size):
+    "面の頂点の平均位置"
+    if not len(face_size):
+        return np.zeros((0, coords.shape[1]), dtype=np.float64)
+    sums = np.add.reduceat(coords[loop_vert], face_start, axis=0)
+    return sums / face_size[:, None]
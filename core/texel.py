@@ -0,0 +1,114 @@
+import numpy as np
+from .coverage import face_areas
+
+HEATMAP_EMPTY = -16.0  # UV面積が0の面の log2(密度)
+
+
+def transform_points(co, matrix):
+    "(n, 3) の座標に 4x4 行列を掛ける"
+    matrix = np.asarray(matrix, dtype=np.float64)
+    return np.asarray(co, dtype=np.float64) @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def face_world_areas(vert_co, matrix, loop_vert, face_start, face_size):
+    "ワールド座標での面積（頂点をまとめて変換してから扇形の三角形で求める）"
+    return face_areas(transform_points(vert_co, matrix)[loop_vert], face_start, face_size)
+
+
+def texel_densities(world_area, uv_area, pixels):
+    "テクセル密度 sqrt(UV面積 × ピクセル数 / 面積)（どちらかの面積が0なら0）"
+    world_area = np.asarray(world_area, dtype=np.float64)
+    uv_area = np.asarray(uv_area, dtype=np.float64)
+    valid = (world_area > 0) & (uv_area > 0)
+    density = np.zeros(len(world_area), dtype=np.float64)
+    density[valid] = np.sqrt(uv_area[valid] * np.asarray(pixels, dtype=np.float64)[valid] / world_area[valid])
+    return density
+
+
+def weighted_density(density, world_area):
+    "面積で重み付けした平均の密度（密度が0のものは除く、なければ0）"
+    valid = density > 0
+    total = float(world_area[valid].sum())
+    if total <= 0:
+        return 0.0
+    return float((density[valid] * world_area[valid]).sum() / total)
+
+
+def segment_centers(uvs, offsets):
+    "区間（offsets で区切ったUV）ごとのバウンディングボックスの中心"
+    if not len(offsets):
+        return np.zeros((0, 2), dtype=np.float64)
+    return (np.minimum.reduceat(uvs, offsets, axis=0) + np.maximum.reduceat(uvs, offsets, axis=0)) * 0.5
+
+
+def scale_segments(uvs, counts, factors, pivots):
+    "区間ごとに pivots を中心に factors 倍する（counts は区間ごとのUVの数）"
+    factors = np.repeat(np.asarray(factors, dtype=np.float64), counts)[:, None]
+    pivots = np.repeat(np.asarray(pivots, dtype=np.float64).reshape(-1, 2), counts, axis=0)
+    return pivots + (uvs - pivots) * factors
+
+
+def loop_prev(loop_next):
+    "面内で前のループ（loop_next の逆）"
+    prev = np.empty_like(loop_next)
+    prev[loop_next] = np.arange(len(loop_next), dtype=loop_next.dtype)
+    return prev
+
+
+def corner_angles(loop_co, loop_next):
+    "ループの角の角度（2D・3D どちらでも）"
+    to_next = loop_co[loop_next] - loop_co
+    to_prev = loop_co[loop_prev(loop_next)] - loop_co
+    length = np.sqrt(np.einsum("ij,ij->i", to_next, to_next) * np.einsum("ij,ij->i", to_prev, to_prev))
+    cos = np.einsum("ij,ij->i", to_next, to_prev) / np.maximum(length, 1e-20)
+    return np.arccos(np.clip(cos, -1.0, 1.0))
+
+
+def angle_distortion(world_co, loop_uv, loop_next, face_start, face_size):
+    "面ごとの角の角度の差（ラジアン）の平均"
+    if not len(face_start):
+        return np.zeros(0, dtype=np.float64)
+    error = np.abs(corner_angles(world_co, loop_next) - corner_angles(loop_uv, loop_next))
+    return np.add.reduceat(error, face_start) / face_size
+
+
+def area_distortion(world_area, uv_area):
+    "面積の割合の比 log2((UV面積 / 合計) / (面積 / 合計))（どちらかの面積が0なら0）"
+    world_area = np.asarray(world_area, dtype=np.float64)
+    uv_area = np.asarray(uv_area, dtype=np.float64)
+    valid = (world_area > 0) & (uv_area > 0)
+    distortion = np.zeros(len(world_area), dtype=np.float64)
+    if valid.any():
+        ratio = (uv_area[valid] / uv_area[valid].sum()) / (world_area[valid] / world_area[valid].sum())
+        distortion[valid] = np.log2(ratio)
+    return distortion
+
+
+def face_heatmaps(vert_co, matrix, loop_vert, loop_uv, loop_next, face_start, face_size, pixels):
+    """面ごとのヒートマップの値（いずれも float32）
+
+    density: log2(テクセル密度)（UV面積が0の面は HEATMAP_EMPTY）
+    area: area_distortion
+    angle: angle_distortion
+    """
+    world_co = transform_points(vert_co, matrix)[loop_vert]
+    world_area = face_areas(world_co, face_start, face_size)
+    uv_area = face_areas(loop_uv, face_start, face_size)
+    density = texel_densities(world_area, uv_area, np.full(len(face_start), float(pixels)))
+    log_density = np.full(len(face_start), HEATMAP_EMPTY, dtype=np.float64)
+    np.log2(density, out=log_density, where=density > 0)
+    return {
+        "density": log_density.astype(np.float32),
+        "area": area_distortion(world_area, uv_area).astype(np.float32),
+        "angle": angle_distortion(world_co, loop_uv, loop_next, face_start, face_size).astype(np.float32),
+    }
+
+
+def island_uv_bounds(loop_uv, loop_island, island_count):
+    "アイランドごとのUVの範囲 (min, max)（ループのアイランドID、-1 は除く）"
+    lower = np.full((island_count, 2), np.inf)
+    upper = np.full((island_count, 2), -np.inf)
+    valid = loop_island >= 0
+    np.minimum.at(lower, loop_island[valid], loop_uv[valid])
+    np.maximum.at(upper, loop_island[valid], loop_uv[valid])
+    return lower, upper
@@ -0,0 +1,163 @@
+import numpy as np
+from dataclasses import dataclass
+from .islands import connected_components, group_by_label
+from .uv_weld import UV_KEY_DECIMALS, quantize_uvs
+
+
+def csr_ranges(ptr, rows):
+    "CSR の rows の行の要素インデックスと、要素ごとの行（rows の中の位置）"
+    rows = np.asarray(rows, dtype=np.int64)
+    counts = ptr[rows + 1] - ptr[rows]
+    owner = np.repeat(np.arange(len(rows), dtype=np.int64), counts)
+    offsets = np.arange(int(counts.sum()), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(ptr[rows], counts) + offsets, owner
+
+
+@dataclass
+class UVNodeGraph:
+    """UVノードの隣接グラフ（ノードは0からの連番）
+
+    node_loop_ptr / node_loops: ノードごとのループ（CSR）
+    adj_ptr / adj_nodes: ノードごとの隣接ノード（CSR、両方向）
+    loop_node: すべてのループ → ノード（ノードにならないループは -1）
+    """
+
+    node_uv: np.ndarray
+    node_vert: np.ndarray
+    node_loop_ptr: np.ndarray
+    node_loops: np.ndarray
+    adj_ptr: np.ndarray
+    adj_nodes: np.ndarray
+    loop_node: np.ndarray
+
+    @property
+    def node_count(self):
+        return len(self.node_uv)
+
+    def loops(self, node):
+        return self.node_loops[self.node_loop_ptr[node] : self.node_loop_ptr[node + 1]]
+
+    def neighbors(self, node):
+        return self.adj_nodes[self.adj_ptr[node] : self.adj_ptr[node + 1]]
+
+    def degree(self):
+        return np.diff(self.adj_ptr)
+
+    def first_loops(self):
+        "ノードごとの最初のループ"
+        return self.node_loops[self.node_loop_ptr[:-1]]
+
+    def loops_of(self, nodes):
+        "ノードのループと、ループごとのノード（nodes の中の位置）"
+        index, owner = csr_ranges(self.node_loop_ptr, nodes)
+        return self.node_loops[index], owner
+
+    def local_adjacency(self, nodes):
+        "nodes の中だけの隣接ペア（両方向、nodes の中の位置）"
+        local = np.full(self.node_count, -1, dtype=np.int64)
+        local[nodes] = np.arange(len(nodes), dtype=np.int64)
+        index, rows = csr_ranges(self.adj_ptr, nodes)
+        cols = local[self.adj_nodes[index]]
+        keep = cols >= 0
+        return rows[keep], cols[keep]
+
+    def edges(self):
+        "重複しない隣接ペア (a < b)"
+        a = np.repeat(np.arange(self.node_count, dtype=np.int64), self.degree())
+        b = self.adj_nodes
+        keep = a < b
+        return a[keep], b[keep]
+
+    def components(self):
+        "連結成分ごとのノードのインデックス配列のリスト"
+        a, b = self.edges()
+        return group_by_label(connected_components(self.node_count, a, b))
+
+    def ordered_nodes(self, nodes):
+        """nodes の中を深さ優先でたどった順（端点、なければ最小のUVから開始）
+
+        UVNodeGroup.get_ordered_nodes と同じ順序
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        if not len(nodes):
+            return nodes
+        inside = np.zeros(self.node_count, dtype=bool)
+        inside[nodes] = True
+        degree = self.degree()[nodes]
+        ends = nodes[degree == 1]
+        if len(ends):
+            start = int(ends[0])
+        else:
+            uv = self.node_uv[nodes]
+            start = int(nodes[np.lexsort((self.node_vert[nodes], uv[:, 1], uv[:, 0]))[0]])
+
+        ordered = [start]
+        visited = {start}
+        stack = [start]
+        adj_ptr, adj_nodes = self.adj_ptr, self.adj_nodes
+        while stack:
+            current = stack.pop()
+            for neighbor in adj_nodes[adj_ptr[current] : adj_ptr[current + 1]].tolist():
+                if inside[neighbor] and neighbor not in visited:
+                    ordered.append(neighbor)
+                    visited.add(neighbor)
+                    stack.append(neighbor)
+        return np.array(ordered, dtype=np.int64)
+
+
+def build_uv_graph(loop_uv, loop_vert, loop_edge, loop_next, candidate, loop_uv_select_edge, keys):
+    """選択されたループからUVノードのグラフを作る
+
+    candidate: ノードになるループ
+    keys: ループごとのノードのキー（uv_weld のラベル）
+    キーが同じループは1つのノードにまとめる（候補でないループもキーが同じならそのノードとして接続に使う）
+    接続はいずれかのループがUVエッジ選択されているエッジのうち、両端がノードになるもの
+    """
+    loop_count = len(loop_uv)
+    keys = np.asarray(keys, dtype=np.int64)
+    rounded_uv = quantize_uvs(loop_uv) / 10**UV_KEY_DECIMALS
+    candidate_loops = np.flatnonzero(candidate)
+
+    node_of_key = np.full(int(keys.max(initial=-1)) + 1, -1, dtype=np.int64)
+    candidate_keys = np.unique(keys[candidate_loops])
+    node_of_key[candidate_keys] = np.arange(len(candidate_keys), dtype=np.int64)
+    loop_node = node_of_key[keys] if loop_count else np.zeros(0, dtype=np.int64)
+    node_count = len(candidate_keys)
+
+    # ノード → ループ（候補のループのみ）
+    order = np.argsort(loop_node[candidate_loops], kind="stable")
+    node_loops = candidate_loops[order]
+    node_loop_ptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(loop_node[node_loops], minlength=node_count), out=node_loop_ptr[1:])
+    first = node_loops[node_loop_ptr[:-1]]
+
+    # ノードのループのエッジのうち、UVエッジ選択されたループを持つエッジで接続する
+    edge_count = int(loop_edge.max(initial=-1)) + 1
+    edge_active = np.zeros(edge_count, dtype=bool)
+    edge_active[loop_edge[node_loops]] = True
+    edge_selected = np.zeros(edge_count, dtype=bool)
+    edge_selected[loop_edge[np.asarray(loop_uv_select_edge, dtype=bool)]] = True
+    edge_loops = np.flatnonzero((edge_active & edge_selected)[loop_edge]) if loop_count else np.zeros(0, np.int64)
+    node_a = loop_node[edge_loops]
+    node_b = loop_node[loop_next[edge_loops]]
+    valid = (node_a >= 0) & (node_b >= 0) & (node_a != node_b)
+    low = np.minimum(node_a[valid], node_b[valid])
+    high = np.maximum(node_a[valid], node_b[valid])
+    pairs = np.unique(low * max(node_count, 1) + high)
+    low, high = pairs // max(node_count, 1), pairs % max(node_count, 1)
+
+    src = np.concatenate((low, high))
+    dst = np.concatenate((high, low))
+    order = np.lexsort((dst, src))
+    adj_ptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=node_count), out=adj_ptr[1:])
+
+    return UVNodeGraph(
+        node_uv=rounded_uv[first],
+        node_vert=np.asarray(loop_vert, dtype=np.int64)[first],
+        node_loop_ptr=node_loop_ptr,
+        node_loops=node_loops,
+        adj_ptr=adj_ptr,
+        adj_nodes=dst[order],
+        loop_node=loop_node,
+    )
@@ -0,0 +1,78 @@
+import numpy as np
+from .islands import connected_components, edge_loop_pairs, uv_continuous
+
+UV_KEY_DECIMALS = 6
+
+
+def quantize_uvs(loop_uv, decimals=UV_KEY_DECIMALS):
+    "UVを 10^-decimals 単位の整数にする（round(uv, decimals) と同じ丸め）"
+    return np.rint(np.asarray(loop_uv, dtype=np.float64).reshape(-1, 2) * 10**decimals).astype(np.int64)
+
+
+def pack_uv_keys(quantized):
+    "量子化したUVを1つの int64 にまとめる"
+    return (quantized[:, 0] << 32) | (quantized[:, 1] & 0xFFFFFFFF)
+
+
+def dense_labels(keys):
+    "キーを 0 からの連番のラベルにする（キーの昇順）"
+    if not len(keys):
+        return np.zeros(0, dtype=np.int64)
+    _, labels = np.unique(keys, return_inverse=True)
+    return labels.reshape(-1).astype(np.int64)
+
+
+def uv_labels(loop_uv, decimals=UV_KEY_DECIMALS):
+    "UV座標が同じループのラベル"
+    return dense_labels(pack_uv_keys(quantize_uvs(loop_uv, decimals)))
+
+
+def vert_uv_labels(loop_uv, loop_vert, decimals=UV_KEY_DECIMALS):
+    "頂点とUV座標が同じループのラベル"
+    labels = uv_labels(loop_uv, decimals)
+    if not len(labels):
+        return labels
+    return dense_labels(np.asarray(loop_vert, dtype=np.int64) * (int(labels.max()) + 1) + labels)
+
+
+def weld_labels(loop_uv, loop_vert, loop_edge, loop_next, edge_seam, decimals=UV_KEY_DECIMALS):
+    """UV頂点のラベル（頂点とUV座標が同じで、UVがつながっているエッジで隣り合うループ）
+
+    座標が重なっていてもUVが切れた扇は別のUV頂点になる
+    シームのエッジでもエッジの両端のUVが両側で一致していればつながっているとみなす（find_island_labels と同じ）
+    """
+    labels = vert_uv_labels(loop_uv, loop_vert, decimals)
+    loop_count = len(labels)
+    if not loop_count:
+        return labels
+    loop_prev = np.empty(loop_count, dtype=np.int64)
+    loop_prev[loop_next] = np.arange(loop_count, dtype=np.int64)
+
+    # 2つの面で共有するエッジは両端のUVが一致する時だけ、それ以外のエッジはシームでなければつなぐ
+    loop_edge = np.asarray(loop_edge, dtype=np.int64)
+    loop_uv = np.asarray(loop_uv, dtype=np.float64).reshape(-1, 2)
+    edge_joined = ~np.asarray(edge_seam, dtype=bool)
+    loop_a, loop_b = edge_loop_pairs(loop_edge, len(edge_joined))
+    edge_joined[loop_edge[loop_a]] = uv_continuous(
+        loop_a, loop_b, np.asarray(loop_vert, dtype=np.int64), np.asarray(loop_next, dtype=np.int64), loop_uv
+    )
+
+    # ループの角に接する2つのエッジごとに、同じエッジ・同じラベルの角をつなぐ
+    corner_loop = np.concatenate((np.arange(loop_count, dtype=np.int64), np.arange(loop_count, dtype=np.int64)))
+    corner_edge = np.concatenate((loop_edge, loop_edge[loop_prev]))
+    keep = edge_joined[corner_edge]
+    corner_loop, corner_edge = corner_loop[keep], corner_edge[keep]
+    corner_label = labels[corner_loop]
+    order = np.lexsort((corner_edge, corner_label))
+    corner_loop, corner_edge, corner_label = corner_loop[order], corner_edge[order], corner_label[order]
+    same = (corner_edge[1:] == corner_edge[:-1]) & (corner_label[1:] == corner_label[:-1])
+    components = connected_components(loop_count, corner_loop[:-1][same], corner_loop[1:][same])
+    return dense_labels(components)
+
+
+def label_values(labels, values):
+    "ラベルごとの値（ラベルの最初のループの値）"
+    labels = np.asarray(labels, dtype=np.int64)
+    first = np.full(int(labels.max(initial=-1)) + 1, -1, dtype=np.int64)
+    first[labels[::-1]] = np.arange(len(labels) - 1, -1, -1, dtype=np.int64)
+    return np.asarray(values)[first]
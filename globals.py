@@ -9,4 +9,16 @@ PADDING_AUTO = {
     "2048": 16,
     "4096": 32,
     "8192": 64,
-}
\ No newline at end of file
+}
+
+
+def get_padding(obj):
+    "オブジェクトのパディング（UV空間の長さ）"
+    if obj is None:
+        return 0.0
+    props = obj.mio3uv
+    if props.padding_px == "AUTO":
+        padding_px = PADDING_AUTO.get(props.image_size, 16)
+    else:
+        padding_px = int(props.padding_px)
+    return padding_px / int(props.image_size)
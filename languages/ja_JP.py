@@ -147,12 +147,20 @@ translation_dict = {
         ("*", "Align by group"): "グループごとに整列",
         ("*", "Group Spacing"): "グループの間隔",
         ("*", "Fixed Width"): "固定幅",
+        ("*", "Pack"): "パック",
+        ("*", "Pack islands into UV tiles"): "アイランドをUVタイルに詰めます",
+        ("*", "Allow 90° rotation"): "90°の回転を許可します",
+        ("*", "Scale to Fit"): "収まるように拡大縮小",
+        ("*", "Scale islands to fit in the tiles"): "タイルに収まるようにアイランドを拡大縮小します",
+        ("*", "Tiles"): "タイル数",
         ("*", "UV Distance"): "UV空間での距離",
         ("*", "UV Similar"): "UVの類似性",
 
         # Island
         ("Operator", "Stack"): "重ねる",
         ("*", "Overlap similar UV shapes"): "類似した形状のUVシェイプを重ねます",
+        ("*", "Similarity"): "相似変換",
+        ("*", "Rigid"): "剛体変換",
         ("Operator", "Shuffle"): "シャッフル",
         ("Operator", "Unify UV Shapes"): "UVの形状を揃える",
         ("Operator", "Average Island Scales"): "3Dに基づく大きさ",
@@ -235,6 +243,18 @@ translation_dict = {
         ("Operator", "Calculate Coverage"): "カバレッジを計算",
         ("*", "Calculate UV coverage (occupancy) inside the 0-1 UV space"): "0-1のUV空間内でUVのカバレッジ（占有率）を計算します",
         ("*", "UV Coverage"): "UVカバレッジ",
+        ("*", "Texel Heatmap"): "テクセルヒートマップ",
+        ("*", "Live Statistics"): "統計を自動更新",
+        ("*", "Update island count, texel density and coverage in the background when the mesh changes"): "メッシュが変更されたらアイランド数・テクセル密度・カバレッジをバックグラウンドで更新します",
+        ("*", "Islands"): "アイランド",
+        ("Operator", "Texel Heatmap"): "テクセルヒートマップ",
+        ("*", "Display per-face texel density and distortion as a heatmap (using Geometry Nodes)"): "面ごとのテクセル密度と歪みをヒートマップで表示します（ジオメトリノードを使用）",
+        ("*", "Per-face value displayed by the texel heatmap"): "テクセルヒートマップに表示する面ごとの値",
+        ("*", "Texel density relative to the target texel density"): "目標のテクセル密度に対するテクセル密度",
+        ("*", "Area distortion between the mesh and the UVs"): "メッシュとUVの面積の歪み",
+        ("*", "Angle distortion between the mesh and the UVs"): "メッシュとUVの角度の歪み",
+        ("*", "Value shown in full color (log2 ratio for density and area, radians for angle)"): "最も濃い色で表示する値（密度と面積は比の log2、角度はラジアン）",
+        ("*", "Resolution of the mask used to calculate UV coverage"): "UVカバレッジの計算に使用するマスクの解像度",
         ("*", "Calculate UV coverage inside the 0-1 UV space based on visible or selected UV faces"): "0-1のUV空間内で、表示されているUV面または選択されているUV面に基づいてUVのカバレッジを計算します",
         ("*", "Use Checker Size"): "チェッカーマップのサイズを使用",
         ("*", "Use Mio3UV checker size if available. \nDisable if the actual texture size differs from the checker size"): "利用可能な場合はMio3UVのチェッカーマップのサイズを使用します。\n実際のテクスチャサイズがチェッカーマップのサイズと異なる場合は無効にしてください",
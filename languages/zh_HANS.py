@@ -103,6 +103,19 @@ translation_dict = {
 
         ("Operator", "Stack"): "堆叠",
         ("*", "Overlap similar UV shapes"): "重叠相似的UV形状",
+        ("*", "Similarity"): "相似变换",
+        ("*", "Rigid"): "刚体变换",
+        ("*", "Texel Heatmap"): "纹素热力图",
+        ("*", "Live Statistics"): "自动更新统计",
+        ("*", "Update island count, texel density and coverage in the background when the mesh changes"): "网格变化时在后台更新岛数量、纹素密度和覆盖率",
+        ("*", "Islands"): "岛",
+        ("Operator", "Texel Heatmap"): "纹素热力图",
+        ("*", "Display per-face texel density and distortion as a heatmap (using Geometry Nodes)"): "以热力图显示每个面的纹素密度和扭曲（使用几何节点）",
+        ("*", "Per-face value displayed by the texel heatmap"): "纹素热力图显示的每个面的值",
+        ("*", "Texel density relative to the target texel density"): "相对于目标纹素密度的纹素密度",
+        ("*", "Area distortion between the mesh and the UVs"): "网格与UV之间的面积扭曲",
+        ("*", "Angle distortion between the mesh and the UVs"): "网格与UV之间的角度扭曲",
+        ("*", "Value shown in full color (log2 ratio for density and area, radians for angle)"): "以最深颜色显示的值（密度和面积为比值的 log2，角度为弧度）",
         ("Operator", "Shuffle"): "随机排列",
         ("Operator", "Unify UV Shapes"): "统一UV形状",
         ("Operator", "Average Island Scales"): "平均岛屿大小",
@@ -119,6 +132,12 @@ translation_dict = {
         ("*", "Align by group"): "按组对齐",
         ("*", "Group Margin"): "组间距",
         ("*", "Fixed Width"): "固定宽度",
+        ("*", "Pack"): "打包",
+        ("*", "Pack islands into UV tiles"): "将岛屿打包到UV图块中",
+        ("*", "Allow 90° rotation"): "允许90°旋转",
+        ("*", "Scale to Fit"): "缩放以适应",
+        ("*", "Scale islands to fit in the tiles"): "缩放岛屿以适应图块",
+        ("*", "Tiles"): "图块数",
 
         ("Operator", "Unfoldify"): "展开图",
         ("*", "Arrange islands vertically and horizontally based on their positional relationships in 3D space"): "根据岛屿在 3D 空间中的位置关系，垂直和水平排列岛屿",
@@ -1,9 +1,10 @@
 import bpy
+import numpy as np
 from mathutils import Vector
 from bpy.app.translations import pgettext_iface as tt_iface
 from bpy.props import BoolProperty, EnumProperty
 from bpy.types import Context
-from ..classes import Mio3UVOperator, UVIslandManager, UVIsland, UVNodeManager, UVNodeGroup, UVNode
+from ..classes import Mio3UVOperator, UVIslandManager, UVIsland, UVNodeManager, UVNodeGroup
 from ..utils.utils import straight_uv_nodes
 
 
@@ -101,7 +102,6 @@ class UV_OT_mio3_align(Mio3UVOperator):
         return self.execute(context)
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
         align_to = self.align_to
         align_types = self.expand_align_types(self.type)
@@ -151,7 +151,6 @@ class UV_OT_mio3_align(Mio3UVOperator):
                 self.align_uv_nodes(context, node_manager, align_type, align_to)
             node_manager.update_uvmeshes()
 
-        self.end_time()
         return {"FINISHED"}
 
     def expand_align_types(self, align_type):
@@ -164,30 +163,25 @@ class UV_OT_mio3_align(Mio3UVOperator):
         return corner_map.get(align_type, [align_type])
 
     def group_current_value(self, group: UVNodeGroup, alignment_type, axis):
-        coords = [node.uv.x if axis == 0 else node.uv.y for node in group.nodes]
+        coords = group.uvs[:, axis]
         if alignment_type in ["MAX_X", "MAX_Y"]:
-            return max(coords)
+            return float(coords.max())
         if alignment_type in ["MIN_X", "MIN_Y"]:
-            return min(coords)
-        return (min(coords) + max(coords)) / 2
+            return float(coords.min())
+        return float(coords.min() + coords.max()) / 2
 
     def align_uv_nodes(self, context, node_manager: UVNodeManager, alignment_type, align_to):
         if self.edge_mode and self.island:
             self.align_groups(context, node_manager.groups, alignment_type, align_to)
         elif self.edge_mode:
             for group in node_manager.groups:
-                self.align_nodes(context, group.nodes, alignment_type, align_to)
+                self.align_nodes(context, [group], alignment_type, align_to)
         else:
-            all_nodes = [node for group in node_manager.groups for node in group.nodes]
-            self.align_nodes(context, all_nodes, alignment_type, align_to)
+            self.align_nodes(context, node_manager.groups, alignment_type, align_to)
 
         for group in node_manager.groups:
             group.update_uvs()
 
-        for group in node_manager.groups:
-            for node in group.nodes:
-                node.select = True
-
     def align_groups(self, context, groups: list[UVNodeGroup], alignment_type, align_to):
         if not groups:
             return
@@ -197,31 +191,32 @@ class UV_OT_mio3_align(Mio3UVOperator):
             target = self.get_target_value(context, groups, alignment_type, align_to)
             for group in groups:
                 current = self.group_current_value(group, alignment_type, axis)
-                offset = target - current
-                for node in group.nodes:
-                    if axis == 0:
-                        node.uv.x += offset
-                    else:
-                        node.uv.y += offset
-
-
-    def align_nodes(self, context, nodes: list[UVNode], alignment_type, align_to):
-        uv_coords = [node.uv for node in nodes]
+                uvs = group.uvs.copy()
+                uvs[:, axis] += target - current
+                group.set_uvs(uvs)
+
+    def align_nodes(self, context, groups: list[UVNodeGroup], alignment_type, align_to):
+        "グループのすべてのノードを1つの位置に揃える"
+        group_uvs = [group.uvs.copy() for group in groups]
+        if not group_uvs:
+            return
+        uv_coords = np.concatenate(group_uvs)
 
         if alignment_type in ["MAX_X", "MIN_X", "ALIGN_X", "MAX_Y", "MIN_Y", "ALIGN_Y"]:
             axis = 0 if alignment_type in ["MAX_X", "MIN_X", "ALIGN_X"] else 1
             pos = self.get_target_value(context, uv_coords, alignment_type, align_to)
-            for node in nodes:
-                if axis == 0:
-                    node.uv.x = pos
-                else:
-                    node.uv.y = pos
+            for uvs in group_uvs:
+                uvs[:, axis] = pos
         elif alignment_type == "CENTER":
             center_x = self.get_target_value(context, uv_coords, "ALIGN_X", align_to)
             center_y = self.get_target_value(context, uv_coords, "ALIGN_Y", align_to)
-            for node in nodes:
-                node.uv.x = center_x
-                node.uv.y = center_y
+            for uvs in group_uvs:
+                uvs[:] = (center_x, center_y)
+        else:
+            return
+
+        for group, uvs in zip(groups, group_uvs):
+            group.set_uvs(uvs)
 
     def align_islands(self, context, islands: list[UVIsland], align_type, align_to):
         if align_type in ["MAX_Y", "MIN_Y", "MIN_X", "MAX_X"]:
@@ -333,6 +328,9 @@ class UV_OT_mio3_align(Mio3UVOperator):
         return sum(values) / len(values)
 
     def collect_values(self, elements, axis, alignment_type):
+        if isinstance(elements, np.ndarray):
+            return elements[:, axis].tolist()
+
         values = []
 
         for element in elements:
@@ -340,14 +338,8 @@ class UV_OT_mio3_align(Mio3UVOperator):
                 values.append(element.x if axis == 0 else element.y)
             elif hasattr(element, "uv"):
                 values.append(element.uv.x if axis == 0 else element.uv.y)
-            elif hasattr(element, "nodes"):
-                coords = [node.uv.x if axis == 0 else node.uv.y for node in element.nodes]
-                if alignment_type in ["MAX_X", "MAX_Y"]:
-                    values.append(max(coords))
-                elif alignment_type in ["MIN_X", "MIN_Y"]:
-                    values.append(min(coords))
-                else:
-                    values.append((min(coords) + max(coords)) / 2)
+            elif isinstance(element, UVNodeGroup):
+                values.append(self.group_current_value(element, alignment_type, axis))
             elif hasattr(element, "min_uv") and hasattr(element, "max_uv"):
                 if axis == 0:
                     min_v = element.min_uv.x
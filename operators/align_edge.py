@@ -29,7 +29,6 @@ class UV_OT_mio3_align_edges(Mio3UVOperator):
     )
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
 
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
@@ -38,9 +37,7 @@ class UV_OT_mio3_align_edges(Mio3UVOperator):
         if not island_manager.islands:
             return {"CANCELLED"}
 
-        for island in island_manager.islands:
-            island.store_selection()
-
+        island_manager.store_selection()
         island_manager.uv_select_set_all(False)
 
         for island in island_manager.islands:
@@ -52,12 +49,10 @@ class UV_OT_mio3_align_edges(Mio3UVOperator):
             if node_manager.groups:
                 self.align_uv_nodes(node_manager, self.axis)
 
-        for island in island_manager.islands:
-            island.restore_selection()
+        island_manager.restore_selection()
 
         island_manager.update_uvmeshes(True)
 
-        self.end_time()
         return {"FINISHED"}
 
     def uv_selection(self, uv_layer: BMLayerItem, faces: list[BMFace], axis):
@@ -29,7 +29,6 @@ class UV_OT_mio3_align_seam(Mio3UVOperator):
     )
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
         if not objects:
             self.report({"WARNING"}, "Object is not selected")
@@ -52,6 +51,7 @@ class UV_OT_mio3_align_seam(Mio3UVOperator):
                 for loop in face.loops:
                     if loop.vert in selected_uv_verts:
                         loop.uv_select_vert = True
+            node_manager.mark_dirty()
             node_manager.update_uvmeshes()
 
             node_manager = UVNodeManager([obj], sync=use_uv_select_sync)
@@ -112,7 +112,6 @@ class UV_OT_mio3_align_seam(Mio3UVOperator):
 
         node_manager.update_uvmeshes()
 
-        self.end_time()
         return {"FINISHED"}
 
     def cancel_operator(self, context):
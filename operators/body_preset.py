@@ -142,7 +142,6 @@ class UV_OT_mio3_body_preset(Mio3UVOperator):
     }
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
 
@@ -167,7 +166,6 @@ class UV_OT_mio3_body_preset(Mio3UVOperator):
             self.align_islands(island_manager.islands)
 
         island_manager.update_uvmeshes(True)
-        self.end_time()
         self.report({"INFO"}, "Match as {}".format(parts_type))
         return {"FINISHED"}
 
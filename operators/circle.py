@@ -1,5 +1,5 @@
 import bpy
-from mathutils import Vector
+import numpy as np
 from bpy.props import BoolProperty
 from ..classes import Mio3UVOperator, UVNodeManager, UVNodeGroup
 
@@ -23,7 +23,6 @@ class UV_OT_mio3_circle(Mio3UVOperator):
         return self.execute(context)
 
     def execute(self, context):
-        self.start_time()
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
 
         node_manager = UVNodeManager(self.objects, sync=use_uv_select_sync)
@@ -33,8 +32,13 @@ class UV_OT_mio3_circle(Mio3UVOperator):
 
         if self.composite:
             base_group = groups[0]
-            all_nodes = {node for group in groups for node in group.nodes if group.obj_info == base_group.obj_info}
-            composite_group = UVNodeGroup(all_nodes, base_group.obj_info)
+            same_groups = [group for group in groups if group.obj_info is base_group.obj_info]
+            if all(group.is_graph and group.graph is base_group.graph for group in same_groups):
+                node_ids = np.concatenate([group.node_ids for group in same_groups])
+                composite_group = UVNodeGroup(None, base_group.obj_info, base_group.graph, node_ids)
+            else:
+                all_nodes = {node for group in same_groups for node in group.nodes}
+                composite_group = UVNodeGroup(all_nodes, base_group.obj_info)
             self.make_circular(composite_group)
             composite_group.update_uvs()
         else:
@@ -44,17 +48,16 @@ class UV_OT_mio3_circle(Mio3UVOperator):
 
         node_manager.update_uvmeshes()
 
-        self.end_time()
         return {"FINISHED"}
 
     def make_circular(self, group: UVNodeGroup):
-        center = sum((node.uv for node in group.nodes), Vector((0, 0))) / len(group.nodes)
-        avg_radius = sum((node.uv - center).length for node in group.nodes) / len(group.nodes)
-        for node in group.nodes:
-            direction = node.uv - center
-            if direction.length > 0:
-                node.uv = center + direction.normalized() * avg_radius
-
+        uvs = group.uvs
+        center = uvs.mean(axis=0)
+        direction = uvs - center
+        length = np.sqrt(np.einsum("ij,ij->i", direction, direction))
+        avg_radius = length.mean()
+        scale = np.divide(avg_radius, length, out=np.ones_like(length), where=length > 0)
+        group.set_uvs(center + direction * scale[:, None])
 
 def register():
     bpy.utils.register_class(UV_OT_mio3_circle)
@@ -70,7 +70,6 @@ class UV_OT_mio3_distribute(Mio3UVOperator):
         return self.execute(context)
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
 
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
@@ -97,7 +96,6 @@ class UV_OT_mio3_distribute(Mio3UVOperator):
                 group.update_uvs()
             node_manager.update_uvmeshes()
 
-        self.end_time()
         return {"FINISHED"}
 
     def align_islands(self, island_manager: UVIslandManager):
@@ -33,7 +33,6 @@ class UV_OT_mio3_grid(Mio3UVOperator):
     keep_aspect: BoolProperty(name="Keep Aspect Ratio", default=False)
 
     def execute(self, context):
-        self.start_time()
         tool_settings = context.tool_settings
         use_uv_select_sync = tool_settings.use_uv_select_sync
         objects = self.get_selected_objects(context)
@@ -59,13 +58,13 @@ class UV_OT_mio3_grid(Mio3UVOperator):
             shared_uvs = collect_shared_uv_loops(uv_layer, island.faces, uv_loop_index_cache[obj])
             self.align_rect(uv_layer, f_act, island.faces)
             uv_follow(self.shape_blend, island, f_act, shared_uvs)
+            island.mark_dirty()
 
         island_manager.update_uvmeshes()
 
         if self.normalize:
             bpy.ops.uv.mio3_normalize(keep_aspect=self.keep_aspect)
 
-        self.end_time()
         return {"FINISHED"}
 
     def get_base_face(self, uv_layer: BMLayerItem, selected_faces: list[BMFace]) -> BMFace | None:
@@ -60,7 +60,6 @@ class UV_OT_mio3_mirror(Mio3UVOperator):
         return self.execute(context)
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
 
@@ -119,7 +118,6 @@ class UV_OT_mio3_mirror(Mio3UVOperator):
 
             node_manager.update_uvmeshes()
 
-        self.end_time()
         return {"FINISHED"}
 
 def register():
@@ -14,7 +14,6 @@ class UV_OT_mio3_normalize(Mio3UVOperator):
     individual: BoolProperty(name="Individual", default=False)
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
 
@@ -28,7 +27,6 @@ class UV_OT_mio3_normalize(Mio3UVOperator):
 
         island_manager.update_uvmeshes()
 
-        self.end_time()
         return {"FINISHED"}
 
     def normalize_island(self, context, island: UVIsland):
@@ -69,6 +67,7 @@ class UV_OT_mio3_normalize(Mio3UVOperator):
             for loop in face.loops:
                 uv = loop[uv_layer]
                 uv.uv = anchor + Vector(((uv.uv.x - min_uv.x) * scale_x, (uv.uv.y - min_uv.y) * scale_y))
+        island.mark_dirty()
 
     def get_anchor(self, context, center: Vector) -> Vector:
         if context.scene.mio3uv.udim:
@@ -1,7 +1,7 @@
 import bpy
 from mathutils import Vector
 from bpy.props import BoolProperty, FloatProperty
-from ..classes import Mio3UVOperator, UVIslandManager
+from ..classes import Mio3UVOperator, UVIslandManager, UVWeldIndex
 from ..utils.utils import find_uv_boundary_edges
 
 
@@ -23,7 +23,6 @@ class UV_OT_mio3_offset(Mio3UVOperator):
     keep_pin: BoolProperty(name="Keep Pin", default=False)
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
 
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
@@ -35,7 +34,6 @@ class UV_OT_mio3_offset(Mio3UVOperator):
 
         island_manager.update_uvmeshes(True)
 
-        self.end_time()
         return {"FINISHED"}
 
     def expand_uv_boundary(self, island, offset):
@@ -44,14 +42,8 @@ class UV_OT_mio3_offset(Mio3UVOperator):
         faces = {f for f in island.faces if f.select}
         boundary_edges = find_uv_boundary_edges(faces, uv_layer)
 
-        def uv_key(loop):
-            uv = loop[uv_layer].uv
-            return (loop.vert.index, round(uv.x, 6), round(uv.y, 6))
-
-        uv_groups = {}
-        for face in faces:
-            for loop in face.loops:
-                uv_groups.setdefault(uv_key(loop), []).append(loop)
+        weld = UVWeldIndex.from_bmesh(island.bm, uv_layer, faces=faces)
+        uv_groups = weld.groups("VERT_AND_UV")
 
         group_perps = {}
         for edge in boundary_edges:
@@ -81,7 +73,7 @@ class UV_OT_mio3_offset(Mio3UVOperator):
                 if perp.x * (mid_x - cx) + perp.y * (mid_y - cy) < 0.0:
                     perp = -perp
 
-                key1, key2 = uv_key(loop1), uv_key(loop2)
+                key1, key2 = weld.label(loop1, "VERT_AND_UV"), weld.label(loop2, "VERT_AND_UV")
                 group_perps.setdefault(key1, []).append(perp)
                 group_perps.setdefault(key2, []).append(perp)
 
@@ -95,6 +87,7 @@ class UV_OT_mio3_offset(Mio3UVOperator):
                 if self.keep_pin and loop[uv_layer].pin_uv:
                     continue
                 loop[uv_layer].uv += movement
+        island.mark_dirty()
 
 
 def register():
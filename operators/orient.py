@@ -35,7 +35,6 @@ class UV_OT_mio3_orient(Mio3UVOperator):
         return self.execute(context)
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
         udim = context.scene.mio3uv.udim
@@ -50,7 +49,6 @@ class UV_OT_mio3_orient(Mio3UVOperator):
 
         island_manager.update_uvmeshes(True)
 
-        self.end_time()
         return {"FINISHED"}
 
     def align_island_rotation(self, island_manager: UVIslandManager):
@@ -72,6 +70,7 @@ class UV_OT_mio3_orient(Mio3UVOperator):
             angle_diff = target_angle - current_angle
 
             rotate_uv_faces(island.faces, angle_diff, island.uv_layer, island.center)
+            island.mark_dirty()
 
             is_vertical = loop_uv1.uv.x == loop_uv2.uv.x  # 縦向きに整列した
 
@@ -148,7 +147,6 @@ class UV_OT_mio3_orient_world(Mio3UVOperator):
     )
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
         island_manager = UVIslandManager(objects, sync=use_uv_select_sync)
@@ -162,7 +160,6 @@ class UV_OT_mio3_orient_world(Mio3UVOperator):
 
         island_manager.update_uvmeshes(True)
 
-        self.end_time()
         return {"FINISHED"}
 
 
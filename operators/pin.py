@@ -26,7 +26,6 @@ class UV_OT_mio3_pin(Mio3UVOperator):
         return self.execute(context)
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
         if not objects:
             self.report({"WARNING"}, "Object is not selected")
@@ -54,7 +53,6 @@ class UV_OT_mio3_pin(Mio3UVOperator):
 
             bmesh.update_edit_mesh(obj.data)
 
-        self.end_time()
         return {"FINISHED"}
 
 
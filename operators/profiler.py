@@ -0,0 +1,47 @@
+import bpy
+from bpy.props import StringProperty
+from bpy_extras.io_utils import ExportHelper
+from ..classes import profiler
+
+
+class MIO3UV_OT_profile_export(bpy.types.Operator, ExportHelper):
+    bl_idname = "mio3uv.profile_export"
+    bl_label = "Export Profile"
+    bl_description = "Export the recorded operator profiles as JSON"
+    bl_options = {"REGISTER"}
+
+    filename_ext = ".json"
+    filter_glob: StringProperty(default="*.json", options={"HIDDEN"})
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.window_manager.mio3uv.profile_records) > 0
+
+    def execute(self, context):
+        count = profiler.export_records(context.window_manager.mio3uv.profile_records, self.filepath)
+        self.report({"INFO"}, "Exported {} records".format(count))
+        return {"FINISHED"}
+
+
+class MIO3UV_OT_profile_clear(bpy.types.Operator):
+    bl_idname = "mio3uv.profile_clear"
+    bl_label = "Clear Profile"
+    bl_description = "Clear the recorded operator profiles"
+    bl_options = {"REGISTER", "INTERNAL"}
+
+    def execute(self, context):
+        context.window_manager.mio3uv.profile_records.clear()
+        return {"FINISHED"}
+
+
+classes = [MIO3UV_OT_profile_export, MIO3UV_OT_profile_clear]
+
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+
+def unregister():
+    for cls in classes:
+        bpy.utils.unregister_class(cls)
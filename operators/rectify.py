@@ -2,7 +2,7 @@ import bpy
 from mathutils import Vector
 from bpy.props import BoolProperty, EnumProperty
 from ..utils.utils import straight_uv_nodes
-from ..classes import Mio3UVOperator, UVIslandManager, UVNodeManager, UVIsland
+from ..classes import Mio3UVOperator, UVIslandManager, UVNodeManager, UVIsland, UVWeldIndex
 
 
 class UV_OT_mio3_rectify(Mio3UVOperator):
@@ -55,7 +55,6 @@ class UV_OT_mio3_rectify(Mio3UVOperator):
         layout.prop(self, "pin")
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
 
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
@@ -77,13 +76,12 @@ class UV_OT_mio3_rectify(Mio3UVOperator):
             uv_layer = island.uv_layer
             island.store_selection()
 
-            selected_uvs = {}
-            for face in island.faces:
-                for loop in face.loops:
-                    if loop.uv_select_vert:
-                        uv = loop[uv_layer].uv
-                        uvkey = (round(uv.x, 6), round(uv.y, 6))
-                        selected_uvs.setdefault(uvkey, []).append(loop)
+            weld = UVWeldIndex.from_bmesh(island.bm, uv_layer, faces=island.faces)
+            label_uvs = weld.label_uvs("UV")
+            selected_uvs = {
+                tuple(label_uvs[label]): loops
+                for label, loops in weld.groups("UV", weld.arrays.loop_uv_select_vert).items()
+            }
 
             if len(selected_uvs) >= 4:
                 valid_islands.append((island, selected_uvs))
@@ -132,11 +130,10 @@ class UV_OT_mio3_rectify(Mio3UVOperator):
                 if len(node_manager.groups):
                     group = node_manager.groups[0]
                     straight_uv_nodes(group, self.distribute)
-                    for node in group.nodes:
-                        for loop in node.loops:
-                            loop.uv_select_vert = False
-                            loop[uv_layer].pin_uv = True
-                            boundary_loops.add(loop)
+                    for loop in group.loops:
+                        loop.uv_select_vert = False
+                        loop[uv_layer].pin_uv = True
+                        boundary_loops.add(loop)
                     group.update_uvs()
                 else:
                     self.select_uv(curr_loops, False)
@@ -156,8 +153,7 @@ class UV_OT_mio3_rectify(Mio3UVOperator):
             bpy.ops.uv.unwrap(method=self.method, margin=0.001, use_subsurf_data=False, fill_holes=True, correct_aspect=True)
 
         if self.stretch and self.unwrap:
-            for island, _ in valid_islands:
-                island.restore_selection()
+            island_manager.restore_selection([island for island, _ in valid_islands])
             bpy.ops.uv.minimize_stretch(fill_holes=False, iterations=50)
 
         if not self.pin:
@@ -167,8 +163,7 @@ class UV_OT_mio3_rectify(Mio3UVOperator):
                     for loop in face.loops:
                         loop[uv_layer].pin_uv = False
 
-        for island, _ in valid_islands:
-            island.restore_selection()
+        island_manager.restore_selection([island for island, _ in valid_islands])
 
         island_manager.update_uvmeshes(True)
 
@@ -177,7 +172,6 @@ class UV_OT_mio3_rectify(Mio3UVOperator):
         else:
             context.tool_settings.uv_select_mode = uv_select_mode
 
-        self.end_time()
         return {"FINISHED"}
 
     @staticmethod
@@ -1,7 +1,12 @@
 import bpy
+import numpy as np
 from mathutils import Vector
 from bpy.props import BoolProperty, EnumProperty, FloatProperty, IntProperty
-from ..classes import Mio3UVOperator, UVNodeManager
+from ..classes import Mio3UVOperator, UVNodeManager, UVNodeGroup
+from ..classes import profiler
+from ..core.parallel import map_kernel
+from ..core.relax import CSRMatrix, LaplaceSystem, RelaxWeights, taubin_smooth, taubin_arrays
+from ..globals import get_preferences
 
 
 class UV_OT_mio3_relax(Mio3UVOperator):
@@ -13,6 +18,7 @@ class UV_OT_mio3_relax(Mio3UVOperator):
     method: EnumProperty(
         items=[
             ("DEFAULT", "Default", ""),
+            ("GLOBAL", "Global", ""),
             ("MINIMIZE", "Minimize Stretch", ""),
         ],
         name="Mode",
@@ -39,6 +45,7 @@ class UV_OT_mio3_relax(Mio3UVOperator):
     _mu = -0.53
     _eps = 0.00001
     _face_selected = False
+    _engine = "ARRAY"  # "ARRAY" or "PYTHON"
 
     def invoke(self, context, event):
         objects = self.get_selected_objects(context)
@@ -50,7 +57,6 @@ class UV_OT_mio3_relax(Mio3UVOperator):
         return self.execute(context)
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
 
         if self.method == "MINIMIZE":
@@ -61,64 +67,217 @@ class UV_OT_mio3_relax(Mio3UVOperator):
             node_manager = UVNodeManager(objects, sync=use_uv_select_sync)
             keep_boundary = self.keep_boundary and self._face_selected
             keep_pin = self.keep_pin
+            graph_groups = []
             for group in node_manager.groups:
+                if self._engine == "ARRAY" and group.is_graph:
+                    graph_groups.append(group)
+                    continue
+
                 uv_layer = group.uv_layer
-                nodes = group.nodes
+                nodes = list(group.nodes)
+                fixed_nodes, neighbor_cache = self.build_neighbors(nodes, uv_layer, keep_boundary, keep_pin)
 
-                node_index_map = {id(node): index for index, node in enumerate(nodes)}
-                fixed_nodes = [False] * len(nodes)
-                neighbor_cache = [[] for _ in nodes]
-                selection_boundary_cache = {}
+                lambda_factor = self._lambda * self.strength
+                mu_factor = self._mu * self.strength
 
-                for index, node in enumerate(nodes):
-                    if keep_boundary:
-                        is_boundary_node = any(
-                            loop.edge.is_boundary
-                            or loop.edge.seam
-                            or self.is_selection_boundary(loop.edge, selection_boundary_cache)
-                            for loop in node.loops
+                with profiler.phase("solve"):
+                    if self.method == "GLOBAL":
+                        original = np.array([node.uv for node in nodes], dtype=np.float64)
+                        system = LaplaceSystem.from_weights(
+                            CSRMatrix.from_rows(neighbor_cache), ~np.array(fixed_nodes, dtype=bool)
                         )
+                        result = self.relax_global(original, system)
+                        positions = [Vector(position) for position in result.tolist()]
+                    elif self._engine == "ARRAY":
+                        result = taubin_smooth(
+                            [node.uv for node in nodes],
+                            CSRMatrix.from_rows(neighbor_cache),
+                            ~np.array(fixed_nodes, dtype=bool),
+                            (self.relax_x, self.relax_y),
+                            lambda_factor,
+                            mu_factor,
+                            self.iterations,
+                            self._eps,
+                        )
+                        positions = [Vector(position) for position in result.tolist()]
                     else:
-                        is_boundary_node = False
+                        positions = self.relax_positions(nodes, fixed_nodes, neighbor_cache, lambda_factor, mu_factor)
+                profiler.count("iterations", self.iterations)
 
-                    is_pinned = any(loop[uv_layer].pin_uv for loop in node.loops) if keep_pin else False
-                    fixed_nodes[index] = len(node.neighbors) <= 1 or is_pinned or is_boundary_node
+                for index, node in enumerate(nodes):
+                    node.uv = positions[index]
+                    node.update_uv(uv_layer)
 
-                    if fixed_nodes[index]:
-                        continue
+            if graph_groups:
+                self.relax_groups(graph_groups, keep_boundary, keep_pin)
 
-                    node_co = node.vert.co
-                    weighted_neighbors = []
-                    for neighbor in node.neighbors:
-                        distance = max((neighbor.vert.co - node_co).length, 0.000001)
-                        weighted_neighbors.append((node_index_map[id(neighbor)], 1.0 / distance))
-                    neighbor_cache[index] = weighted_neighbors
+            node_manager.update_uvmeshes()
 
-                positions = [node.uv.copy() for node in nodes]
-                lambda_positions = positions.copy()
-                next_positions = positions.copy()
-                lambda_factor = self._lambda * self.strength
-                mu_factor = self._mu * self.strength
+        return {"FINISHED"}
+
+    def relax_groups(self, groups: list[UVNodeGroup], keep_boundary, keep_pin):
+        """グラフのノードの配列のまま緩和する
+
+        DEFAULT はグループごとに独立しているので、設定で有効なら map_kernel で別プロセスに分けて解く
+        """
+        relax_weights = self.get_relax_weights(groups, keep_boundary, keep_pin)
+        with profiler.phase("solve"):
+            if self.method == "GLOBAL":
+                results = [self.relax_global(group.uvs, item.system) for group, item in zip(groups, relax_weights)]
+            else:
+                prefs = get_preferences()
+                jobs = [
+                    {
+                        "positions": group.uvs,
+                        "indptr": item.weights.indptr,
+                        "indices": item.weights.indices,
+                        "data": item.weights.data,
+                        "movable": item.movable,
+                    }
+                    for group, item in zip(groups, relax_weights)
+                ]
+                options = {
+                    "axis_mask": (self.relax_x, self.relax_y),
+                    "lambda_factor": self._lambda * self.strength,
+                    "mu_factor": self._mu * self.strength,
+                    "iterations": self.iterations,
+                    "eps": self._eps,
+                }
+                results = map_kernel(
+                    taubin_arrays, jobs, options, workers=prefs.parallel_workers, parallel=prefs.parallel_enabled
+                )
+        profiler.count("iterations", self.iterations * len(groups))
+        for group, result in zip(groups, results):
+            group.set_uvs(result)
+            group.update_uvs()
+
+    def get_relax_weights(self, groups: list[UVNodeGroup], keep_boundary, keep_pin):
+        """グループごとの RelaxWeights（groups と同じ順）
+
+        オブジェクトごとに、グラフ（UVと選択）・固定の条件・ピンが同じならトポロジーのキャッシュから再利用する
+        リドゥでは重み・可動フラグ・GLOBAL の LaplaceSystem を作り直さない
+        """
+        groups_by_object = {}
+        for group in groups:
+            groups_by_object.setdefault(id(group.obj_info), []).append(group)
+
+        result = {}
+        for object_groups in groups_by_object.values():
+            obj_info = object_groups[0].obj_info
+            loop_pinned = self.read_pins(obj_info, object_groups[0].graph) if keep_pin else None
+
+            def build():
+                return [self.build_graph_weights(group, keep_boundary, loop_pinned) for group in object_groups]
+
+            if obj_info.graph_key is None:
+                items = build()
+            else:
+                key = (
+                    "RELAX",
+                    obj_info.graph_key,
+                    tuple(len(group.node_ids) for group in object_groups),
+                    keep_boundary,
+                    hash(obj_info.arrays.face_select.tobytes()) if keep_boundary else None,
+                    hash(loop_pinned.tobytes()) if keep_pin else None,
+                )
+                items = obj_info.get_topology().get_derived(key, build)
+            for group, item in zip(object_groups, items):
+                result[id(group)] = item
+        return [result[id(group)] for group in groups]
 
-                for _ in range(self.iterations):
-                    self.apply_laplacian(positions, lambda_positions, fixed_nodes, neighbor_cache, lambda_factor)
-                    max_move = self.apply_laplacian(
-                        lambda_positions, next_positions, fixed_nodes, neighbor_cache, mu_factor, ref_positions=positions
-                    )
+    @staticmethod
+    def read_pins(obj_info, graph):
+        "ノードのループのピン（ループごと、ノードでないループは False）"
+        uv_layer = obj_info.uv_layer
+        bm_loops = obj_info.arrays.loops
+        node_loops = graph.node_loops
+        loop_pinned = np.zeros(len(bm_loops), dtype=bool)
+        loop_pinned[node_loops] = np.fromiter(
+            (bm_loops[index][uv_layer].pin_uv for index in node_loops.tolist()), dtype=bool, count=len(node_loops)
+        )
+        return loop_pinned
+
+    def build_graph_weights(self, group: UVNodeGroup, keep_boundary, loop_pinned=None):
+        "build_neighbors と同じ条件の重み行列と可動フラグ（loop_pinned: ピンを固定する時のループごとのピン）"
+        graph, node_ids = group.graph, group.node_ids
+        node_count = len(node_ids)
+        rows, cols = graph.local_adjacency(node_ids)
+        fixed = np.bincount(rows, minlength=node_count) <= 1
+
+        loop_indices, owner = graph.loops_of(node_ids)
+        if keep_boundary:
+            arrays = group.obj_info.arrays
+            loop_edge = arrays.loop_edge
+            edge_count = len(arrays.edge_seam)
+            edge_faces = np.bincount(loop_edge, minlength=edge_count)
+            edge_selected = np.bincount(loop_edge, weights=arrays.face_select[arrays.loop_face], minlength=edge_count)
+            boundary_edge = (edge_faces == 1) | arrays.edge_seam | ((edge_selected > 0) & (edge_selected < edge_faces))
+            fixed[owner[boundary_edge[loop_edge[loop_indices]]]] = True
+        if loop_pinned is not None:
+            fixed[owner[loop_pinned[loop_indices]]] = True
+
+        vert_co = group.node_vert_cos()
+        delta = vert_co[rows] - vert_co[cols]
+        distance = np.maximum(np.sqrt(np.einsum("ij,ij->i", delta, delta)), 0.000001)
+        keep = ~fixed[rows]
+        weights = CSRMatrix.from_coo(rows[keep], cols[keep], 1.0 / distance[keep], node_count)
+        return RelaxWeights(weights, ~fixed)
+
+    def build_neighbors(self, nodes, uv_layer, keep_boundary, keep_pin):
+        node_index_map = {id(node): index for index, node in enumerate(nodes)}
+        fixed_nodes = [False] * len(nodes)
+        neighbor_cache = [[] for _ in nodes]
+        selection_boundary_cache = {}
+
+        for index, node in enumerate(nodes):
+            if keep_boundary:
+                is_boundary_node = any(
+                    loop.edge.is_boundary
+                    or loop.edge.seam
+                    or self.is_selection_boundary(loop.edge, selection_boundary_cache)
+                    for loop in node.loops
+                )
+            else:
+                is_boundary_node = False
 
-                    positions, lambda_positions, next_positions = next_positions, positions, lambda_positions
+            is_pinned = any(loop[uv_layer].pin_uv for loop in node.loops) if keep_pin else False
+            fixed_nodes[index] = len(node.neighbors) <= 1 or is_pinned or is_boundary_node
 
-                    if max_move < self._eps:
-                        break
+            if fixed_nodes[index]:
+                continue
 
-                for index, node in enumerate(nodes):
-                    node.uv = positions[index]
-                    node.update_uv(uv_layer)
+            node_co = node.vert.co
+            weighted_neighbors = []
+            for neighbor in node.neighbors:
+                distance = max((neighbor.vert.co - node_co).length, 0.000001)
+                weighted_neighbors.append((node_index_map[id(neighbor)], 1.0 / distance))
+            neighbor_cache[index] = weighted_neighbors
 
-            node_manager.update_uvmeshes()
+        return fixed_nodes, neighbor_cache
 
-        self.end_time()
-        return {"FINISHED"}
+    def relax_global(self, original, system: LaplaceSystem):
+        "固定ノードを境界条件として連立方程式を解く"
+        solved = system.solve(original, self.iterations * self._lambda)
+        axis_mask = np.array((self.relax_x, self.relax_y), dtype=np.float64)
+        return original + (solved - original) * (self.strength * axis_mask)
+
+    def relax_positions(self, nodes, fixed_nodes, neighbor_cache, lambda_factor, mu_factor):
+        positions = [node.uv.copy() for node in nodes]
+        lambda_positions = positions.copy()
+        next_positions = positions.copy()
+
+        for _ in range(self.iterations):
+            self.apply_laplacian(positions, lambda_positions, fixed_nodes, neighbor_cache, lambda_factor)
+            max_move = self.apply_laplacian(
+                lambda_positions, next_positions, fixed_nodes, neighbor_cache, mu_factor, ref_positions=positions
+            )
+
+            positions, lambda_positions, next_positions = next_positions, positions, lambda_positions
+
+            if max_move < self._eps:
+                break
+
+        return positions
 
     @staticmethod
     def is_selection_boundary(edge, cache):
@@ -59,7 +59,6 @@ class UV_OT_mio3_seam(Mio3UVOperator):
     )
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
 
         view_matrix = context.space_data.region_3d.view_matrix
@@ -136,7 +135,6 @@ class UV_OT_mio3_seam(Mio3UVOperator):
         if self.unwrap:
             bpy.ops.uv.unwrap(method="ANGLE_BASED", margin=0, use_subsurf_data=False, fill_holes=True, correct_aspect=True)
 
-        self.end_time()
         return {"FINISHED"}
 
     @staticmethod
@@ -1,10 +1,12 @@
 import bpy
 import bmesh
 import math
-from mathutils import Vector, kdtree
+from mathutils import Vector
 from bmesh.types import BMesh, BMLoop, BMLayerItem
 from bpy.props import BoolProperty, FloatProperty, EnumProperty
-from ..classes import Mio3UVOperator, UVIslandManager, UVIsland
+from ..classes import Mio3UVOperator, UVIslandManager, UVWeldIndex, IslandSignatures
+from ..classes.mirror_map import MirrorMap
+from ..classes.topology_cache import MeshTopology
 from ..utils.utils import uv_select_set_face, uv_select_set_all, find_uv_boundary_edges
 
 
@@ -60,7 +62,6 @@ class UV_OT_mio3_select_half(Mio3UVOperator):
     )
 
     def execute(self, context):
-        self.start_time()
 
         objects = self.get_selected_objects(context)
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
@@ -94,7 +95,6 @@ class UV_OT_mio3_select_half(Mio3UVOperator):
 
             bmesh.update_edit_mesh(obj.data)
 
-        self.end_time()
         return {"FINISHED"}
 
 
@@ -109,55 +109,40 @@ class UV_OT_mio3_select_similar(Mio3UVOperator):
     area_threshold: FloatProperty(name="Threshold", default=0.005, min=0.001, precision=3, step=0.1)
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
 
         island_manager = UVIslandManager(objects, sync=use_uv_select_sync, find_all=True)
 
         source_island = None
-        source_face_count = 0
-        source_edge_count = 0
         for island in island_manager.islands:
             if any(face.uv_select for face in island.faces):
                 source_island = island
-                source_face_count = len(source_island.faces)
-                source_edge_count = self.get_island_edge_count(source_island) if self.edges else None
-                source_area = self.get_island_area(source_island) if self.area else None
                 break
 
         if not source_island:
             return {"CANCELLED"}
 
+        signatures = IslandSignatures.from_manager(island_manager, area=self.area)
+        similar = signatures.similar_mask(
+            source_island,
+            ("faces", "edges") if self.edges else ("faces",),
+            self.area_threshold if self.area else None,
+        )
+
         source_island.uv_select_set_all(True)
 
         for island in island_manager.islands:
             if island == source_island:
                 continue
             island.uv_select_set_all(False)
-            if not self.is_different(island, source_face_count, source_edge_count, source_area):
+            if similar[island.island_id]:
                 island.uv_select_set_all(True)
 
         island_manager.update_uvmeshes(True)
 
-        self.end_time()
         return {"FINISHED"}
 
-    def get_island_edge_count(self, island: UVIsland):
-        return len({edge for face in island.faces for edge in face.edges})
-
-    def get_island_area(self, island: UVIsland):
-        return sum(face.calc_area() for face in island.faces)
-
-    def is_different(self, island: UVIsland, base_face_count, base_edge_count, base_area):
-        if len(island.faces) != base_face_count:
-            return True
-        if self.edges and self.get_island_edge_count(island) != base_edge_count:
-            return True
-        if self.area and abs(self.get_island_area(island) - base_area) > self.area_threshold:
-            return True
-        return False
-
     def draw(self, context):
         layout = self.layout
         layout.use_property_split = True
@@ -192,9 +177,7 @@ class UV_OT_mio3_select_mirror3d(Mio3UVOperator):
     )
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
-        self.threshold_sq = self.threshold * self.threshold
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
 
         for obj in objects:
@@ -205,61 +188,50 @@ class UV_OT_mio3_select_mirror3d(Mio3UVOperator):
             if use_uv_select_sync and not bm.uv_select_sync_valid:
                 bm.uv_select_sync_from_mesh()
 
-            self.select_mirror(bm, use_uv_select_sync)
+            self.select_mirror(obj, bm, use_uv_select_sync)
 
             if bm.uv_select_sync_valid:
                 bm.uv_select_sync_to_mesh()
 
+            MeshTopology.mark_uv_update(obj.data)
             bmesh.update_edit_mesh(obj.data)
 
-        self.end_time()
         return {"FINISHED"}
 
-    def select_mirror(self, bm: BMesh, use_uv_select_sync: bool):
-        target_faces, source_faces, source_verts = self.find_targets(bm, use_uv_select_sync)
-
-        kd = kdtree.KDTree(len(bm.faces))
-        face_centers = {}
-        for i, face in enumerate(bm.faces):
-            if face in target_faces:
-                face_center = face.calc_center_median()
-                face_centers[face] = face_center
-                kd.insert(face_center, i)
-        kd.balance()
+    def select_mirror(self, obj, bm: BMesh, use_uv_select_sync: bool):
+        bm.verts.index_update()
+        bm.faces.index_update()
+        mirror_map = MirrorMap.get(obj, bm, "X", self.threshold)
+        target_faces, source_faces, source_verts = self.find_targets(bm, use_uv_select_sync, mirror_map)
 
         fast, expand = self.fast, self.expand
-        threshold, threshold_sq = self.threshold, self.threshold * self.threshold
         get_symmetric_3d_point = self.get_symmetric_3d_point
-        find_sym_face_single = self.find_sym_face_single
-        find_sym_face_strict = self.find_sym_face_strict
-
-        sym_positions = {v: get_symmetric_3d_point(v.co) for v in source_verts}
-        if fast:
-            sym_verts = {}
-        else:
-            sym_verts = {f: [sym_positions[v] for v in f.verts if v in sym_positions] for f in source_faces}
+        # 簡易モードは面の中心、通常は頂点の集合で対称な面を探す
+        sym_face_indices = mirror_map.face_center_mirror if fast else mirror_map.face_mirror
 
         processed = set()
         for face in source_faces:
-            sym_center = get_symmetric_3d_point(face_centers[face])
-            if fast:
-                sym_face = find_sym_face_single(bm, kd, sym_center, threshold)
-            else:
-                sym_face = find_sym_face_strict(bm, kd, sym_center, sym_verts[face], threshold_sq)
-            if not sym_face:
+            sym_index = sym_face_indices[face.index]
+            if sym_index < 0:
                 continue
-            for loop in face.loops:
+            sym_face = bm.faces[sym_index]
+            if sym_face not in target_faces:
+                continue
+            offsets = mirror_map.face_loop_offsets(face.index, sym_index)
+            for loop, offset in zip(face.loops, offsets):
                 if loop in processed:
                     continue
                 if loop.uv_select_vert:
-                    sym_vert = min(sym_face.verts, key=lambda v: (v.co - sym_positions[loop.vert]).length_squared)
-                    for sym_loop in sym_face.loops:
-                        if sym_loop in processed:
-                            continue
-                        if sym_loop.vert == sym_vert:
-                            sym_loop.uv_select_vert = True
-                            processed.add(sym_loop)
-                            break
+                    if offset >= 0:
+                        sym_loop = sym_face.loops[offset]
+                    else:
+                        # 面の分割が異なる場合は最も近い頂点のループ
+                        sym_co = get_symmetric_3d_point(loop.vert.co)
+                        sym_vert = min(sym_face.verts, key=lambda v: (v.co - sym_co).length_squared)
+                        sym_loop = next(sym_loop for sym_loop in sym_face.loops if sym_loop.vert == sym_vert)
+                    if sym_loop not in processed:
+                        sym_loop.uv_select_vert = True
+                        processed.add(sym_loop)
                 if not expand:
                     loop.uv_select_vert = False
                 processed.add(loop)
@@ -278,30 +250,8 @@ class UV_OT_mio3_select_mirror3d(Mio3UVOperator):
     def get_symmetric_3d_point(co):
         return Vector((-co.x, co.y, co.z))
 
-    # 対称面を見つける
-    @staticmethod
-    def find_sym_face_single(bm, kd, sym_center, threshold):
-        _, i, dist = kd.find(sym_center)
-        if dist > threshold:
-            return None
-        return bm.faces[i]
-
-    # 対称面を見つける（頂点位置の一致も考慮する＠ミラーで三角の割が違い、近くに別の面があるケースを考慮）
-    @staticmethod
-    def find_sym_face_strict(bm, kd, sym_center, sym_verts, threshold_sq):
-        potential_faces = [bm.faces[i] for (_, i, _) in kd.find_n(sym_center, 5)]
-        for pot_face in potential_faces:
-            if all(any((v.co - sv).length_squared < threshold_sq for sv in sym_verts) for v in pot_face.verts):
-                return pot_face
-        return None
-
     # 対象の頂点を収集
-    def find_targets(self, bm, use_uv_select_sync):
-        kd = kdtree.KDTree(len(bm.verts))
-        for i, v in enumerate(bm.verts):
-            kd.insert(v.co, i)
-        kd.balance()
-
+    def find_targets(self, bm, use_uv_select_sync, mirror_map: MirrorMap):
         source_faces = set()
         source_verts = set()
         source_face_verts = set()
@@ -315,14 +265,12 @@ class UV_OT_mio3_select_mirror3d(Mio3UVOperator):
                     source_verts.add(loop.vert)
                     source_face_verts.update(face.verts)  # extend
 
-        threshold = self.threshold
+        vert_mirror = mirror_map.vert_mirror
         symmetric_faces = set()
         for v in source_verts:
-            symm_co = self.get_symmetric_3d_point(v.co)
-            co_find = kd.find(symm_co)
-            if co_find[2] < threshold:
-                symm_vert = bm.verts[co_find[1]]
-                symmetric_faces.update(symm_vert.link_faces)
+            symm_index = vert_mirror[v.index]
+            if symm_index >= 0:
+                symmetric_faces.update(bm.verts[symm_index].link_faces)
 
         target_faces = source_faces | symmetric_faces
         return target_faces, source_faces, source_face_verts
@@ -356,7 +304,6 @@ class UV_OT_mio3_select_edge(Mio3UVOperator):
             col.enabled = False
 
     def execute(self, context):
-        self.start_time()
 
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
         objects = self.get_selected_objects(context)
@@ -370,7 +317,6 @@ class UV_OT_mio3_select_edge(Mio3UVOperator):
                 context.tool_settings.uv_select_mode = "EDGE"
             self.select_direction(objects, use_uv_select_sync)
 
-        self.end_time()
         return {"FINISHED"}
 
     def select_boundary(self, objects, use_uv_select_sync):
@@ -382,26 +328,15 @@ class UV_OT_mio3_select_edge(Mio3UVOperator):
             island_faces = set(island.faces)
             uv_boundary_edges = find_uv_boundary_edges(island_faces, uv_layer)
 
-            uv_to_loops = {}
-            selected_uv_coords = set()
-            selected_edges = set()
-            for face in island.faces:
-                for loop in face.loops:
-                    uv_key = tuple(loop[uv_layer].uv)
-                    bucket = uv_to_loops.get(uv_key)
-                    if bucket is None:
-                        bucket = []
-                        uv_to_loops[uv_key] = bucket
-                    bucket.append(loop)
-
-                    if check_selected:
-                        if loop.uv_select_vert:
-                            selected_uv_coords.add(uv_key)
-                        if loop.uv_select_edge:
-                            selected_edges.add(loop.edge)
-                    else:
-                        selected_uv_coords.add(uv_key)
-                        selected_edges.add(loop.edge)
+            weld = UVWeldIndex.from_bmesh(island.bm, uv_layer, faces=island.faces)
+            uv_to_loops = weld.groups("UV")
+            if check_selected:
+                labels = weld.labels("UV")
+                selected_uv_coords = set(labels[weld.arrays.loop_uv_select_vert].tolist())
+                selected_edges = {loop.edge for loop in weld.loops if loop.uv_select_edge}
+            else:
+                selected_uv_coords = set(uv_to_loops)
+                selected_edges = {loop.edge for loop in weld.loops}
 
             island.uv_select_set_all(False)
 
@@ -424,24 +359,13 @@ class UV_OT_mio3_select_edge(Mio3UVOperator):
         axis = self.method
 
         for island in island_manager.islands:
-            uv_to_loops = {}
             uv_layer = island.uv_layer
-            selected_edges = set()
-
-            for face in island.faces:
-                for loop in face.loops:
-                    uv_key = tuple(loop[uv_layer].uv)
-                    bucket = uv_to_loops.get(uv_key)
-                    if bucket is None:
-                        bucket = []
-                        uv_to_loops[uv_key] = bucket
-                    bucket.append(loop)
-
-                    if check_selected:
-                        if loop.uv_select_edge:
-                            selected_edges.add(loop.edge)
-                    else:
-                        selected_edges.add(loop.edge)
+            weld = UVWeldIndex.from_bmesh(island.bm, uv_layer, faces=island.faces)
+            uv_to_loops = weld.groups("UV")
+            if check_selected:
+                selected_edges = {loop.edge for loop in weld.loops if loop.uv_select_edge}
+            else:
+                selected_edges = {loop.edge for loop in weld.loops}
 
             island.uv_select_set_all(False)
 
@@ -455,8 +379,8 @@ class UV_OT_mio3_select_edge(Mio3UVOperator):
                             if shared_loop.face in island.faces:
                                 shared_loop.uv_select_edge = True
                                 for uv_loops in (
-                                    uv_to_loops[tuple(shared_loop[uv_layer].uv)],
-                                    uv_to_loops[tuple(shared_loop.link_loop_next[uv_layer].uv)],
+                                    uv_to_loops[weld.label(shared_loop)],
+                                    uv_to_loops[weld.label(shared_loop.link_loop_next)],
                                 ):
                                     for uv_loop in uv_loops:
                                         uv_loop.uv_select_vert = True
@@ -485,7 +409,6 @@ class UV_OT_mio3_select_zero(Mio3UVOperator, bpy.types.Operator):
     bl_options = {"REGISTER", "UNDO"}
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
 
@@ -525,7 +448,6 @@ class UV_OT_mio3_select_zero(Mio3UVOperator, bpy.types.Operator):
         if count:
             self.report({"INFO"}, "Selected {} faces".format(count))
 
-        self.end_time()
         return {"FINISHED"}
 
 
@@ -536,7 +458,6 @@ class UV_OT_mio3_select_flipped_faces(Mio3UVOperator):
     bl_options = {"REGISTER", "UNDO"}
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
 
@@ -578,7 +499,6 @@ class UV_OT_mio3_select_flipped_faces(Mio3UVOperator):
         if count:
             self.report({"INFO"}, "Selected {} faces".format(count))
 
-        self.end_time()
         return {"FINISHED"}
 
 
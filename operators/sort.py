@@ -1,12 +1,14 @@
 import bpy
 import math
 import gpu
+import numpy as np
 from mathutils import Vector
 from bpy.types import SpaceView3D
 from bpy.props import BoolProperty, FloatProperty, EnumProperty, IntProperty
 from gpu_extras.batch import batch_for_shader
-from ..classes import Mio3UVOperator, UVIslandManager, UVIsland
-from ..globals import get_preferences
+from ..classes import Mio3UVOperator, UVIslandManager, UVIsland, IslandSignatures
+from ..globals import get_preferences, get_padding
+from ..core.packing import pack_rects, fit_scale, tile_offsets
 from ..icons import icons
 
 IslandList = list[UVIsland]
@@ -62,6 +64,7 @@ class UV_OT_mio3_sort(Mio3UVOperator):
         items=[
             ("STANDARD", "Standard", "Rearrange islands based on coordinates in 3D space"),
             ("FIXED", "Fixed Width", "Gridding island based on coordinates in 3D space"),
+            ("PACK", "Pack", "Pack islands into UV tiles"),
         ]
     )
 
@@ -126,6 +129,9 @@ class UV_OT_mio3_sort(Mio3UVOperator):
         default="NONE",
     )
     by_group: BoolProperty(name="By Group", default=False, options={"SKIP_SAVE"})
+    pack_rotate: BoolProperty(name="Rotate", description="Allow 90° rotation", default=True)
+    pack_fit: BoolProperty(name="Scale to Fit", description="Scale islands to fit in the tiles", default=False)
+    pack_tiles: IntProperty(name="Tiles", default=1, min=1, max=100)
 
     WATCH_INTERVAL = 1.0
     GUIDE_LINE_LENGTH = 1000.0
@@ -366,7 +372,6 @@ class UV_OT_mio3_sort(Mio3UVOperator):
         return self.execute(context)
 
     def execute(self, context):
-        self.start_time()
         prefs = get_preferences()
         objects = self.get_selected_objects(context)
 
@@ -397,6 +402,12 @@ class UV_OT_mio3_sort(Mio3UVOperator):
             self.remove_handler(context)
             return {"CANCELLED"}
 
+        if self.aling_mode == "PACK":
+            self.remove_handler(context)
+            self.pack_islands(context, island_manager.islands)
+            island_manager.update_uvmeshes(True)
+            return {"FINISHED"}
+
         if self.method != "UV":
             island_manager.set_orientation_mode(self.coordinate_space)
 
@@ -421,7 +432,6 @@ class UV_OT_mio3_sort(Mio3UVOperator):
 
         island_manager.update_uvmeshes(True)
 
-        self.end_time()
         return {"FINISHED"}
 
     def find_groups(self, island_manager: UVIslandManager):
@@ -481,32 +491,8 @@ class UV_OT_mio3_sort(Mio3UVOperator):
             groups = list(mat_groups.values())
             groups.sort(key=lambda x: mat_islands[x[0]].name if mat_islands[x[0]] else "", reverse=self.reverse)
         elif self.group_type == "SIMILAR":
-
-            def get_island_uv_count(island):
-                return sum(len(face.loops) for face in island.faces)
-
-            def get_island_edge_count(island):
-                return len({edge for face in island.faces for edge in face.edges})
-
-            def is_similar(island1, island2):
-                if len(island1.faces) != len(island2.faces):
-                    return False
-                if get_island_uv_count(island1) != get_island_uv_count(island2):
-                    return False
-                if get_island_edge_count(island1) != get_island_edge_count(island2):
-                    return False
-                return True
-
-            groups = []
-            for island in island_manager.islands:
-                found_group = False
-                for group in groups:
-                    if is_similar(island, group[0]):
-                        group.append(island)
-                        found_group = True
-                        break
-                if not found_group:
-                    groups.append([island])
+            signatures = IslandSignatures.from_manager(island_manager)
+            groups = signatures.group(island_manager.islands, ("faces", "loops", "edges"))
             groups.sort(key=lambda x: len(x[0].faces), reverse=self.reverse)
         elif self.group_type == "SCALE":
 
@@ -514,19 +500,10 @@ class UV_OT_mio3_sort(Mio3UVOperator):
                 return max(island.width, island.height)
 
             scale_threshold = 0.2  # 20% 以内
-            groups = []
-            for island in island_manager.islands:
-                island_scale = get_island_scale(island)
-                found_group = False
-                for group in groups:
-                    group_scale = get_island_scale(group[0])
-                    scale_difference = abs(island_scale - group_scale) / max(island_scale, group_scale)
-                    if scale_difference <= scale_threshold:
-                        group.append(island)
-                        found_group = True
-                        break
-                if not found_group:
-                    groups.append([island])
+            islands = island_manager.islands
+            groups = IslandSignatures.group_by_value(
+                islands, [get_island_scale(island) for island in islands], scale_threshold
+            )
             groups.sort(key=lambda x: get_island_scale(x[0]), reverse=self.reverse)
         return groups
 
@@ -643,6 +620,24 @@ class UV_OT_mio3_sort(Mio3UVOperator):
 
         island_manager.sort_all_islands(key=sort_func, reverse=self.reverse)
 
+    def pack_islands(self, context, islands: IslandList):
+        "アイランドの範囲をパディングを空けてタイルに詰める"
+        padding = get_padding(context.active_object)
+        widths = np.array([island.width for island in islands], dtype=np.float64)
+        heights = np.array([island.height for island in islands], dtype=np.float64)
+        scale = 1.0
+        if self.pack_fit:
+            scale = fit_scale(widths, heights, padding, self.pack_rotate, self.pack_tiles)
+        position, rotated, tile = pack_rects(widths * scale, heights * scale, padding, self.pack_rotate)
+        corners = position + tile_offsets(tile)
+
+        for island, corner, turned, height in zip(islands, corners, rotated.tolist(), (heights * scale).tolist()):
+            uvs = (island.uvs - np.array(island.min_uv)) * scale
+            if turned:
+                # 90°回転して左下を原点に戻す
+                uvs = np.column_stack((height - uvs[:, 1], uvs[:, 0]))
+            island.set_uvs(uvs + corner)
+
     def align_groups(self, groups: list[IslandList]):
         all_islands = [island for group in groups for island in group]
         all_min = Vector(
@@ -755,6 +750,15 @@ class UV_OT_mio3_sort(Mio3UVOperator):
         layout.row().prop(self, "aling_mode", text="Align Mode", expand=True)
         layout.separator()
 
+        if self.aling_mode == "PACK":
+            layout.use_property_split = True
+            layout.prop(self, "pack_rotate")
+            layout.prop(self, "pack_fit")
+            row = layout.row()
+            row.enabled = self.pack_fit
+            row.prop(self, "pack_tiles")
+            return
+
         row_method = layout.row()
         row_method.label(text="Sort Method")
         row_method.prop(self, "method", text="")
@@ -1,7 +1,7 @@
 import bpy
 from mathutils import Vector
 from bpy.props import BoolProperty, FloatProperty, EnumProperty, FloatVectorProperty
-from ..classes import Mio3UVOperator, UVIslandManager
+from ..classes import Mio3UVOperator, UVIslandManager, IslandStacker
 
 
 class UV_OT_mio3_paste(Mio3UVOperator):
@@ -43,11 +43,19 @@ class UV_OT_mio3_stack(Mio3UVOperator):
     bl_options = {"REGISTER", "UNDO"}
 
     selected: BoolProperty(name="Selected Only", default=False)
+    transform: EnumProperty(
+        name="Transform",
+        items=[
+            ("COPY", "Copy", "Copy the UVs of the source island"),
+            ("SIMILARITY", "Similarity", "Rotate, scale and move each island onto the source"),
+            ("RIGID", "Rigid", "Rotate and move each island onto the source"),
+        ],
+        default="COPY",
+    )
     use_offset: BoolProperty(name="Offset", default=False)
     offset: FloatVectorProperty(name="Offset", size=2, default=(1.0, 0.0))
 
     def execute(self, context):
-        self.start_time()
         self.objects = self.get_selected_objects(context)
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
 
@@ -56,26 +64,29 @@ class UV_OT_mio3_stack(Mio3UVOperator):
         selected_islands = [i for i in island_manager.islands if i.is_any_uv_selected()]
         among_islands = selected_islands if self.selected else island_manager.islands
 
-        bpy.ops.uv.copy()
+        # トポロジーが同じアイランドを対応するループで重ねる
+        stacker = IslandStacker(island_manager, self.transform)
+        candidates = {}
+        for island in among_islands:
+            candidates.setdefault(stacker.key(island), []).append(island)
 
         processed = set()
         stacked_islands = set(selected_islands)
         for source_island in selected_islands:
             if source_island in processed:
                 continue
-            base_face_count = len(source_island.faces)
-
-            for island in among_islands:
-                if island == source_island:
-                    continue
-                if not self.is_different(island, base_face_count):
-                    island.uv_select_set_all(True)
-                    for face in island.faces:
-                        face.select = True
-                    processed.add(island)
-                    stacked_islands.add(island)
 
-        bpy.ops.uv.paste()
+            targets = [
+                island
+                for island in candidates.get(stacker.key(source_island), ())
+                if island != source_island and island not in processed
+            ]
+            for island in stacker.stack(source_island, targets):
+                island.uv_select_set_all(True)
+                for face in island.faces:
+                    face.select = True
+                processed.add(island)
+                stacked_islands.add(island)
 
         if self.use_offset:
             ordered_islands = [island for island in island_manager.islands if island in stacked_islands]
@@ -83,19 +94,14 @@ class UV_OT_mio3_stack(Mio3UVOperator):
                 island.move(Vector(self.offset) * i)
 
         island_manager.update_uvmeshes()
-        self.end_time()
         return {"FINISHED"}
 
-    def is_different(self, island, base_face_count):
-        if len(island.faces) != base_face_count:
-            return True
-        return False
-
     def draw(self, context):
         layout = self.layout
         layout.use_property_decorate = False
         layout.use_property_split = True
         layout.prop(self, "selected")
+        layout.prop(self, "transform")
         layout.prop(self, "use_offset")
         col = layout.column(align=True)
         if not self.use_offset:
@@ -30,6 +30,7 @@ class UV_OT_mio3_stitch(Mio3UVOperator):
                 stored_mode="EDGE",
             )
 
+        island_manager.mark_dirty()
         island_manager.update_uvmeshes(True)
 
         return {"FINISHED"}
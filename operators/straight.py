@@ -22,7 +22,6 @@ class UV_OT_mio3_straight(Mio3UVOperator):
     keep_length: BoolProperty(name="Preserve Length", default=True)
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
 
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
@@ -34,22 +33,18 @@ class UV_OT_mio3_straight(Mio3UVOperator):
             node_manager = UVNodeManager.from_island(island, sync=use_uv_select_sync, sub_faces=island.faces)
             if node_manager.groups:
                 for group in node_manager.groups:
-                    group.store_selection()
                     straight_uv_nodes(group, self.type, self.keep_length, center=True)
-                    for node in group.nodes:
-                        node.update_uv(group.uv_layer)
+                    group.update_uvs()
                     group.set_pin(True)
 
             island.uv_select_set_all(True)
 
         bpy.ops.uv.unwrap(method="ANGLE_BASED", margin=0.001, use_subsurf_data=False, fill_holes=True, correct_aspect=True)
 
-        for island in island_manager.islands:
-            island.restore_selection()
+        island_manager.restore_selection()
 
         island_manager.update_uvmeshes(True)
 
-        self.end_time()
         return {"FINISHED"}
 
 
@@ -29,7 +29,6 @@ class UV_OT_mio3_stretch(Mio3UVOperator):
         return self.execute(context)
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
 
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
@@ -87,6 +86,7 @@ class UV_OT_mio3_stretch(Mio3UVOperator):
                                 local_y = uv.y - center_y
                                 uv.y = center_y + (local_y * scale_y)
 
+            island_manager.mark_dirty()
             island_manager.update_uvmeshes(True)
         else:
             node_manager = UVNodeManager(objects, sync=use_uv_select_sync)
@@ -139,7 +139,6 @@ class UV_OT_mio3_stretch(Mio3UVOperator):
 
             node_manager.update_uvmeshes()
 
-        self.end_time()
         return {"FINISHED"}
 
     def draw(self, context):
@@ -1,10 +1,12 @@
 import bpy
 import bmesh
-from mathutils import Vector, kdtree
+from mathutils import Vector
 from bpy.types import Context
 from bpy.props import BoolProperty, FloatProperty, EnumProperty
-from bmesh.types import BMesh, BMLayerItem, BMLoop, BMVert, BMFace
+from bmesh.types import BMesh, BMLayerItem, BMLoop, BMFace
 from ..classes import Mio3UVOperator
+from ..classes.mirror_map import MirrorMap
+from ..classes.topology_cache import MeshTopology
 from ..utils.utils import get_tile_co
 from ..globals import get_preferences
 from ..icons import icons
@@ -73,9 +75,7 @@ class UV_OT_mio3_symmetrize(Mio3UVOperator):
         return True
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
-        self.threshold_sq = self.threshold * self.threshold
 
         if not objects:
             self.report({"WARNING"}, "Object is not selected")
@@ -84,13 +84,6 @@ class UV_OT_mio3_symmetrize(Mio3UVOperator):
         if self.axis_3d == "AUTO":
             self.axis_3d = {"X": "X", "Y": "Z"}.get(self.axis_uv, self.axis_uv)
 
-        if self.axis_3d == "X":
-            self.get_symmetric_3d_point = lambda co: Vector((-co.x, co.y, co.z))
-        elif self.axis_3d == "Y":
-            self.get_symmetric_3d_point = lambda co: Vector((co.x, -co.y, co.z))
-        else:
-            self.get_symmetric_3d_point = lambda co: Vector((co.x, co.y, -co.z))
-
         if self.axis_uv == "X":
             self.get_symmetric_uv_point = lambda uv, center: Vector((2 * center.x - uv.x, uv.y))
         else:
@@ -105,7 +98,6 @@ class UV_OT_mio3_symmetrize(Mio3UVOperator):
         if self.merge:
             bpy.ops.uv.remove_doubles(threshold=self._threshold_uv)
 
-        self.end_time()
         return {"FINISHED"}
 
     def symmetrize(self, context, obj: bpy.types.Object):
@@ -119,56 +111,41 @@ class UV_OT_mio3_symmetrize(Mio3UVOperator):
 
         axis_3d = self.axis_3d
         stack = self.stack
-        threshold_sq = self.threshold_sq
-        get_symmetric_3d_point = self.get_symmetric_3d_point
         get_symmetric_uv_point = self.get_symmetric_uv_point
         should_symmetrize = self.should_symmetrize
-        find_sym_face_strict = self.find_sym_face_strict
 
-        target_faces, source_faces, source_loops = self.find_targets(bm, use_uv_select_sync)
-        target_faces = list(target_faces)
+        bm.verts.index_update()
+        bm.faces.index_update()
+        mirror_map = MirrorMap.get(obj, bm, axis_3d, self.threshold)
 
-        kd = kdtree.KDTree(len(target_faces))
-        face_centers = {}
-        for i, face in enumerate(target_faces):
-            face_center = face.calc_center_median()
-            face_centers[face] = face_center
-            kd.insert(face_center, i)
-        kd.balance()
+        target_faces, source_faces, source_loops = self.find_targets(bm, use_uv_select_sync, mirror_map)
+        face_centers = {face: Vector(mirror_map.face_center[face.index]) for face in target_faces}
 
         sym_center_uv = self.get_symmetry_center(context, uv_layer, source_loops)
         direction_3d = self.check_uv_3d_direction(uv_layer, sym_center_uv, face_centers, source_faces)
 
-        target_verts = set()
-        sym_positions = {}
-        sym_loop_maps = {}
         for face in target_faces:
-            sym_loop_maps[face] = {loop.vert: loop for loop in face.loops}
-            for v in face.verts:
-                if v not in target_verts:
-                    target_verts.add(v)
-                    sym_positions[v] = get_symmetric_3d_point(v.co)
-
-        sym_verts = {f: [sym_positions[v] for v in f.verts if v in sym_positions] for f in target_faces}
-
-        for face in target_faces:
-            center = face_centers[face]
-            sym_center = get_symmetric_3d_point(center)
-            if should_symmetrize(center, direction_3d, axis_3d):
-                sym_face = find_sym_face_strict(target_faces, kd, sym_center, sym_verts[face], threshold_sq)
-                if not sym_face:
+            if not should_symmetrize(face_centers[face], direction_3d, axis_3d):
+                continue
+            sym_index = mirror_map.face_mirror[face.index]
+            if sym_index < 0:
+                continue
+            sym_face = bm.faces[sym_index]
+            if sym_face not in target_faces:
+                continue
+            sym_face_loops = sym_face.loops
+            for loop, offset in zip(face.loops, mirror_map.face_loop_offsets(face.index, sym_index)):
+                if offset < 0:
                     continue
-                sym_face_loops = sym_loop_maps[sym_face]
-                for loop in face.loops:
+                sym_loop = sym_face_loops[offset]
+                if sym_loop.uv_select_vert or loop.uv_select_vert:
                     loop_uv = loop[uv_layer]
-                    sym_vert = min(sym_face.verts, key=lambda v: (v.co - sym_positions[loop.vert]).length_squared)
-                    sym_loop = sym_face_loops.get(sym_vert)
-                    if sym_loop and (sym_loop.uv_select_vert or loop.uv_select_vert):
-                        if stack:
-                            sym_loop[uv_layer].uv = loop_uv.uv
-                        else:
-                            sym_loop[uv_layer].uv = get_symmetric_uv_point(loop_uv.uv, sym_center_uv)
+                    if stack:
+                        sym_loop[uv_layer].uv = loop_uv.uv
+                    else:
+                        sym_loop[uv_layer].uv = get_symmetric_uv_point(loop_uv.uv, sym_center_uv)
 
+        MeshTopology.mark_uv_update(obj.data)
         bmesh.update_edit_mesh(obj.data)
 
     # self.direction側にあるUV面がどの方向にあるか調べる
@@ -261,15 +238,6 @@ class UV_OT_mio3_symmetrize(Mio3UVOperator):
             direction_3d == "NEGATIVE" and point[axis_index] < 0
         )
 
-    # 対称面を見つける（頂点位置の一致も考慮する＠ミラーで三角の割が違い、近くに別の面があるケースを考慮）
-    @staticmethod
-    def find_sym_face_strict(target_faces: list[BMFace], kd: kdtree.KDTree, sym_center, sym_verts: list[BMVert], threshold_sq):
-        for _, i, _ in kd.find_n(sym_center, 5):
-            pot_face = target_faces[i]
-            if all(any((v.co - sv).length_squared < threshold_sq for sv in sym_verts) for v in pot_face.verts):
-                return pot_face
-        return None
-
     def get_symmetry_center(self, context: Context, uv_layer: BMLayerItem, loops: list[BMLoop]):
         if self.center == "SELECT":
             uvs = [loop[uv_layer].uv for loop in loops if loop.uv_select_vert]
@@ -283,12 +251,7 @@ class UV_OT_mio3_symmetrize(Mio3UVOperator):
                 return Vector((0.5, 0.5))
 
     # 対象の頂点を収集
-    def find_targets(self, bm: BMesh, use_uv_select_sync: bool):
-        kd = kdtree.KDTree(len(bm.verts))
-        for i, v in enumerate(bm.verts):
-            kd.insert(v.co, i)
-        kd.balance()
-
+    def find_targets(self, bm: BMesh, use_uv_select_sync: bool, mirror_map: MirrorMap):
         source_faces = set()
         source_verts = set()
         source_loops = set()
@@ -309,13 +272,12 @@ class UV_OT_mio3_symmetrize(Mio3UVOperator):
                     source_loops.add(loop)
                     source_verts.add(loop.vert)
 
-        threshold = self.threshold
+        vert_mirror = mirror_map.vert_mirror
         symmetric_faces = set()
         for v in source_verts:
-            symm_co = self.get_symmetric_3d_point(v.co)
-            co_find = kd.find(symm_co)
-            if co_find[2] < threshold:
-                symm_vert = bm.verts[co_find[1]]
+            symm_index = vert_mirror[v.index]
+            if symm_index >= 0:
+                symm_vert = bm.verts[symm_index]
                 if use_uv_select_sync:
                     symmetric_faces.update(face for face in symm_vert.link_faces if not face.hide)
                 else:
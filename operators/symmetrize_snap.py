@@ -1,9 +1,10 @@
 import bpy
+import numpy as np
 from bisect import bisect_left, bisect_right
 from mathutils import Vector
 from bpy.props import FloatProperty, EnumProperty
 from bmesh.types import BMLoop, BMLayerItem
-from ..classes import Mio3UVOperator, UVNodeManager, UVNodeGroup, UVNode
+from ..classes import Mio3UVOperator, UVNodeManager, UVNodeGroup
 from ..utils.utils import get_tile_co
 
 
@@ -63,14 +64,13 @@ class UV_OT_mio3_symmetry_snap(Mio3UVOperator):
         return self.execute(context)
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
 
         node_manager = UVNodeManager(objects, sync=use_uv_select_sync, node_key_mode="VERT_AND_UV")
         for group in node_manager.groups:
             uv_layer = group.uv_layer
-            center_loops = [loop for node in group.nodes for loop in node.loops]
+            center_loops = group.loops
             center = self.get_symmetry_center(context, uv_layer, center_loops)
             if "NEGATIVE_X" in self.ref_direction:
                 self.symmetrize_axis(group, center, "X", "NEGATIVE")
@@ -84,47 +84,33 @@ class UV_OT_mio3_symmetry_snap(Mio3UVOperator):
 
         node_manager.update_uvmeshes()
 
-        self.end_time()
         return {"FINISHED"}
 
     def symmetrize_axis(self, group: UVNodeGroup, center, axis_uv, direction):
-        uv_layer = group.uv_layer
         axis_index = 0 if axis_uv == "X" else 1
         other_index = 1 - axis_index
         center_value = center[axis_index]
         threshold = self.threshold
         threshold_sq = threshold * threshold
 
-        features = {}
-        negative_nodes: list[UVNode] = []
-        positive_nodes: list[UVNode] = []
-
-        for node in group.nodes:
-            loop = min(node.loops, key=lambda item: (item.face.index, item.index))
-            face = loop.face
-            vert = loop.vert
+        # ノードは uvs のインデックスで扱う
+        original = group.uvs
+        uvs = original.copy()
+        features = []
+        for loop in group.first_loops():
             edge_lengths = sorted((loop.edge.calc_length(), loop.link_loop_prev.edge.calc_length()))
             max_edge_length = edge_lengths[-1]
             if max_edge_length <= 1e-8:
                 edge_signature = (0.0, 0.0)
             else:
                 edge_signature = tuple(length / max_edge_length for length in edge_lengths)
+            features.append((len(loop.face.verts), len(loop.vert.link_edges), edge_signature))
 
-            node_id = id(node)
-            features[node_id] = (len(face.verts), len(vert.link_edges), edge_signature)
-
-            uv = node.uv
-            axis_value = uv[axis_index]
-
-            if abs(axis_value - center_value) <= self.threshold_center:
-                new_uv = uv.copy()
-                new_uv[axis_index] = center_value
-                node.uv = new_uv
-                node.update_uv(uv_layer)
-            elif axis_value < center_value:
-                negative_nodes.append(node)
-            else:
-                positive_nodes.append(node)
+        axis_values = uvs[:, axis_index]
+        on_center = np.abs(axis_values - center_value) <= self.threshold_center
+        uvs[on_center, axis_index] = center_value
+        negative_nodes = np.flatnonzero(~on_center & (axis_values < center_value)).tolist()
+        positive_nodes = np.flatnonzero(~on_center & (axis_values >= center_value)).tolist()
 
         if direction == "POSITIVE":
             source_nodes, target_nodes = positive_nodes, negative_nodes
@@ -132,13 +118,16 @@ class UV_OT_mio3_symmetry_snap(Mio3UVOperator):
             source_nodes, target_nodes = negative_nodes, positive_nodes
 
         if not source_nodes or not target_nodes:
+            group.set_uvs(uvs)
+            group.update_uvs(np.any(uvs != original, axis=1))
             return
 
+        uv_list = uvs.tolist()
         grouped = {}
         fallback_items = []
         for node in source_nodes:
-            uv = node.uv.copy()
-            item = (node, uv, uv[axis_index], uv[other_index], features[id(node)])
+            uv = uv_list[node]
+            item = (node, uv, uv[axis_index], uv[other_index], features[node])
             grouped.setdefault(item[4][0], []).append(item)
             fallback_items.append(item)
 
@@ -147,10 +136,10 @@ class UV_OT_mio3_symmetry_snap(Mio3UVOperator):
 
         candidate_pairs = []
         for node in target_nodes:
-            uv = node.uv.copy()
+            uv = uv_list[node]
             mirrored_axis = 2 * center_value - uv[axis_index]
             target_other = uv[other_index]
-            target_feature = features[id(node)]
+            target_feature = features[node]
             coordinates, candidates = source_index.get(target_feature[0], fallback_index)
             left = bisect_left(coordinates, target_other - threshold)
             right = bisect_right(coordinates, target_other + threshold)
@@ -166,7 +155,7 @@ class UV_OT_mio3_symmetry_snap(Mio3UVOperator):
                 if dist_sq > threshold_sq:
                     continue
 
-                score = self.score_loop_pair(axis_delta, other_delta, target_feature, features[id(source_node)])
+                score = self.score_loop_pair(axis_delta, other_delta, target_feature, features[source_node])
                 if score <= 5.5:
                     candidate_pairs.append((score, dist_sq, node, source_node, source_uv))
 
@@ -175,19 +164,18 @@ class UV_OT_mio3_symmetry_snap(Mio3UVOperator):
         matched_targets = set()
         matched_sources = set()
         for _, _, target_node, source_node, source_uv in candidate_pairs:
-            target_node_id = id(target_node)
-            source_node_id = id(source_node)
-            if target_node_id in matched_targets or source_node_id in matched_sources:
+            if target_node in matched_targets or source_node in matched_sources:
                 continue
 
             if axis_uv == "X":
-                new_uv = Vector((2 * center.x - source_uv.x, source_uv.y))
+                uvs[target_node] = (2 * center.x - source_uv[0], source_uv[1])
             else:
-                new_uv = Vector((source_uv.x, 2 * center.y - source_uv.y))
-            target_node.uv = new_uv
-            target_node.update_uv(uv_layer)
-            matched_targets.add(target_node_id)
-            matched_sources.add(source_node_id)
+                uvs[target_node] = (source_uv[0], 2 * center.y - source_uv[1])
+            matched_targets.add(target_node)
+            matched_sources.add(source_node)
+
+        group.set_uvs(uvs)
+        group.update_uvs(np.any(uvs != original, axis=1))
 
     @staticmethod
     def sort_source_bucket(items):
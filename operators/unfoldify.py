@@ -1,8 +1,9 @@
 import bpy
 from mathutils import Vector
 from bpy.props import BoolProperty, FloatProperty
-from bmesh.types import BMesh
 from ..classes import Mio3UVOperator, UVIslandManager, UVIsland
+from ..classes.uv_island import UVObject
+from ..core.islands import face_components
 from ..utils.uv_manager_utils import find_rotation_geometry, rotate_island
 
 
@@ -53,7 +54,6 @@ class UV_OT_mio3_unfoldify(Mio3UVOperator):
     offset_group: FloatProperty(name="Group Spacing", default=0.02, min=0.001, max=0.1, step=0.1)
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
 
         use_uv_select_sync = context.tool_settings.use_uv_select_sync
@@ -85,7 +85,6 @@ class UV_OT_mio3_unfoldify(Mio3UVOperator):
 
         island_manager.update_uvmeshes(True)
 
-        self.end_time()
         return {"FINISHED"}
 
     def collect_groups(self, island_manager: UVIslandManager) -> list[list[UVIsland]]:
@@ -103,7 +102,7 @@ class UV_OT_mio3_unfoldify(Mio3UVOperator):
                 groups.append(object_islands)
                 continue
 
-            groups.extend(self.find_groups(obj_info.bm, object_islands))
+            groups.extend(self.find_groups(obj_info, object_islands))
 
         groups.sort(key=self.get_group_sort_key)
         return groups
@@ -113,27 +112,15 @@ class UV_OT_mio3_unfoldify(Mio3UVOperator):
         center = sum((island.center_3d_world for island in group), Vector()) / len(group)
         return tuple(center.xyz)
 
-    def find_groups(self, bm: BMesh, islands: list[UVIsland]) -> list[list[UVIsland]]:
-        island_order = {island: index for index, island in enumerate(islands)}
-        face_to_island = {face: island for island in islands for face in island.faces}
-        island_groups = []
-        unprocessed = set(bm.faces)
-        while unprocessed:
-            current_group = set()
-            faces_to_process = {unprocessed.pop()}
-            while faces_to_process:
-                face = faces_to_process.pop()
-                island = face_to_island.get(face)
-                if island is not None:
-                    current_group.add(island)
-                for edge in face.edges:
-                    for linked_face in edge.link_faces:
-                        if linked_face in unprocessed:
-                            unprocessed.remove(linked_face)
-                            faces_to_process.add(linked_face)
-            if current_group:
-                island_groups.append(sorted(current_group, key=island_order.get))
-        return island_groups
+    def find_groups(self, obj_info: UVObject, islands: list[UVIsland]) -> list[list[UVIsland]]:
+        "メッシュでつながっているアイランドをまとめる"
+        topology = obj_info.get_topology()
+        face_labels = face_components(topology.loop_face, topology.loop_edge, len(topology.face_size))
+        island_groups = {}
+        for island in islands:
+            face = next(iter(island.faces))
+            island_groups.setdefault(int(face_labels[face.index]), []).append(island)
+        return list(island_groups.values())
 
     def arrange_islands(self, islands: list[UVIsland]) -> dict:
         base_island, other_islands = self.categorize_islands(islands)
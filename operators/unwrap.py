@@ -45,7 +45,6 @@ class UV_OT_mio3_unwrap(Mio3UVOperator):
         return cls.is_valid_object(context.active_object)
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
 
         for obj in objects:
@@ -91,9 +90,9 @@ class UV_OT_mio3_unwrap(Mio3UVOperator):
                     elif axis == "Y":
                         curr_uv.x = orig_uv.x
 
+        island_manager.mark_dirty()
         island_manager.update_uvmeshes(True)
 
-        self.end_time()
         return {"FINISHED"}
 
     def should_restore(self, island: UVIsland) -> bool:
@@ -1,8 +1,10 @@
 import bpy
 import bmesh
+import numpy as np
 from bpy.props import BoolProperty
-from mathutils import kdtree
 from ..classes import Mio3UVOperator
+from ..classes.mesh_arrays import MeshArrays
+from ..core.symmetry import face_centers, grid_nearest, nearest_face_loops
 
 
 class UV_OT_mio3_unwrap_mirror(Mio3UVOperator):
@@ -17,7 +19,6 @@ class UV_OT_mio3_unwrap_mirror(Mio3UVOperator):
     )
 
     def execute(self, context):
-        self.start_time()
         obj = context.active_object
 
         show_only_shape_key = obj.show_only_shape_key
@@ -59,37 +60,37 @@ class UV_OT_mio3_unwrap_mirror(Mio3UVOperator):
         context.view_layer.objects.active = obj
         bpy.ops.object.mode_set(mode="EDIT")
 
-        # obj_copyのUVをobjに転送
-        bm_src = bmesh.from_edit_mesh(copy_obj.data)
-        bm_src.faces.ensure_lookup_table()
-        uv_layer_copy = bm_src.loops.layers.uv.verify()
-
-        kd = kdtree.KDTree(len(bm_src.faces))
-        for i, face in enumerate(bm_src.faces):
-            if face.select:
-                face_center = face.calc_center_median()
-                kd.insert(face_center, i)
-        kd.balance()
+        # obj_copyのUVをobjに転送（面の中心で対応付け、面の中で一番近い頂点のUVを使う）
+        copy_obj.update_from_editmode()
+        src = MeshArrays.from_mesh(copy_mesh, copy_mesh.uv_layers.active)
+        src_faces = np.flatnonzero(src.face_select)
+        src_centers = face_centers(src.vert_co, src.loop_vert, src.face_start, src.face_size)[src_faces]
 
         bm = bmesh.from_edit_mesh(obj.data)
         uv_layer = bm.loops.layers.uv.verify()
-
-        for face in bm.faces:
+        obj.update_from_editmode()
+        dst = MeshArrays.from_mesh(obj.data, obj.data.uv_layers.active)
+        dst_centers = face_centers(dst.vert_co, dst.loop_vert, dst.face_start, dst.face_size)
+
+        nearest = grid_nearest(src_centers, dst_centers, 1e-4)
+        face_map = np.where(nearest >= 0, src_faces[nearest], -1)
+        # 対応する面の中で一番近い頂点のループ（頂点が少しずれていても転送する）
+        loop_map = nearest_face_loops(
+            dst.vert_co[dst.loop_vert],
+            dst.loop_face,
+            face_map,
+            src.face_start,
+            src.face_size,
+            src.vert_co[src.loop_vert],
+        )
+        src_uvs = src.loop_uv.tolist()
+
+        for face, start in zip(bm.faces, dst.face_start.tolist()):
             if not face.select:
                 continue
-            _, idx, dist = kd.find(face.calc_center_median())
-            if dist > 1e-4:
-                continue
-            face_src = bm_src.faces[idx]
-            for loop in face.loops:
-                loop_uv = loop[uv_layer]
-                v_co = loop.vert.co
-                if loop.uv_select_vert:
-                    closest_vert = min(face_src.verts, key=lambda v: (v.co - v_co).length_squared)
-                    for loop_src in face_src.loops:
-                        if loop_src.vert == closest_vert:
-                            loop_uv.uv = loop_src[uv_layer_copy].uv
-                            break
+            for loop, loop_src in zip(face.loops, loop_map[start : start + len(face.loops)].tolist()):
+                if loop_src >= 0 and loop.uv_select_vert:
+                    loop[uv_layer].uv = src_uvs[loop_src]
 
         bmesh.update_edit_mesh(obj.data)
 
@@ -98,7 +99,6 @@ class UV_OT_mio3_unwrap_mirror(Mio3UVOperator):
         bpy.data.objects.remove(copy_obj, do_unlink=True)
         bpy.data.meshes.remove(copy_mesh, do_unlink=True)
 
-        self.end_time()
         return {"FINISHED"}
 
     @staticmethod
@@ -37,7 +37,6 @@ class UV_OT_mio3_unwrap_project(Mio3UVOperator):
         return obj is not None and obj.type == "MESH" and obj.mode == "EDIT"
 
     def execute(self, context):
-        self.start_time()
         objects = self.get_selected_objects(context)
         if not objects:
             return {"CANCELLED"}
@@ -95,17 +94,17 @@ class UV_OT_mio3_unwrap_project(Mio3UVOperator):
             bpy.ops.uv.pin(clear=True)
 
         for island in island_manager.islands:
-            bm = island.bm
             island.update_bounds()
-            island.restore_selection()
+            island.restore_selection(flush=False)
             self.restore_island(island)
-            if bm.uv_select_sync_valid:
-                island.bm.uv_select_sync_to_mesh()
+        for info in island_manager.collections:
+            if info.bm.uv_select_sync_valid:
+                info.bm.uv_select_flush_mode()
+                info.bm.uv_select_sync_to_mesh()
 
         island_manager.update_uvmeshes()
 
         context.view_layer.objects.active = objects[0]
-        self.end_time()
         return {"FINISHED"}
 
     def restore_island(self, island: UVIsland):
@@ -1,16 +1,86 @@
 import bpy
+import bmesh
 import os
+import math
 from bpy.props import EnumProperty
 from ..classes import Mio3UVGlobalOperator
-        
+from ..classes.mesh_arrays import MeshArrays
+from ..classes.topology_cache import MeshTopology
+from ..core.texel import face_heatmaps
+from .texel import get_texture_size
+
 
 CHECKER_MAP_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "images", "checker_maps")
 BLEND_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "blend")
 NAME_NODE_GROUP_OVERRIDE = "Mio3MaterialOverride"
 NAME_MOD_CHECKER_MAP = "Mio3CheckerMapModifier"
 ENABLED_OBJECT_TYPE = {"MESH", "CURVE", "FONT"}
+NAME_MAT_HEATMAP = "Mio3TexelHeatmapMat"
+NAME_NODE_HEATMAP_ATTRIBUTE = "Mio3HeatmapAttribute"
+NAME_NODE_HEATMAP_OFFSET = "Mio3HeatmapOffset"
+NAME_NODE_HEATMAP_RANGE = "Mio3HeatmapRange"
+HEATMAP_ATTRIBUTES = {
+    "DENSITY": "mio3uv_texel_density",
+    "AREA": "mio3uv_area_distortion",
+    "ANGLE": "mio3uv_angle_distortion",
+}
+
+
+class CheckerMapOverride:
+    "ジオメトリノードのモディファイアでマテリアルを上書きする"
+
+    @staticmethod
+    def get_node_groups():
+        return bpy.data.node_groups.get(NAME_NODE_GROUP_OVERRIDE)
+
+    @staticmethod
+    def get_modifier(obj):
+        return obj.modifiers.get(NAME_MOD_CHECKER_MAP)
+
+    def create_new_geometry_node(self, context):
+        blend_path = os.path.join(BLEND_DIR, "mio3uv.blend")
+        try:
+            bpy.ops.wm.append(
+                filename=NAME_NODE_GROUP_OVERRIDE,
+                directory=os.path.join(blend_path, "NodeTree"),
+                link=False,
+            )
+            node_group = bpy.data.node_groups.get(NAME_NODE_GROUP_OVERRIDE)
+            node_group.use_fake_user = True
+            return node_group
+        except:
+            self.report({"ERROR"}, "Failed import node group")
+        return None
+
+    def set_material_override(self, context, objects, mat):
+        geometry_node = self.get_node_groups() or self.create_new_geometry_node(context)
+
+        for obj in objects:
+            existing_modifier = self.get_modifier(obj)
+            if existing_modifier:
+                obj.modifiers.remove(existing_modifier)
 
-class UV_OT_mio3_checker_map(Mio3UVGlobalOperator):
+            modifier = obj.modifiers.new(name=NAME_MOD_CHECKER_MAP, type="NODES")
+            if hasattr(modifier, "show_expanded"):
+                modifier.show_expanded = False
+            modifier.node_group = geometry_node
+            # 互換用：Blender 5.2
+            if hasattr(getattr(getattr(modifier, "properties", None), "inputs", None), "Socket_2"):
+                modifier.properties.inputs.Socket_2.value = mat
+            else:
+                modifier["Socket_2"] = mat
+            obj.select_set(True)
+
+        for area in context.screen.areas:
+            if area.type == "VIEW_3D":
+                for space in area.spaces:
+                    if space.type == "VIEW_3D":
+                        space.shading.type = "MATERIAL"
+                        # space.shading.type = "SOLID"
+                        # space.shading.color_type = "TEXTURE"
+
+
+class UV_OT_mio3_checker_map(CheckerMapOverride, Mio3UVGlobalOperator):
     bl_idname = "mio3uv.checker_map"
     bl_label = "Checker Map"
     bl_description = "Set the checker map (using Geometry Nodes)"
@@ -51,65 +121,16 @@ class UV_OT_mio3_checker_map(Mio3UVGlobalOperator):
         else:
             mat = self.create_new_material(size)
 
-        existing_geometry_node = self.get_node_groups()
-        if existing_geometry_node:
-            geometry_node = existing_geometry_node
-        else:
-            geometry_node = self.create_new_geometry_node(context)
-
-        for obj in selected_objects:
-            existing_modifier = self.get_modifier(obj)
-            if existing_modifier:
-                obj.modifiers.remove(existing_modifier)
-
-            modifier = obj.modifiers.new(name=NAME_MOD_CHECKER_MAP, type="NODES")
-            if hasattr(modifier, "show_expanded"):
-                modifier.show_expanded = False
-            modifier.node_group = geometry_node
-            # 互換用：Blender 5.2
-            if hasattr(getattr(getattr(modifier, "properties", None), "inputs", None), "Socket_2"):
-                modifier.properties.inputs.Socket_2.value = mat
-            else:
-                modifier["Socket_2"] = mat
-            obj.select_set(True)
+        self.set_material_override(context, selected_objects, mat)
 
         if mode != "OBJECT":
             bpy.ops.object.mode_set(mode="EDIT")
 
-        for area in context.screen.areas:
-            if area.type == "VIEW_3D":
-                for space in area.spaces:
-                    if space.type == "VIEW_3D":
-                        space.shading.type = "MATERIAL"
-                        # space.shading.type = "SOLID"
-                        # space.shading.color_type = "TEXTURE"
-
         return {"FINISHED"}
 
     def get_material(self, size):
         return bpy.data.materials.get("Mio3CheckerMapMat_{}".format(size))
 
-    def get_node_groups(self):
-        return bpy.data.node_groups.get(NAME_NODE_GROUP_OVERRIDE)
-
-    def get_modifier(self, obj):
-        return obj.modifiers.get(NAME_MOD_CHECKER_MAP)
-
-    def create_new_geometry_node(self, context):
-        blend_path = os.path.join(BLEND_DIR, "mio3uv.blend")
-        try:
-            bpy.ops.wm.append(
-                filename=NAME_NODE_GROUP_OVERRIDE,
-                directory=os.path.join(blend_path, "NodeTree"),
-                link=False,
-            )
-            node_group = bpy.data.node_groups.get(NAME_NODE_GROUP_OVERRIDE)
-            node_group.use_fake_user = True
-            return node_group
-        except:
-            self.report({"ERROR"}, "Failed import node group")
-        return None
-
     def create_new_material(self, size):
         mat = bpy.data.materials.new(name="Mio3CheckerMapMat_{}".format(size))
         mat.use_nodes = True
@@ -151,6 +172,169 @@ class UV_OT_mio3_checker_map(Mio3UVGlobalOperator):
         return mat
 
 
+class UV_OT_mio3_texel_heatmap(CheckerMapOverride, Mio3UVGlobalOperator):
+    bl_idname = "mio3uv.texel_heatmap"
+    bl_label = "Texel Heatmap"
+    bl_description = "Display per-face texel density and distortion as a heatmap (using Geometry Nodes)"
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj is not None and obj.type == "MESH"
+
+    def execute(self, context):
+        selected_objects = self.get_selected_objects(context)
+        if not selected_objects:
+            return {"CANCELLED"}
+
+        props_s = context.scene.mio3uv
+        props_w = context.window_manager.mio3uv
+
+        # 面ごとの値を1回だけ書き込み、目標の密度や表示の切り替えはマテリアルのノードの値だけを変える
+        # 編集モードはトポロジーのキャッシュとUVだけを BMesh から読み、BMesh の面の属性に書き込む（モードを切り替えない）
+        for obj in selected_objects:
+            size_x, size_y = get_texture_size(props_s, obj, props_w.texel_use_checker)
+            if obj.mode == "EDIT":
+                self.write_heatmaps_bmesh(obj, size_x * size_y)
+            else:
+                self.write_heatmaps_mesh(obj, size_x * size_y)
+
+        mat = bpy.data.materials.get(NAME_MAT_HEATMAP) or self.create_heatmap_material()
+        self.set_material_override(context, selected_objects, mat)
+        update_heatmap_material(context)
+
+        return {"FINISHED"}
+
+    def write_heatmaps_bmesh(self, obj, pixels):
+        bm = bmesh.from_edit_mesh(obj.data)
+        uv_layer = bm.loops.layers.uv.active
+        if uv_layer is None:
+            return
+        topology = MeshTopology.get(obj, bm)
+        heatmaps = face_heatmaps(
+            topology.get_vert_co(bm),
+            obj.matrix_world,
+            topology.loop_vert,
+            MeshArrays.read_uvs(bm, uv_layer, len(topology.loop_face)),
+            topology.loop_next,
+            topology.face_start,
+            topology.face_size,
+            pixels,
+        )
+        float_layers = bm.faces.layers.float
+        for heatmap_type, name in HEATMAP_ATTRIBUTES.items():
+            layer = float_layers.get(name) or float_layers.new(name)
+            for face, value in zip(bm.faces, heatmaps[heatmap_type.lower()].tolist()):
+                face[layer] = value
+        MeshTopology.mark_uv_update(obj.data)
+        bmesh.update_edit_mesh(obj.data)
+
+    def write_heatmaps_mesh(self, obj, pixels):
+        mesh = obj.data
+        uv_layer = mesh.uv_layers.active
+        if uv_layer is None:
+            return
+        arrays = MeshArrays.from_mesh(mesh, uv_layer)
+        heatmaps = face_heatmaps(
+            arrays.vert_co,
+            obj.matrix_world,
+            arrays.loop_vert,
+            arrays.loop_uv,
+            arrays.loop_next,
+            arrays.face_start,
+            arrays.face_size,
+            pixels,
+        )
+        for heatmap_type, name in HEATMAP_ATTRIBUTES.items():
+            self.write_face_attribute(mesh, name, heatmaps[heatmap_type.lower()])
+
+    @staticmethod
+    def write_face_attribute(mesh, name, values):
+        attr = mesh.attributes.get(name)
+        if attr is not None and (attr.domain != "FACE" or attr.data_type != "FLOAT"):
+            mesh.attributes.remove(attr)
+            attr = None
+        if attr is None:
+            attr = mesh.attributes.new(name=name, type="FLOAT", domain="FACE")
+        attr.data.foreach_set("value", values)
+
+    @staticmethod
+    def create_heatmap_material():
+        "(値 - オフセット) / 範囲 を -1〜1 で青・緑・赤にする"
+        mat = bpy.data.materials.new(name=NAME_MAT_HEATMAP)
+        mat.use_nodes = True
+
+        nodes = mat.node_tree.nodes
+        links = mat.node_tree.links
+
+        nodes.clear()
+
+        node_attribute = nodes.new(type="ShaderNodeAttribute")
+        node_attribute.name = NAME_NODE_HEATMAP_ATTRIBUTE
+        node_attribute.attribute_type = "GEOMETRY"
+        node_offset = nodes.new(type="ShaderNodeValue")
+        node_offset.name = NAME_NODE_HEATMAP_OFFSET
+        node_range = nodes.new(type="ShaderNodeValue")
+        node_range.name = NAME_NODE_HEATMAP_RANGE
+        node_subtract = nodes.new(type="ShaderNodeMath")
+        node_subtract.operation = "SUBTRACT"
+        node_divide = nodes.new(type="ShaderNodeMath")
+        node_divide.operation = "DIVIDE"
+        node_map_range = nodes.new(type="ShaderNodeMapRange")
+        node_map_range.inputs["From Min"].default_value = -1.0
+        node_map_range.inputs["From Max"].default_value = 1.0
+        node_ramp = nodes.new(type="ShaderNodeValToRGB")
+        elements = node_ramp.color_ramp.elements
+        elements[0].color = (0.0, 0.1, 1.0, 1.0)
+        elements[1].color = (1.0, 0.05, 0.0, 1.0)
+        elements.new(0.5).color = (0.1, 0.9, 0.1, 1.0)
+        node_emission = nodes.new(type="ShaderNodeEmission")
+        node_output = nodes.new(type="ShaderNodeOutputMaterial")
+
+        node_attribute.location = (0, 0)
+        node_offset.location = (0, -180)
+        node_range.location = (0, -280)
+        node_subtract.location = (200, 0)
+        node_divide.location = (380, 0)
+        node_map_range.location = (560, 0)
+        node_ramp.location = (760, 0)
+        node_emission.location = (1040, 0)
+        node_output.location = (1220, 0)
+
+        links.new(node_attribute.outputs["Fac"], node_subtract.inputs[0])
+        links.new(node_offset.outputs[0], node_subtract.inputs[1])
+        links.new(node_subtract.outputs[0], node_divide.inputs[0])
+        links.new(node_range.outputs[0], node_divide.inputs[1])
+        links.new(node_divide.outputs[0], node_map_range.inputs["Value"])
+        links.new(node_map_range.outputs["Result"], node_ramp.inputs["Fac"])
+        links.new(node_ramp.outputs["Color"], node_emission.inputs["Color"])
+        links.new(node_emission.outputs["Emission"], node_output.inputs["Surface"])
+
+        return mat
+
+
+def update_heatmap_material(context):
+    "ヒートマップのマテリアルに表示する属性・目標の密度・範囲を反映する（面ごとの値は計算し直さない）"
+    mat = bpy.data.materials.get(NAME_MAT_HEATMAP)
+    if mat is None or mat.node_tree is None:
+        return
+    props_s = context.scene.mio3uv
+    props_w = context.window_manager.mio3uv
+    nodes = mat.node_tree.nodes
+    node_attribute = nodes.get(NAME_NODE_HEATMAP_ATTRIBUTE)
+    node_offset = nodes.get(NAME_NODE_HEATMAP_OFFSET)
+    node_range = nodes.get(NAME_NODE_HEATMAP_RANGE)
+    if node_attribute is None or node_offset is None or node_range is None:
+        return
+
+    heatmap_type = props_w.texel_heatmap_type
+    node_attribute.attribute_name = HEATMAP_ATTRIBUTES[heatmap_type]
+    # 密度は log2 で書き込んでいるので、目標の密度との比が ±範囲 で青〜赤になる
+    node_offset.outputs[0].default_value = math.log2(props_s.texel_density) if heatmap_type == "DENSITY" else 0.0
+    node_range.outputs[0].default_value = props_w.texel_heatmap_range
+
+
 class UV_OT_mio3_checker_map_clear(Mio3UVGlobalOperator):
     bl_idname = "mio3uv.checker_map_clear"
     bl_label = "Clear Checker Map"
@@ -199,12 +383,20 @@ class UV_OT_mio3_checker_map_cleanup(Mio3UVGlobalOperator):
                     obj.modifiers.remove(mod)
                     removed_modifiers += 1
 
+        for mesh in bpy.data.meshes:
+            if mesh.is_editmode:
+                continue
+            for name in HEATMAP_ATTRIBUTES.values():
+                attr = mesh.attributes.get(name)
+                if attr is not None:
+                    mesh.attributes.remove(attr)
+
         if NAME_NODE_GROUP_OVERRIDE in bpy.data.node_groups:
             bpy.data.node_groups.remove(bpy.data.node_groups[NAME_NODE_GROUP_OVERRIDE])
             removed_nodegroups += 1
 
         for mat in bpy.data.materials[:]:
-            if mat.name.startswith("Mio3CheckerMapMat_"):
+            if mat.name.startswith("Mio3CheckerMapMat_") or mat.name == NAME_MAT_HEATMAP:
                 bpy.data.materials.remove(mat)
                 removed_materials += 1
 
@@ -232,6 +424,7 @@ class UV_OT_mio3_checker_map_cleanup(Mio3UVGlobalOperator):
 
 classes = [
     UV_OT_mio3_checker_map,
+    UV_OT_mio3_texel_heatmap,
     UV_OT_mio3_checker_map_clear,
     UV_OT_mio3_checker_map_cleanup,
 ]
@@ -1,15 +1,40 @@
 import bpy
-import bmesh
 import gpu
-from collections import defaultdict
-from mathutils import Vector
+import numpy as np
+from dataclasses import dataclass, field
+from mathutils import Matrix
 from bpy.types import SpaceImageEditor
 from gpu_extras.batch import batch_for_shader
 from ..classes import Mio3UVOperator
-from ..globals import PADDING_AUTO, get_preferences
+from ..classes.mesh_arrays import MeshArrays
+from ..classes.topology_cache import updated_meshes
+from ..core.padding import (
+    boundary_segments,
+    chain_polylines,
+    nesting_signs,
+    offset_normals,
+    offset_segments,
+    orient_ccw,
+    uv_keys,
+)
+from ..globals import get_padding, get_preferences
 
 msgbus_owner = object()
 
+VIEW_MATRIX_SPAN = 100
+
+
+@dataclass
+class PaddingCache:
+    "オブジェクトごとのパディングガイドのキャッシュ"
+
+    signature: int
+    islands: dict  # アイランドの境界のハッシュ → [(points, normals, closed), ...]
+    polylines: list
+    signs: np.ndarray
+    padding: float = None
+    vertices: np.ndarray = field(default=None, repr=False)
+
 
 def reload_view(context):
     for window in context.window_manager.windows:
@@ -29,7 +54,10 @@ class UV_OT_mio3_guide_padding(Mio3UVOperator):
     _padding = 16 / 1024
 
     _shader = None
-    _vertices = []
+    _batch = None  # UV空間の頂点を保持するバッチ（update_mesh で頂点が変わったときだけ作り直す）
+    _vertices = np.zeros((0, 2), dtype=np.float32)
+    _object_cache = {}  # メッシュの session_uid → PaddingCache
+    _updated = set()  # 前回の update_mesh の後でジオメトリ（UVを含む）が更新されたメッシュの session_uid
     _excluded_ops = {
         "UV_OT_select_linked",
         "UV_OT_select_more",
@@ -51,6 +79,10 @@ class UV_OT_mio3_guide_padding(Mio3UVOperator):
         if cls.is_running():
             SpaceImageEditor.draw_handler_remove(cls._handle, "WINDOW")
             cls._handle = None
+        cls._object_cache = {}
+        cls._updated = set()
+        cls._vertices = np.zeros((0, 2), dtype=np.float32)
+        cls._batch = None
         bpy.msgbus.clear_by_owner(msgbus_owner)
         reload_view(bpy.context)
 
@@ -108,174 +140,113 @@ class UV_OT_mio3_guide_padding(Mio3UVOperator):
 
     @classmethod
     def update_mesh(cls, context):
-        cls._vertices = []
         selected_objects = [obj for obj in context.selected_objects if obj.type == "MESH" and obj.mode == "EDIT"]
         padding = cls._padding
 
+        vertices = []
+        object_cache = {}
         for obj in selected_objects:
-            obj.data.update()
-            bm = bmesh.from_edit_mesh(obj.data)
-            uv_layer = bm.loops.layers.uv.verify()
-
-            edge_segs = defaultdict(list)
-            uv_by_key = {}
-            for face in bm.faces:
-                for loop in face.loops:
-                    uv1 = loop[uv_layer].uv.copy()
-                    uv2 = loop.link_loop_next[uv_layer].uv.copy()
-                    k1, k2 = uv1.to_tuple(5), uv2.to_tuple(5)
-                    edge_segs[loop.edge].append((k1, k2))
-                    uv_by_key.setdefault(k1, uv1)
-                    uv_by_key.setdefault(k2, uv2)
-
-            boundary_edges = set()
-            for edge, segs in edge_segs.items():
-                if edge.is_boundary or edge.seam or len(segs) != 2:
-                    for k1, k2 in segs:
-                        if k1 != k2:
-                            boundary_edges.add(frozenset((k1, k2)))
-                else:
-                    (a1, a2), (b1, b2) = segs
-                    if {a1, a2} != {b1, b2}:
-                        for k1, k2 in segs:
-                            if k1 != k2:
-                                boundary_edges.add(frozenset((k1, k2)))
-
-            neighbors = defaultdict(set)
-            for e in boundary_edges:
-                k1, k2 = tuple(e)
-                neighbors[k1].add(k2)
-                neighbors[k2].add(k1)
-
-            unused = set(boundary_edges)
-
-            def pop_next(curr, prev=None):
-                for nxt in neighbors[curr]:
-                    if nxt != prev and frozenset((curr, nxt)) in unused:
-                        return nxt
-                for nxt in neighbors[curr]:
-                    if frozenset((curr, nxt)) in unused:
-                        return nxt
-                return None
-
-            polylines = []
-            for start in [k for k, ns in neighbors.items() if len(ns) == 1]:
-                if not any(frozenset((start, n)) in unused for n in neighbors[start]):
+            key = obj.data.session_uid
+            cache = cls._object_cache.get(key)
+            # 更新されていないメッシュは編集モードの同期も配列の読み込みもしない
+            if cache is None or key in cls._updated:
+                obj.update_from_editmode()
+                uv_layer = obj.data.uv_layers.active
+                if uv_layer is None:
                     continue
-                chain, prev, curr = [start], None, start
-                while True:
-                    nxt = pop_next(curr, prev)
-                    if nxt is None:
-                        break
-                    unused.discard(frozenset((curr, nxt)))
-                    chain.append(nxt)
-                    prev, curr = curr, nxt
-                if len(chain) >= 2:
-                    polylines.append((chain, False))
-
-            while unused:
-                e = unused.pop()
-                a, b = tuple(e)
-                chain, prev, curr = [a, b], a, b
-                while True:
-                    nxt = pop_next(curr, prev)
-                    if nxt is None or frozenset((curr, nxt)) not in unused:
-                        break
-                    unused.discard(frozenset((curr, nxt)))
-                    if nxt == chain[0]:
-                        break
-                    chain.append(nxt)
-                    prev, curr = curr, nxt
-                closed = len(chain) >= 3 and frozenset((chain[-1], chain[0])) in boundary_edges
-                if len(chain) >= 2:
-                    polylines.append((chain, closed))
-
-            # CCW正規化 + ポイントリスト作成
-            resolved = []
-            for keys, closed in polylines:
-                points = [uv_by_key[k] for k in keys]
-                n = len(points)
-                if n < 2:
-                    continue
-                if closed and n >= 3:
-                    area2 = sum(
-                        points[i].x * points[(i + 1) % n].y - points[(i + 1) % n].x * points[i].y for i in range(n)
+                arrays = MeshArrays.from_mesh(obj.data, uv_layer)
+                signature = hash(
+                    (
+                        arrays.loop_uv.tobytes(),
+                        arrays.loop_edge.tobytes(),
+                        arrays.face_size.tobytes(),
+                        arrays.edge_seam.tobytes(),
                     )
-                    if area2 < 0:
-                        points.reverse()
-                resolved.append((points, closed))
-
-            # 閉ループの判定
-            closed_loops = [(pts, i) for i, (pts, c) in enumerate(resolved) if c and len(pts) >= 3]
-            nest_sign = {}
-            for idx, (pts, ri) in enumerate(closed_loops):
-                px, py = pts[0].x, pts[0].y
-                depth = 0
-                for jdx, (other, _) in enumerate(closed_loops):
-                    if idx == jdx:
-                        continue
-                    inside = False
-                    m = len(other)
-                    j = m - 1
-                    for i in range(m):
-                        iy, jy = other[i].y, other[j].y
-                        if (iy > py) != (jy > py):
-                            if px < (other[j].x - other[i].x) * (py - iy) / (jy - iy) + other[i].x:
-                                inside = not inside
-                        j = i
-                    if inside:
-                        depth += 1
-                nest_sign[ri] = -1.0 if depth % 2 == 1 else 1.0
-
-            for ri, (points, closed) in enumerate(resolved):
-                n = len(points)
-                sign = nest_sign.get(ri, 1.0)
-
-                seg_right = []
-                for i in range(n if closed else n - 1):
-                    d = points[(i + 1) % n] - points[i]
-                    if d.length > 0:
-                        d = d.normalized()
-                        seg_right.append(Vector((d.y, -d.x)))
-                    else:
-                        seg_right.append(Vector((0, 0)))
-
-                offset_pts = []
-                for i in range(n):
-                    if closed:
-                        nrm = seg_right[(i - 1) % n] + seg_right[i]
-                    elif i == 0:
-                        nrm = seg_right[0]
-                    elif i == n - 1:
-                        nrm = seg_right[-1]
-                    else:
-                        nrm = seg_right[i - 1] + seg_right[i]
-                    offset_pts.append(points[i] + (nrm.normalized() if nrm.length > 0 else nrm) * padding * sign)
-
-                for i in range(n - 1):
-                    cls._vertices.extend([offset_pts[i], offset_pts[i + 1]])
-                if closed and n >= 3:
-                    cls._vertices.extend([offset_pts[-1], offset_pts[0]])
-
-            bm.free()
+                )
+                if cache is None or cache.signature != signature:
+                    cache = cls.build_object_cache(arrays, signature, cache)
+            if cache.padding != padding:
+                cache.vertices = offset_segments(cache.polylines, cache.signs, padding)
+                cache.padding = padding
+
+            object_cache[key] = cache
+            vertices.append(cache.vertices)
+
+        cls._object_cache = object_cache
+        cls._updated = set()
+        vertices = np.concatenate(vertices) if vertices else np.zeros((0, 2), dtype=np.float32)
+        if not np.array_equal(vertices, cls._vertices):
+            cls._vertices = vertices
+            cls._batch = None
+
+    @staticmethod
+    def build_object_cache(arrays: MeshArrays, signature, prev_cache=None):
+        "UVが変わったアイランドだけ境界のポリラインを作り直す"
+        loop_key, key_uv = uv_keys(arrays.loop_uv)
+        seg_a, seg_b, seg_island = boundary_segments(
+            arrays.loop_face, arrays.loop_edge, arrays.loop_next, loop_key, arrays.edge_seam, len(arrays.face_size)
+        )
+
+        prev_islands = prev_cache.islands if prev_cache else {}
+        islands = {}
+        polylines = []
+        order = np.argsort(seg_island, kind="stable")
+        bounds = np.flatnonzero(np.r_[True, seg_island[order][1:] != seg_island[order][:-1], True])
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            segments = order[start:end]
+            island_a, island_b = seg_a[segments], seg_b[segments]
+            island_signature = hash((key_uv[island_a].tobytes(), key_uv[island_b].tobytes()))
+            island_polylines = prev_islands.get(island_signature)
+            if island_polylines is None:
+                island_polylines = []
+                for keys, closed in chain_polylines(island_a, island_b):
+                    points = orient_ccw(key_uv[keys], closed)
+                    island_polylines.append((points, offset_normals(points, closed), closed))
+            islands[island_signature] = island_polylines
+            polylines.extend(island_polylines)
+
+        # 入れ子の判定はアイランド間にまたがるので毎回行う
+        closed_index = [i for i, (points, _, closed) in enumerate(polylines) if closed and len(points) >= 3]
+        signs = np.ones(len(polylines), dtype=np.float64)
+        signs[closed_index] = nesting_signs([polylines[i][0] for i in closed_index])
+
+        return PaddingCache(signature, islands, polylines, signs)
 
     @classmethod
     def update_state(cls, context):
-        obj = context.active_object
-        if obj.mio3uv.padding_px == "AUTO":
-            calc_padding_px = PADDING_AUTO.get(obj.mio3uv.image_size, 16)
-        else:
-            calc_padding_px = int(obj.mio3uv.padding_px)
-        cls._padding = int(calc_padding_px) / int(obj.mio3uv.image_size)
+        cls._padding = get_padding(context.active_object)
+
+    @staticmethod
+    def view_matrix(view2d):
+        "UV座標からリージョン座標への変換行列"
+        origin_x, origin_y = view2d.view_to_region(0, 0, clip=False)
+        # 整数に丸められるので離れた点から拡大率を求める
+        end_x, end_y = view2d.view_to_region(VIEW_MATRIX_SPAN, VIEW_MATRIX_SPAN, clip=False)
+        scale_x = (end_x - origin_x) / VIEW_MATRIX_SPAN
+        scale_y = (end_y - origin_y) / VIEW_MATRIX_SPAN
+        return Matrix(
+            (
+                (scale_x, 0, 0, origin_x),
+                (0, scale_y, 0, origin_y),
+                (0, 0, 1, 0),
+                (0, 0, 0, 1),
+            )
+        )
 
     @staticmethod
     def draw_2d(self, context, prefs):
-        viewport_vertices = [context.region.view2d.view_to_region(v[0], v[1], clip=False) for v in self._vertices]
+        cls = self.__class__
+        if not len(cls._vertices):
+            return
         shader = self._shader
-        batch = batch_for_shader(shader, "LINES", {"pos": viewport_vertices})
-        shader.bind()
-        shader.uniform_float("color", prefs.ui_padding_col)
-        batch.draw(shader)
+        if cls._batch is None:
+            cls._batch = batch_for_shader(shader, "LINES", {"pos": cls._vertices})
+
+        with gpu.matrix.push_pop():
+            gpu.matrix.multiply_matrix(cls.view_matrix(context.region.view2d))
+            shader.bind()
+            shader.uniform_float("color", prefs.ui_padding_col)
+            cls._batch.draw(shader)
 
     @classmethod
     def unregister(cls):
@@ -287,11 +258,20 @@ def load_handler(dummy):
     UV_OT_mio3_guide_padding.remove_handler()
 
 
+@bpy.app.handlers.persistent
+def depsgraph_handler(scene, depsgraph):
+    "表示中は、次の update_mesh で読み直すメッシュを記録する"
+    if UV_OT_mio3_guide_padding.is_running():
+        UV_OT_mio3_guide_padding._updated.update(mesh.session_uid for mesh in updated_meshes(depsgraph))
+
+
 def register():
     bpy.utils.register_class(UV_OT_mio3_guide_padding)
     bpy.app.handlers.load_post.append(load_handler)
+    bpy.app.handlers.depsgraph_update_post.append(depsgraph_handler)
 
 
 def unregister():
+    bpy.app.handlers.depsgraph_update_post.remove(depsgraph_handler)
     bpy.app.handlers.load_post.remove(load_handler)
     bpy.utils.unregister_class(UV_OT_mio3_guide_padding)
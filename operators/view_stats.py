@@ -0,0 +1,192 @@
+import bpy
+import bmesh
+import threading
+import numpy as np
+from bpy.types import Mesh, Object
+from ..classes.mesh_arrays import MeshArrays, FACE_DTYPE
+from ..classes.topology_cache import MeshTopology
+from ..core.stats import StatsSnapshot, uv_statistics
+from .texel import get_texture_size, store_coverage
+from .view_padding import reload_view
+
+STATS_DELAY = 0.3  # 最後の更新からスナップショットを取るまでの秒数（続けて更新された時はまとめる）
+STATS_POLL = 0.1  # 計算の結果を確認する間隔
+
+
+class UVStatsService:
+    """UVの統計（アイランド数・テクセル密度・カバレッジ）をバックグラウンドで計算する
+
+    depsgraph の更新でメインスレッドで配列をコピーし、別スレッドで計算して（NumPy は GIL を解放する）
+    タイマーで WM_PG_mio3uv に書き込む。計算中にメッシュが更新されたら古い結果は捨てる
+    """
+
+    _generation = 0  # 最新のスナップショットの番号（古い番号のジョブは途中でやめる）
+    _result = None  # (generation, UVStatistics)
+    _threads = []
+    _lock = threading.Lock()
+
+    @classmethod
+    def is_busy(cls):
+        cls._threads = [thread for thread in cls._threads if thread.is_alive()]
+        return bool(cls._threads)
+
+    @classmethod
+    def schedule(cls, delay=STATS_DELAY):
+        "delay 秒後にスナップショットを取る（計算中のジョブは古くなる）"
+        cls._generation += 1
+        if bpy.app.timers.is_registered(cls.snapshot_timer):
+            bpy.app.timers.unregister(cls.snapshot_timer)
+        bpy.app.timers.register(cls.snapshot_timer, first_interval=delay)
+
+    @classmethod
+    def stop(cls):
+        cls._generation += 1
+        cls._result = None
+        for timer in (cls.snapshot_timer, cls.publish_timer):
+            if bpy.app.timers.is_registered(timer):
+                bpy.app.timers.unregister(timer)
+
+    @classmethod
+    def snapshot_timer(cls):
+        context = bpy.context
+        if not context.window_manager.mio3uv.stats_live:
+            return None
+
+        props_s = context.scene.mio3uv
+        props_w = context.window_manager.mio3uv
+        snapshots = cls.take_snapshots(context)
+        cls._generation += 1
+        thread = threading.Thread(
+            target=cls.run,
+            args=(cls._generation, snapshots, int(props_w.texel_coverage_resolution), props_s.udim),
+            daemon=True,
+        )
+        cls._threads.append(thread)
+        thread.start()
+
+        if not bpy.app.timers.is_registered(cls.publish_timer):
+            bpy.app.timers.register(cls.publish_timer, first_interval=STATS_POLL)
+        return None
+
+    @classmethod
+    def run(cls, generation, snapshots, resolution, use_udim):
+        "ワーカースレッド（bpy に触れない）"
+        stats = uv_statistics(snapshots, resolution, use_udim, cancelled=lambda: generation != cls._generation)
+        if stats is None:
+            return
+        with cls._lock:
+            if generation == cls._generation:
+                cls._result = (generation, stats)
+
+    @classmethod
+    def publish_timer(cls):
+        with cls._lock:
+            result, cls._result = cls._result, None
+        if result is None or result[0] != cls._generation:
+            return STATS_POLL if cls.is_busy() else None
+
+        context = bpy.context
+        stats = result[1]
+        props_w = context.window_manager.mio3uv
+        props_w.stats_island_count = stats.island_count
+        props_w.stats_face_count = stats.face_count
+        props_w.stats_texel_density = stats.texel_density
+        store_coverage(props_w, stats.coverage)
+        reload_view(context)
+        return None
+
+    @staticmethod
+    def take_snapshots(context):
+        """選択しているメッシュの配列をコピーする（BMesh もメッシュも変更しない）
+
+        編集モードはトポロジーと頂点の位置をキャッシュ（MeshTopology）から使い、UVと面のフラグだけを BMesh から読む
+        キャッシュの配列は書き換えないのでスレッドにそのまま渡す
+        """
+        props_s = context.scene.mio3uv
+        props_w = context.window_manager.mio3uv
+        # タイマーから呼ぶので、ウィンドウに依存しないシーンとビューレイヤーから取得する
+        use_uv_select_sync = context.scene.tool_settings.use_uv_select_sync
+        selected_only = props_w.texel_density_coverage_type == "SELECT"
+
+        snapshots = []
+        for obj in context.view_layer.objects.selected:
+            if obj.type != "MESH":
+                continue
+            if obj.mode == "EDIT":
+                bm = bmesh.from_edit_mesh(obj.data)
+                uv_layer = bm.loops.layers.uv.active
+                if uv_layer is None:
+                    continue
+                topology = MeshTopology.get(obj, bm)
+                vert_co = topology.get_vert_co(bm)
+                loop_uv = MeshArrays.read_uvs(bm, uv_layer, len(topology.loop_face))
+                face_data = np.fromiter(
+                    ((face.hide, face.select, face.uv_select) for face in bm.faces),
+                    dtype=FACE_DTYPE,
+                    count=len(bm.faces),
+                )
+                visible = ~face_data["hide"]
+                if use_uv_select_sync:
+                    # UVの選択が同期されていなければメッシュの選択と同じ（uv_select_sync_from_mesh の結果）
+                    face_uv_select = face_data["uv_select"] if bm.uv_select_sync_valid else face_data["select"]
+                else:
+                    visible &= face_data["select"]
+                    face_uv_select = face_data["uv_select"]
+                arrays = topology
+            else:
+                uv_layer = obj.data.uv_layers.active
+                if uv_layer is None:
+                    continue
+                arrays = MeshArrays.from_mesh(obj.data, uv_layer)
+                vert_co = arrays.vert_co
+                loop_uv = arrays.loop_uv
+                visible = np.ones(len(arrays.face_start), dtype=bool)
+                face_uv_select = arrays.face_uv_select
+
+            size_x, size_y = get_texture_size(props_s, obj, props_w.texel_use_checker)
+            snapshots.append(
+                StatsSnapshot(
+                    face_start=arrays.face_start,
+                    face_size=arrays.face_size,
+                    loop_face=arrays.loop_face,
+                    loop_vert=arrays.loop_vert,
+                    loop_edge=arrays.loop_edge,
+                    loop_next=arrays.loop_next,
+                    loop_uv=loop_uv,
+                    edge_seam=arrays.edge_seam,
+                    vert_co=vert_co,
+                    matrix=np.array(obj.matrix_world, dtype=np.float64),
+                    face_visible=visible,
+                    face_coverage=visible & face_uv_select if selected_only else visible,
+                    pixels=float(size_x * size_y),
+                )
+            )
+        return snapshots
+
+
+@bpy.app.handlers.persistent
+def depsgraph_handler(scene, depsgraph):
+    if not bpy.context.window_manager.mio3uv.stats_live:
+        return
+    for update in depsgraph.updates:
+        if not update.is_updated_geometry:
+            continue
+        if isinstance(update.id, Mesh) or (isinstance(update.id, Object) and update.id.type == "MESH"):
+            UVStatsService.schedule()
+            return
+
+
+@bpy.app.handlers.persistent
+def load_handler(dummy):
+    UVStatsService.stop()
+
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(depsgraph_handler)
+    bpy.app.handlers.load_post.append(load_handler)
+
+
+def unregister():
+    UVStatsService.stop()
+    bpy.app.handlers.load_post.remove(load_handler)
+    bpy.app.handlers.depsgraph_update_post.remove(depsgraph_handler)
@@ -1,6 +1,6 @@
 import bpy
 from bpy.types import AddonPreferences
-from bpy.props import BoolProperty, FloatVectorProperty, EnumProperty
+from bpy.props import BoolProperty, FloatVectorProperty, EnumProperty, IntProperty
 
 
 class UV_mio3_preferences(AddonPreferences):
@@ -38,6 +38,42 @@ class UV_mio3_preferences(AddonPreferences):
         options=set(),
     )
 
+    profile_enabled: BoolProperty(
+        name="Record Profiles",
+        description="Record the execution time of each phase of Mio3 UV operators",
+        default=False,
+        options=set(),
+    )
+    profile_cprofile: BoolProperty(
+        name="Use cProfile",
+        description="Capture a cProfile report for each operator (slow)",
+        default=False,
+        options=set(),
+    )
+    profile_buffer_size: IntProperty(
+        name="Max Records",
+        description="Maximum number of profile records to keep",
+        default=100,
+        min=1,
+        max=10000,
+        options=set(),
+    )
+
+    parallel_enabled: BoolProperty(
+        name="Parallel Processing",
+        description="Run independent per-object calculations in worker processes (Relax, object mode Texel Density)",
+        default=False,
+        options=set(),
+    )
+    parallel_workers: IntProperty(
+        name="Worker Processes",
+        description="Number of worker processes (0 = number of CPU cores)",
+        default=0,
+        min=0,
+        max=64,
+        options=set(),
+    )
+
     def draw(self, context):
         layout = self.layout
         layout.use_property_split = True
@@ -50,6 +86,23 @@ class UV_mio3_preferences(AddonPreferences):
         col.prop(self, "auto_uv_sync")
         col.prop(self, "ui_help")
 
+        col = layout.column(heading="Performance")
+        col.prop(self, "parallel_enabled")
+        sub = col.column()
+        sub.active = self.parallel_enabled
+        sub.prop(self, "parallel_workers")
+
+        col = layout.column(heading="Profiling")
+        col.prop(self, "profile_enabled")
+        sub = col.column()
+        sub.active = self.profile_enabled
+        sub.prop(self, "profile_cprofile")
+        sub.prop(self, "profile_buffer_size")
+        records = context.window_manager.mio3uv.profile_records
+        row = sub.row(align=True)
+        row.operator("mio3uv.profile_export", text="Export ({})".format(len(records)), icon="EXPORT")
+        row.operator("mio3uv.profile_clear", text="", icon="TRASH")
+
 
 def register():
     bpy.utils.register_class(UV_mio3_preferences)
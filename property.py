@@ -1,9 +1,19 @@
 import bpy
 from bpy.app.handlers import persistent
 from bpy.types import PropertyGroup
-from bpy.props import BoolProperty, FloatProperty, EnumProperty, PointerProperty
+from bpy.props import (
+    BoolProperty,
+    FloatProperty,
+    EnumProperty,
+    IntProperty,
+    StringProperty,
+    PointerProperty,
+    CollectionProperty,
+)
 from .icons import icons
 from .operators import view_padding
+from .operators import view_checker_map
+from .operators import view_stats
 from .globals import get_preferences
 
 
@@ -89,7 +99,13 @@ class SCENE_PG_mio3uv(PropertyGroup):
         name="Size Y", items=ITEMS_TEXTURE_SIZE, default="2048", update=callback_update_texture_size_y
     )
     texture_size_link: BoolProperty(name="Size Link", default=True)
-    texel_density: FloatProperty(name="Texel Density", default=256, min=0.01, step=10, precision=1)
+
+    def callback_update_texel_density(self, context):
+        view_checker_map.update_heatmap_material(context)
+
+    texel_density: FloatProperty(
+        name="Texel Density", default=256, min=0.01, step=10, precision=1, update=callback_update_texel_density
+    )
 
 
 class OBJECT_PG_mio3uv(PropertyGroup):
@@ -174,6 +190,16 @@ class IMAGE_PG_mio3uv(PropertyGroup):
                 scene.view_settings.exposure = 0
 
 
+class WM_PG_mio3uv_coverage_tile(PropertyGroup):
+    number: IntProperty(name="Tile")
+    percent: FloatProperty(name="Coverage", default=0, precision=4, subtype="PERCENTAGE")
+
+
+class WM_PG_mio3uv_profile_record(PropertyGroup):
+    total: FloatProperty(name="Time")
+    data: StringProperty(name="Data")  # JSON
+
+
 class WM_PG_mio3uv(PropertyGroup):
     texel_preset_buttons: BoolProperty(
         name="Show Preset Buttons", default=False, description="Show quick set buttons for common texel densities"
@@ -187,6 +213,59 @@ class WM_PG_mio3uv(PropertyGroup):
         ],
     )
     texel_density_percent: FloatProperty(name="Coverage", default=0, precision=4, subtype="PERCENTAGE")
+    texel_coverage_tiles: CollectionProperty(type=WM_PG_mio3uv_coverage_tile)
+    profile_records: CollectionProperty(type=WM_PG_mio3uv_profile_record)
+    texel_coverage_resolution: EnumProperty(
+        name="Resolution",
+        description="Resolution of the mask used to calculate UV coverage",
+        items=[
+            ("256", "256", ""),
+            ("512", "512", ""),
+            ("1024", "1024", ""),
+            ("2048", "2048", ""),
+        ],
+        default="256",
+    )
+
+    def callback_update_texel_heatmap(self, context):
+        view_checker_map.update_heatmap_material(context)
+
+    texel_heatmap_type: EnumProperty(
+        name="Heatmap",
+        description="Per-face value displayed by the texel heatmap",
+        items=[
+            ("DENSITY", "Density", "Texel density relative to the target texel density"),
+            ("AREA", "Area", "Area distortion between the mesh and the UVs"),
+            ("ANGLE", "Angle", "Angle distortion between the mesh and the UVs"),
+        ],
+        default="DENSITY",
+        update=callback_update_texel_heatmap,
+    )
+    texel_heatmap_range: FloatProperty(
+        name="Range",
+        description="Value shown in full color (log2 ratio for density and area, radians for angle)",
+        default=1.0,
+        min=0.05,
+        max=8.0,
+        step=10,
+        update=callback_update_texel_heatmap,
+    )
+
+    def callback_update_stats_live(self, context):
+        if self.stats_live:
+            view_stats.UVStatsService.schedule(0)
+        else:
+            view_stats.UVStatsService.stop()
+
+    stats_live: BoolProperty(
+        name="Live Statistics",
+        description="Update island count, texel density and coverage in the background when the mesh changes",
+        default=False,
+        update=callback_update_stats_live,
+    )
+    stats_island_count: IntProperty(name="Islands", default=0)
+    stats_face_count: IntProperty(name="Faces", default=0)
+    stats_texel_density: FloatProperty(name="Texel Density", default=0, precision=1)
     texel_use_checker: BoolProperty(
         name="Use Checker Size",
         description="Use Mio3UV checker size if available. \nDisable if the actual texture size differs from the checker size",
@@ -224,6 +303,8 @@ classes = [
     SCENE_PG_mio3uv,
     OBJECT_PG_mio3uv,
     IMAGE_PG_mio3uv,
+    WM_PG_mio3uv_coverage_tile,
+    WM_PG_mio3uv_profile_record,
     WM_PG_mio3uv,
 ]
 
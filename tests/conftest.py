@@ -0,0 +1,30 @@
+# Blender なしで core のテストを実行する（アドオンのフォルダで python -m pytest）
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.meshes import SyntheticMesh  # noqa: E402
+
+
+@pytest.fixture
+def two_quads():
+    """エッジ 1-4 を共有する2つの四角形
+
+    split: 右の面のUVをずらして、共有エッジのUVを切る
+    seam: 共有エッジをシームにする
+    """
+
+    def build(split=False, seam=False):
+        vert_co = np.array([(0, 0, 0), (1, 0, 0), (2, 0, 0), (0, 1, 0), (1, 1, 0), (2, 1, 0)], dtype=np.float64)
+        loop_vert = np.array([0, 1, 4, 3, 1, 2, 5, 4], dtype=np.int64)
+        loop_uv = vert_co[loop_vert, :2] * 0.25
+        if split:
+            loop_uv[4:] += (0.5, 0.0)
+        return SyntheticMesh.from_polygons(
+            "two_quads", vert_co, loop_vert, [4, 4], loop_uv, [(1, 4)] if seam else None
+        )
+
+    return build
@@ -0,0 +1,60 @@
+import numpy as np
+from core.coverage import calc_coverage, rasterize_triangles
+
+
+def brute_force(triangles, resolution):
+    "ピクセル中心ごとに3辺の内側かを調べたマスク（向きは面積の符号で揃える）"
+    centers = (np.arange(resolution) + 0.5) / resolution
+    x, y = np.meshgrid(centers, centers)
+    mask = np.zeros((resolution, resolution), dtype=bool)
+    for a, b, c in np.asarray(triangles, dtype=np.float64):
+        area = (b[0] - a[0]) * (c[1] - a[1]) - (c[0] - a[0]) * (b[1] - a[1])
+        if area == 0:
+            continue
+        inside = np.ones_like(mask)
+        for start, end in ((a, b), (b, c), (c, a)):
+            edge = (end[0] - start[0]) * (y - start[1]) - (end[1] - start[1]) * (x - start[0])
+            inside &= edge * np.sign(area) >= -1e-12
+        mask |= inside
+    return mask
+
+
+def test_rasterize_half_square():
+    # 対角線上のピクセル中心も含む
+    mask = rasterize_triangles(np.array([((0, 0), (1, 0), (0, 1))]), 4)
+    assert np.count_nonzero(mask) == 10
+    assert mask[0, 0] and not mask[3, 3]
+
+
+def test_rasterize_ignores_winding_and_degenerate_triangles():
+    ccw = rasterize_triangles(np.array([((0, 0), (1, 0), (0, 1))]), 8)
+    cw = rasterize_triangles(np.array([((0, 0), (0, 1), (1, 0))]), 8)
+    assert np.array_equal(ccw, cw)
+    assert not rasterize_triangles(np.array([((0, 0), (0.5, 0.5), (1, 1))]), 8).any()
+
+
+def test_rasterize_matches_brute_force():
+    # 小さい三角形と、複数のタイルに分かれる大きい三角形、0-1 の外にはみ出す三角形
+    rng = np.random.default_rng(7)
+    small = rng.uniform(0, 1, (40, 1, 2)) + rng.uniform(-0.05, 0.05, (40, 3, 2))
+    large = rng.uniform(-0.3, 1.3, (10, 3, 2))
+    triangles = np.concatenate((small, large))
+    assert np.array_equal(rasterize_triangles(triangles, 64), brute_force(triangles, 64))
+
+
+def test_calc_coverage():
+    square = np.array(((0, 0), (1, 0), (1, 0.5), (0, 0.5)))
+    assert calc_coverage(square, [4], 8) == {(0, 0): 0.5}
+    # 重なった面は二重に数えない。3頂点未満の面は無視する
+    loop_uv = np.concatenate((square, square, ((0, 0), (1, 1))))
+    assert calc_coverage(loop_uv, [4, 4, 2], 8) == {(0, 0): 0.5}
+    assert calc_coverage(np.zeros((0, 2)), [], 8) == {}
+
+
+def test_calc_coverage_udim_tiles():
+    square = np.array(((0, 0), (1, 0), (1, 1), (0, 1))) * 0.5
+    loop_uv = np.concatenate((square, square + (1.0, 0.0), square + (0.25, 1.0)))
+    coverage = calc_coverage(loop_uv, [4, 4, 4], 8, use_udim=True)
+    assert coverage == {(0, 0): 0.25, (1, 0): 0.25, (0, 1): 0.25}
+    # UDIM でなければ 0-1 の範囲だけ
+    assert calc_coverage(loop_uv, [4, 4, 4], 8) == {(0, 0): 0.25}
@@ -0,0 +1,72 @@
+import numpy as np
+from core.islands import connected_components, edge_loop_pairs, face_loop_indices, find_island_labels, group_by_label
+
+
+def island_labels(mesh, face_hide=None, seeds=None, **options):
+    face_count = mesh.face_count
+    all_faces = np.ones(face_count, dtype=bool)
+    return find_island_labels(
+        mesh.loop_face,
+        mesh.loop_vert,
+        mesh.loop_edge,
+        mesh.loop_next,
+        mesh.loop_uv,
+        mesh.edge_seam,
+        all_faces,
+        np.zeros(face_count, dtype=bool) if face_hide is None else face_hide,
+        all_faces if seeds is None else seeds,
+        **options,
+    )
+
+
+def test_connected_components():
+    labels = connected_components(6, [4, 1, 5], [1, 2, 3])
+    assert labels.tolist() == [0, 1, 1, 3, 1, 3]
+
+
+def test_edge_loop_pairs():
+    loop_a, loop_b = edge_loop_pairs([0, 1, 2, 1, 3, 2, 2], 4)
+    # ループが2つのエッジだけ（3つのエッジ 2 は含まない）
+    assert loop_a.tolist() == [1] and loop_b.tolist() == [3]
+    loop_a, loop_b = edge_loop_pairs([], 0)
+    assert not len(loop_a) and not len(loop_b)
+
+
+def test_connected_faces_are_one_island(two_quads):
+    labels = island_labels(two_quads())
+    assert labels.tolist() == [0, 0]
+
+
+def test_uv_split_separates_islands(two_quads):
+    mesh = two_quads(split=True)
+    assert island_labels(mesh).tolist() == [0, 1]
+    assert island_labels(mesh, uv_split=False).tolist() == [0, 0]
+
+
+def test_seam_separates_islands(two_quads):
+    assert island_labels(two_quads(seam=True)).tolist() == [0, 1]
+
+
+def test_seeds_and_hidden_faces(two_quads):
+    mesh = two_quads(split=True)
+    assert island_labels(mesh, seeds=np.array([False, True])).tolist() == [-1, 1]
+    # 非表示の面はたどらない
+    assert island_labels(two_quads(), face_hide=np.array([False, True])).tolist() == [0, 1]
+
+
+def test_can_extend(two_quads):
+    seeds = np.array([True, False])
+    assert island_labels(two_quads(), seeds=seeds).tolist() == [0, 0]
+    assert island_labels(two_quads(), seeds=seeds, can_extend=False).tolist() == [0, -1]
+
+
+def test_group_by_label():
+    groups = group_by_label(np.array([2, -1, 0, 2, 0]))
+    assert [group.tolist() for group in groups] == [[2, 4], [0, 3]]
+    assert group_by_label(np.array([-1, -1])) == []
+
+
+def test_face_loop_indices():
+    face_start = np.array([0, 3, 7])
+    face_size = np.array([3, 4, 3])
+    assert face_loop_indices(face_start, face_size, [2, 0]).tolist() == [7, 8, 9, 0, 1, 2]
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from core.packing import PACK_EPS, fit_scale, pack_rects, tile_offsets
+
+
+def assert_packed(widths, heights, result, padding=0.0):
+    "タイルからはみ出さず、余白を含めて重ならない"
+    position, rotated, tile = result
+    widths, heights = np.asarray(widths), np.asarray(heights)
+    w = np.where(rotated, heights, widths)
+    h = np.where(rotated, widths, heights)
+    lower = position - padding
+    upper = position + np.column_stack((w, h)) + padding
+    fits = (w + 2 * padding <= 1 + PACK_EPS) & (h + 2 * padding <= 1 + PACK_EPS)
+    assert (lower[fits] >= -PACK_EPS).all() and (upper[fits] <= 1 + PACK_EPS).all()
+    for i in range(len(w)):
+        for j in range(i + 1, len(w)):
+            if tile[i] != tile[j]:
+                continue
+            overlap = np.minimum(upper[i], upper[j]) - np.maximum(lower[i], lower[j])
+            assert (overlap <= PACK_EPS).any(), (i, j)
+
+
+def test_empty():
+    position, rotated, tile = pack_rects([], [])
+    assert position.shape == (0, 2) and not len(rotated) and not len(tile)
+
+
+@pytest.mark.parametrize("padding", [0.0, 0.01])
+def test_random_rects_do_not_overlap(padding):
+    rng = np.random.default_rng(3)
+    widths = rng.uniform(0.02, 0.3, 60)
+    heights = rng.uniform(0.02, 0.3, 60)
+    result = pack_rects(widths, heights, padding)
+    assert_packed(widths, heights, result, padding)
+
+
+def test_four_quarters_fill_one_tile():
+    position, rotated, tile = pack_rects([0.5] * 4, [0.5] * 4)
+    assert tile.tolist() == [0, 0, 0, 0]
+    assert sorted(map(tuple, position.tolist())) == [(0.0, 0.0), (0.0, 0.5), (0.5, 0.0), (0.5, 0.5)]
+
+
+def test_rotate_to_fit():
+    # 横長の矩形を回転すると、先に置いた縦長の矩形の隣に並べられる
+    widths, heights = [1.0, 0.4], [0.6, 1.0]
+    position, rotated, tile = pack_rects(widths, heights)
+    assert tile.tolist() == [0, 0] and rotated.tolist() == [True, False]
+    assert_packed(widths, heights, (position, rotated, tile))
+    _, rotated, tile = pack_rects(widths, heights, rotate=False)
+    assert tile.tolist() == [1, 0] and not rotated.any()
+
+
+def test_overflow_to_next_tiles_and_max_tiles():
+    widths = heights = [0.6] * 3
+    _, _, tile = pack_rects(widths, heights)
+    assert tile.tolist() == [0, 1, 2]
+    assert pack_rects(widths, heights, max_tiles=2) is None
+    assert pack_rects(widths, heights, max_tiles=3) is not None
+
+
+def test_zero_width_rect():
+    position, _, tile = pack_rects([0.0, 0.5], [0.5, 0.5])
+    assert tile.tolist() == [0, 0]
+    assert_packed([0.0, 0.5], [0.5, 0.5], (position, np.zeros(2, dtype=bool), tile))
+
+
+def test_fit_scale():
+    scale = fit_scale([1.0] * 4, [1.0] * 4, rotate=False)
+    assert 0.49 < scale <= 0.5 + PACK_EPS
+    assert pack_rects(np.full(4, scale), np.full(4, scale), max_tiles=1) is not None
+    assert fit_scale([], []) == 1.0
+
+
+def test_tile_offsets():
+    assert tile_offsets([0, 1, 10, 12]).tolist() == [[0, 0], [1, 0], [0, 1], [2, 1]]
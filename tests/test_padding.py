@@ -0,0 +1,46 @@
+import numpy as np
+from core.padding import boundary_segments, nesting_signs, uv_keys
+
+
+def segments(mesh):
+    loop_key, key_uv = uv_keys(mesh.loop_uv)
+    seg_a, seg_b, seg_island = boundary_segments(
+        mesh.loop_face, mesh.loop_edge, mesh.loop_next, loop_key, mesh.edge_seam, mesh.face_count
+    )
+    return key_uv[seg_a], key_uv[seg_b], seg_island
+
+
+def square(center, size):
+    corners = np.array(((-1, -1), (1, -1), (1, 1), (-1, 1)), dtype=np.float64)
+    return np.asarray(center, dtype=np.float64) + corners * size * 0.5
+
+
+def test_boundary_of_connected_faces(two_quads):
+    start, end, island = segments(two_quads())
+    # 外周の6本だけで、共有エッジは含まない
+    assert len(start) == 6
+    assert len(set(island.tolist())) == 1
+    shared = {(0.25, 0.0), (0.25, 0.25)}
+    assert not any({tuple(a), tuple(b)} == shared for a, b in zip(start.tolist(), end.tolist()))
+
+
+def test_seam_is_boundary_once(two_quads):
+    # シームで分かれても、UVが重なるセグメントは1本だけ残す
+    _, _, island = segments(two_quads(seam=True))
+    assert len(island) == 7
+    assert len(set(island.tolist())) == 2
+
+
+def test_split_uvs_give_separate_boundaries(two_quads):
+    _, _, island = segments(two_quads(split=True))
+    assert len(island) == 8
+    assert np.bincount(island).tolist() == [4, 4]
+
+
+def test_nesting_signs():
+    outer = square((0.5, 0.5), 0.8)
+    hole = square((0.5, 0.5), 0.4)
+    inside_hole = square((0.5, 0.5), 0.1)
+    apart = square((2.0, 2.0), 0.5)
+    assert nesting_signs([outer, hole, inside_hole, apart]).tolist() == [1.0, -1.0, 1.0, 1.0]
+    assert len(nesting_signs([])) == 0
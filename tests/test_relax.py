@@ -0,0 +1,91 @@
+import numpy as np
+from core.relax import CSRMatrix, LaplaceSystem, RelaxWeights, taubin_arrays, taubin_smooth
+
+
+def chain_weights(count):
+    "0 - 1 - ... - count-1 の鎖（重み 1）"
+    a = np.arange(count - 1)
+    b = a + 1
+    return CSRMatrix.from_coo(np.concatenate((a, b)), np.concatenate((b, a)), np.ones(2 * (count - 1)), count)
+
+
+def dense(matrix: CSRMatrix):
+    result = np.zeros((matrix.size, matrix.size))
+    np.add.at(result, (matrix.row_indices, matrix.indices), matrix.data)
+    return result
+
+
+def test_csr_from_rows_and_coo_match():
+    rows = [[(1, 2.0)], [(0, 2.0), (2, 1.0)], [(1, 1.0)]]
+    from_rows = CSRMatrix.from_rows(rows)
+    from_coo = CSRMatrix.from_coo(np.array([1, 0, 2, 1]), np.array([0, 1, 1, 2]), np.array([2.0, 2.0, 1.0, 1.0]), 3)
+    assert np.array_equal(dense(from_rows), dense(from_coo))
+    assert from_rows.row_sums().tolist() == [2.0, 3.0, 1.0]
+
+
+def test_csr_dot():
+    rng = np.random.default_rng(1)
+    matrix = chain_weights(5)
+    x = rng.uniform(size=(5, 2))
+    assert np.allclose(matrix.dot(x), dense(matrix) @ x)
+    assert np.allclose(matrix.dot(x[:, 0]), dense(matrix) @ x[:, 0])
+    assert np.allclose(dense(matrix.row_normalized()).sum(axis=1), 1.0)
+
+
+def test_csr_dot_empty():
+    empty = CSRMatrix.from_coo(np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0), 3)
+    assert empty.dot(np.ones((4, 2))).shape == (3, 2)
+
+
+def test_taubin_keeps_fixed_nodes():
+    positions = np.array([(0.0, 0.0), (0.3, 0.5), (1.0, 0.0)])
+    movable = np.array([False, True, False])
+    result = taubin_smooth(positions, chain_weights(3), movable, (True, True), 0.5, -0.53, 10, 0.0)
+    assert np.array_equal(result[[0, 2]], positions[[0, 2]])
+    # 中央のノードは両端の中点に近づく
+    assert np.linalg.norm(result[1] - (0.5, 0.0)) < np.linalg.norm(positions[1] - (0.5, 0.0))
+
+
+def test_taubin_axis_mask():
+    positions = np.array([(0.0, 0.0), (0.3, 0.5), (1.0, 0.0)])
+    movable = np.array([False, True, False])
+    result = taubin_smooth(positions, chain_weights(3), movable, (True, False), 0.5, -0.53, 10, 0.0)
+    assert result[1, 1] == 0.5 and result[1, 0] != 0.3
+
+
+def test_taubin_arrays_matches_taubin_smooth():
+    rng = np.random.default_rng(2)
+    weights = chain_weights(6)
+    positions = rng.uniform(size=(6, 2))
+    movable = np.array([False, True, True, True, True, False])
+    options = dict(axis_mask=(True, True), lambda_factor=0.5, mu_factor=-0.53, iterations=5, eps=0.0)
+    expected = taubin_smooth(positions, weights, movable, **options)
+    result = taubin_arrays(positions, weights.indptr, weights.indices, weights.data, movable, **options)
+    assert np.array_equal(result, expected)
+
+
+def test_laplace_solve_approaches_harmonic():
+    # 両端を固定した鎖は、時間を大きくすると等間隔に並ぶ
+    count = 6
+    positions = np.zeros((count, 2))
+    positions[-1] = (1.0, 0.5)
+    positions[1:-1] = np.random.default_rng(4).uniform(size=(count - 2, 2))
+    movable = np.ones(count, dtype=bool)
+    movable[[0, -1]] = False
+    system = LaplaceSystem.from_weights(chain_weights(count), movable)
+    result = system.solve(positions, 1e6, tol=1e-12)
+    expected = np.linspace((0.0, 0.0), (1.0, 0.5), count)
+    assert np.allclose(result, expected, atol=1e-4)
+    assert np.array_equal(result[[0, -1]], positions[[0, -1]])
+
+
+def test_laplace_without_free_nodes():
+    positions = np.array([(0.0, 0.0), (1.0, 1.0)])
+    system = LaplaceSystem.from_weights(chain_weights(2), np.zeros(2, dtype=bool))
+    assert np.array_equal(system.solve(positions, 1.0), positions)
+
+
+def test_relax_weights_reuse_system():
+    item = RelaxWeights(chain_weights(4), np.array([False, True, True, False]))
+    assert item.system is item.system
+    assert item.system.free.tolist() == [1, 2]
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from core.rotation import INVERT_EPS, invert_2x2_safe, rotate_uvs, rotation_auto, rotation_geometry
+
+
+def quad_grid(count=3):
+    "count×count の四角形のグリッド。ループごとの平面の座標 (L, 2) と面の先頭・頂点数"
+    corners = np.array(((0, 0), (1, 0), (1, 1), (0, 1)), dtype=np.float64)
+    cells = np.array([(x, y) for y in range(count) for x in range(count)], dtype=np.float64)
+    loop_xy = (cells[:, None, :] + corners[None]).reshape(-1, 2) / count
+    face_size = np.full(len(cells), 4, dtype=np.int64)
+    return loop_xy, np.arange(0, len(loop_xy), 4, dtype=np.int64), face_size
+
+
+def rotated(uvs, angle):
+    "反時計回りに angle 回転したUV（原点中心）"
+    cos, sin = np.cos(angle), np.sin(angle)
+    return uvs @ np.array(((cos, sin), (-sin, cos)))
+
+
+def test_rotate_uvs_about_center():
+    center = (0.5, 0.25)
+    uvs = np.array(((1.5, 0.25), (0.5, 0.25)))
+    result = rotate_uvs(uvs, np.pi / 2, center)
+    # 中心は動かず、中心から +U の点は +V に回る
+    assert np.allclose(result, ((0.5, 1.25), (0.5, 0.25)))
+    assert np.allclose(rotate_uvs(result, -np.pi / 2, center), uvs)
+
+
+@pytest.mark.parametrize("angle", [0.0, 0.3, -0.6])
+def test_rotation_auto_aligns_rotated_grid(angle):
+    loop_xy, face_start, face_size = quad_grid()
+    loop_uv = rotated(loop_xy, angle)
+    result = rotation_auto(loop_uv, face_start, face_size)
+    assert np.isclose(result, -angle)
+
+    aligned = rotate_uvs(loop_uv, result, (0.0, 0.0))
+    assert np.allclose(aligned, loop_xy)
+
+
+def test_rotation_auto_empty():
+    assert rotation_auto(np.zeros((0, 2)), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)) == 0.0
+
+
+@pytest.mark.parametrize("angle", [0.0, 0.4, -1.2])
+def test_rotation_geometry_aligns_axis_to_v(angle):
+    # XZ 平面のグリッドで、UV の V は Z 方向
+    loop_xy, face_start, face_size = quad_grid()
+    loop_co = np.column_stack((loop_xy[:, 0], np.zeros(len(loop_xy)), loop_xy[:, 1]))
+    loop_uv = rotated(loop_xy, angle)
+    assert np.isclose(rotation_geometry(loop_uv, loop_co, face_start, face_size, "Z"), -angle)
+    # X 方向は U なので、V に揃えるには -90° 回す
+    expected = np.angle(np.exp(1j * (np.pi / 2 - angle)))
+    assert np.isclose(rotation_geometry(loop_uv, loop_co, face_start, face_size, "X"), expected)
+
+
+def test_rotation_geometry_secondary_axis():
+    # YZ 平面では X 方向の成分がないので、X の代わりに Z を使う
+    angle = 0.5
+    loop_xy, face_start, face_size = quad_grid()
+    loop_co = np.column_stack((np.zeros(len(loop_xy)), loop_xy[:, 0], loop_xy[:, 1]))
+    loop_uv = rotated(loop_xy, angle)
+    result = rotation_geometry(loop_uv, loop_co, face_start, face_size, "X")
+    assert np.isclose(result, rotation_geometry(loop_uv, loop_co, face_start, face_size, "Z"))
+    assert np.isclose(result, -angle)
+
+
+def test_rotation_geometry_unknown_axis():
+    loop_xy, face_start, face_size = quad_grid(1)
+    with pytest.raises(ValueError):
+        rotation_geometry(loop_xy, np.zeros((4, 3)), face_start, face_size, "W")
+
+
+def test_invert_2x2_safe():
+    m = np.array(((2.0, 1.0), (1.0, 3.0)))
+    result = np.array(invert_2x2_safe(*(np.array([value]) for value in m.ravel()))).reshape(2, 2)
+    assert np.allclose(result, np.linalg.inv(m))
+
+    # 特異な行列は対角に小さい値を足した逆行列
+    singular = np.array(((1.0, 2.0), (2.0, 4.0)))
+    result = np.array(invert_2x2_safe(*(np.array([value]) for value in singular.ravel()))).reshape(2, 2)
+    assert np.allclose(result, np.linalg.inv(singular + np.eye(2) * INVERT_EPS))
+
+
+def test_rotation_geometry_singular_uv_triangle():
+    # UV が1点につぶれた三角形でも有限の角度を返す
+    loop_co = np.array(((0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 0.0, 1.0)))
+    loop_uv = np.full((3, 2), 0.5)
+    face_start = np.array([0])
+    face_size = np.array([3])
+    for axis in ("X", "Y", "Z"):
+        assert np.isfinite(rotation_geometry(loop_uv, loop_co, face_start, face_size, axis))
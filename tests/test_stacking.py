@@ -0,0 +1,103 @@
+import numpy as np
+from core.islands import edge_loop_pairs
+from core.stacking import (
+    LoopShape,
+    apply_similarity,
+    face_hashes,
+    island_fingerprints,
+    loop_correspondences,
+    mix_hash,
+    procrustes,
+)
+
+
+def rotation(angle):
+    cos, sin = np.cos(angle), np.sin(angle)
+    return np.array(((cos, -sin), (sin, cos)))
+
+
+def island_shapes(mesh, face_island):
+    "アイランドごとの LoopShape（IslandStacker と同じ作り方）"
+    loop_a, loop_b = edge_loop_pairs(mesh.loop_edge, len(mesh.edge_seam))
+    face_hash = face_hashes(face_island, mesh.face_size, mesh.loop_face, loop_a, loop_b)
+    loop_island = face_island[mesh.loop_face]
+    inner = loop_island[loop_a] == loop_island[loop_b]
+    loop_twin = np.full(len(loop_island), -1, dtype=np.int64)
+    loop_twin[loop_a[inner]] = loop_b[inner]
+    loop_twin[loop_b[inner]] = loop_a[inner]
+
+    shapes = []
+    for island in range(int(face_island.max()) + 1):
+        loops = np.flatnonzero(loop_island == island)
+        position = np.full(len(loop_island), -1, dtype=np.int64)
+        position[loops] = np.arange(len(loops))
+        twin = loop_twin[loops]
+        twin = np.where(twin >= 0, position[np.maximum(twin, 0)], -1)
+        shapes.append(
+            LoopShape.from_loops(mesh.loop_face[loops], mesh.loop_vert[loops], twin, face_hash[mesh.loop_face[loops]])
+        )
+    return face_hash, shapes
+
+
+def test_mix_hash_is_deterministic():
+    values = np.array([0, 1, 2, 1])
+    hashes = mix_hash(values)
+    assert hashes.dtype == np.uint64
+    assert hashes[1] == hashes[3] and len(set(hashes.tolist())) == 3
+
+
+def test_same_topology_same_fingerprint(two_quads):
+    mesh = two_quads(split=True)
+    face_island = np.array([0, 1])
+    face_hash, _ = island_shapes(mesh, face_island)
+    fingerprints = island_fingerprints(face_island, 2, face_hash)
+    assert fingerprints[0] == fingerprints[1]
+
+    # 2つの面が1つのアイランドなら、1つの面のアイランドとは違う
+    joined = face_hashes(np.array([0, 0]), mesh.face_size, mesh.loop_face, *edge_loop_pairs(mesh.loop_edge, 7))
+    assert island_fingerprints(np.array([0, 0]), 1, joined)[0] != fingerprints[0]
+
+
+def test_loop_correspondences_identity(two_quads):
+    _, (source, target) = island_shapes(two_quads(split=True), np.array([0, 1]))
+    mappings = loop_correspondences(source, target)
+    assert [mapping.tolist() for mapping in mappings] == [[0, 1, 2, 3]]
+
+
+def test_loop_correspondences_with_reordered_faces(two_quads):
+    mesh = two_quads()
+    _, (source,) = island_shapes(mesh, np.array([0, 0]))
+    # 同じアイランドの面の順を入れ替えたもの（面ごとのループの並びは同じ）
+    order = np.r_[4:8, 0:4]
+    twin = np.argsort(order)[source.loop_twin[order]]
+    twin[source.loop_twin[order] < 0] = -1
+    target = LoopShape.from_loops(mesh.loop_face[order], mesh.loop_vert[order], twin, source.loop_hash[order])
+
+    mappings = loop_correspondences(source, target)
+    assert mappings
+    expected = np.argsort(order)
+    assert any(np.array_equal(mapping, expected) for mapping in mappings)
+    for mapping in mappings:
+        # 同じ頂点のループは同じ頂点に対応する
+        pairs = set(zip(source.loop_vert.tolist(), target.loop_vert[mapping].tolist()))
+        assert len(pairs) == len(set(source.loop_vert.tolist()))
+
+
+def test_procrustes_recovers_similarity():
+    rng = np.random.default_rng(5)
+    source = rng.uniform(0, 1, (8, 2))
+    angle = 0.7
+    target = ((source - 0.5) @ rotation(angle).T) * 2.0 + (3.0, -1.0)
+    result_angle, factor, residual = procrustes(source, target[None])
+    assert np.isclose(result_angle[0], -angle)
+    assert np.isclose(factor[0], 0.5)
+    assert residual[0] < 1e-20
+
+    moved = apply_similarity(target, result_angle[0], factor[0], source.mean(axis=0))
+    assert np.allclose(moved, source)
+
+
+def test_procrustes_rigid_keeps_scale():
+    source = np.array([(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+    _, factor, residual = procrustes(source, (source * 2.0)[None], scale=False)
+    assert factor[0] == 1.0 and residual[0] > 0
@@ -0,0 +1,36 @@
+import numpy as np
+from core.symmetry import grid_nearest, match_faces, mirror_coords
+
+
+def brute_nearest(points, queries, threshold):
+    dist = np.linalg.norm(queries[:, None] - points[None], axis=2)
+    nearest = dist.argmin(axis=1)
+    return np.where(dist[np.arange(len(queries)), nearest] < threshold, nearest, -1)
+
+
+def test_grid_nearest_threshold():
+    points = np.array(((0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (1.0005, 0.0, 0.0)))
+    queries = np.array(((0.0, 0.0, 0.0004), (1.0004, 0.0, 0.0), (0.5, 0.0, 0.0)))
+    # 最も近い点を選び、threshold 以上離れていれば -1
+    assert grid_nearest(points, queries, 0.001).tolist() == [0, 2, -1]
+    assert grid_nearest(points, np.zeros((0, 3)), 0.001).tolist() == []
+    assert grid_nearest(np.zeros((0, 3)), queries, 0.001).tolist() == [-1, -1, -1]
+
+
+def test_grid_nearest_matches_brute_force():
+    rng = np.random.default_rng(11)
+    points = rng.uniform(-1, 1, (300, 3))
+    queries = np.concatenate((points + rng.normal(0, 0.01, points.shape), rng.uniform(-1, 1, (50, 3))))
+    assert np.array_equal(grid_nearest(points, queries, 0.05), brute_nearest(points, queries, 0.05))
+
+
+def test_match_faces_mirrors_two_quads(two_quads):
+    mesh = two_quads()
+    coords = mesh.vert_co - (1.0, 0.0, 0.0)
+    vert_map = grid_nearest(coords, mirror_coords(coords, 0), 0.001)
+    assert vert_map.tolist() == [2, 1, 0, 5, 4, 3]
+    assert match_faces(mesh.loop_vert, mesh.face_start, mesh.face_size, vert_map).tolist() == [1, 0]
+
+    # 対応する頂点がない面は -1
+    vert_map[0] = -1
+    assert match_faces(mesh.loop_vert, mesh.face_start, mesh.face_size, vert_map).tolist() == [-1, 0]
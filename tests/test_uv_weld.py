@@ -0,0 +1,59 @@
+import numpy as np
+from core.uv_weld import label_values, uv_labels, vert_uv_labels, weld_labels
+
+
+def mesh_weld_labels(mesh):
+    return weld_labels(mesh.loop_uv, mesh.loop_vert, mesh.loop_edge, mesh.loop_next, mesh.edge_seam)
+
+
+def corner_labels(mesh, labels, vert):
+    "頂点 vert のループのラベル"
+    return set(labels[mesh.loop_vert == vert].tolist())
+
+
+def test_uv_labels_round_to_key_precision():
+    labels = uv_labels(np.array([(0.5, 0.5), (0.1, 0.2), (0.5 + 1e-9, 0.5)]))
+    assert labels.tolist() == [1, 0, 1]
+    assert len(uv_labels(np.zeros((0, 2)))) == 0
+
+
+def test_vert_uv_labels_split_by_vertex():
+    labels = vert_uv_labels(np.zeros((3, 2)), np.array([0, 1, 0]))
+    assert labels[0] == labels[2] != labels[1]
+
+
+def test_continuous_uvs_weld_shared_corners(two_quads):
+    mesh = two_quads()
+    labels = mesh_weld_labels(mesh)
+    assert len(corner_labels(mesh, labels, 1)) == 1
+    assert len(corner_labels(mesh, labels, 4)) == 1
+    assert labels.max() + 1 == 6
+
+
+def test_seam_with_continuous_uvs_welds_shared_corners(two_quads):
+    # シームでも両側のUVがつながっていれば、共有する角は1つのUV頂点
+    mesh = two_quads(seam=True)
+    labels = mesh_weld_labels(mesh)
+    assert len(corner_labels(mesh, labels, 1)) == 1
+    assert len(corner_labels(mesh, labels, 4)) == 1
+
+
+def test_split_uvs_keep_corners_apart(two_quads):
+    mesh = two_quads(split=True)
+    labels = mesh_weld_labels(mesh)
+    assert len(corner_labels(mesh, labels, 1)) == 2
+    assert len(corner_labels(mesh, labels, 4)) == 2
+
+
+def test_overlapping_corner_of_cut_fan_is_separate(two_quads):
+    # 頂点1のUVは両側で同じでも、共有エッジの反対の端 (頂点4) のUVが切れていれば別のUV頂点
+    mesh = two_quads()
+    mesh.loop_uv[7] += (0.0, 0.5)
+    labels = mesh_weld_labels(mesh)
+    assert len(corner_labels(mesh, labels, 1)) == 2
+    assert len(set(vert_uv_labels(mesh.loop_uv, mesh.loop_vert)[mesh.loop_vert == 1].tolist())) == 1
+
+
+def test_label_values_use_first_loop():
+    values = label_values(np.array([1, 0, 1, 2]), np.array([10, 20, 30, 40]))
+    assert values.tolist() == [20, 10, 40]
@@ -141,6 +141,13 @@ class UV_PT_mio3_align(Mio3UVPanel):
         row.prop(context.scene.mio3uv, "texel_density", text="")
         row.popover("UV_PT_mio3_texel_popover", text="", icon="DOWNARROW_HLT")
 
+        if props_w.stats_live:
+            row = col.row(align=True)
+            row.enabled = False
+            row.prop(props_w, "stats_island_count", emboss=False)
+            row.prop(props_w, "stats_texel_density", text="", emboss=False)
+            row.prop(props_w, "texel_density_percent", text="", emboss=False)
+
         if props_w.texel_preset_buttons:
             grid_flow = col.grid_flow(align=True, row_major=True, columns=4, even_columns=True, even_rows=True)
             grid_flow.operator("uv.mio3_texel_density_set", text="128").td = 128
@@ -334,14 +341,29 @@ class UV_PT_mio3_texel_popover(Panel):
 
         layout.prop(props_w, "texel_preset_buttons")
 
+        col = layout.column(align=True)
+        col.label(text="Texel Heatmap", icon_value=icons.options)
+        col.row().prop(props_w, "texel_heatmap_type", expand=True)
+        col.prop(props_w, "texel_heatmap_range")
+        row = col.row(align=True)
+        row.operator("mio3uv.texel_heatmap", icon_value=icons.color_grid)
+        row.operator("mio3uv.checker_map_clear", text="", icon="CANCEL")
+
         col = layout.column(align=True)
         col.label(text="UV Coverage", icon_value=icons.options)
         row = col.row(align=True)
         row.enabled = False
         row.prop(context.window_manager.mio3uv, "texel_density_percent", emboss=False, text="Coverage")
+        if props_s.udim and len(props_w.texel_coverage_tiles) > 1:
+            for tile in props_w.texel_coverage_tiles:
+                row = col.row(align=True)
+                row.enabled = False
+                row.prop(tile, "percent", emboss=False, text=str(tile.number))
 
         col.row().prop(props_w, "texel_density_coverage_type", text="Coverage", expand=True)
+        col.prop(props_w, "texel_coverage_resolution")
         col.operator("uv.mio3_texel_density_coverage", text="Calculate Coverage")
+        col.prop(props_w, "stats_live")
 
 
 class UV_PT_mio3_auto_body_parts_popover(Panel):
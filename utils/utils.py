@@ -1,6 +1,7 @@
 import bpy
 import bmesh
 import math
+import numpy as np
 from mathutils import Vector, Matrix
 from bmesh.types import BMLoop, BMFace, BMLayerItem
 
@@ -122,7 +123,49 @@ def is_uv_continuous(loop: BMLoop, linked_loop: BMLoop, uv_layer):
     return du * du + dv * dv <= eps_eq
 
 
+def straight_uv_graph(node_group, mode="GEOMETRY", keep_length=False, center=False):
+    "straight_uv_nodes のグラフの配列版"
+    order = node_group.ordered_node_ids()
+    if len(order) <= 1:
+        return
+
+    uvs = node_group.graph.node_uv[order]
+    start_uv = uvs[0]
+    direction = uvs[-1] - start_uv
+    if abs(direction[0]) > abs(direction[1]):
+        direction[1] = 0
+    else:
+        direction[0] = 0
+
+    uv_lengths = np.linalg.norm(np.diff(uvs, axis=0), axis=1)
+    original_uv_length = uv_lengths.sum() if keep_length else 0
+
+    if mode == "GEOMETRY":
+        co_lengths = np.linalg.norm(np.diff(node_group.node_vert_cos(order), axis=0), axis=1)
+        cumulative = np.concatenate(([0.0], np.cumsum(co_lengths)))
+    elif mode == "EVEN":
+        cumulative = np.arange(len(order), dtype=np.float64)
+    else:
+        cumulative = np.concatenate(([0.0], np.cumsum(uv_lengths)))
+    if cumulative[-1] <= 0:
+        return
+    new_positions = start_uv + direction * (cumulative / cumulative[-1])[:, None]
+
+    if keep_length:
+        new_uv_length = np.linalg.norm(np.diff(new_positions, axis=0), axis=1).sum()
+        scale_factor = original_uv_length / new_uv_length if new_uv_length > 0 else 1
+        new_positions = start_uv + (new_positions - start_uv) * scale_factor
+
+    if center:
+        new_positions += uvs.mean(axis=0) - new_positions.mean(axis=0)
+
+    node_group.graph.node_uv[order] = new_positions
+
+
 def straight_uv_nodes(node_group, mode="GEOMETRY", keep_length=False, center=False):
+    if getattr(node_group, "is_graph", False):
+        return straight_uv_graph(node_group, mode, keep_length, center)
+
     ordered_nodes = node_group.get_ordered_nodes()
     if len(ordered_nodes) <= 1:
         return
@@ -6,31 +6,24 @@
 # - Adapted for this add-on
 # - Minor changes by Mio (2026)
 
-
-def get_uv_key(uv):
-    return (round(uv.x, 6), round(uv.y, 6))
+from ..classes import UVWeldIndex
 
 
 def build_uv_loop_index(bm, uv_layer):
-    uv_loop_index = {}
-
-    for face in bm.faces:
-        for loop in face.loops:
-            key = (loop.vert, get_uv_key(loop[uv_layer].uv))
-            uv_loop_index.setdefault(key, []).append(loop)
-
-    return uv_loop_index
+    "頂点とUVが同じループのインデックス"
+    return UVWeldIndex.from_bmesh(bm, uv_layer)
 
 
 def collect_shared_uv_loops(uv_layer, faces, uv_loop_index):
     shared_uvs = {}
     selected_faces = set(faces)
+    groups = uv_loop_index.groups("VERT_AND_UV")
 
     for face in faces:
         for loop in face.loops:
-            key = (loop.vert, get_uv_key(loop[uv_layer].uv))
+            key = uv_loop_index.label(loop, "VERT_AND_UV")
             if key not in shared_uvs:
-                loops = uv_loop_index.get(key, [])
+                loops = groups.get(key, [])
                 if not any(other_loop.face not in selected_faces for other_loop in loops):
                     continue
                 shared_uvs[key] = {"source": loop, "loops": loops}